@@ -0,0 +1,46 @@
+import argparse
+import io
+import time
+
+from corpus import RAW_DATASET, sentences
+from parsugbo.brackets import BracketWriter
+from parsugbo.parser import Parser
+from parsugbo.visitors import SemanticAnalyzer
+
+
+def indented(trees, out):
+    analyzer = SemanticAnalyzer()
+    for tree in trees:
+        analyzer.visit(tree).write(out)
+        out.write("\n")
+
+
+def bracketed(trees, out):
+    BracketWriter().write_all(trees, out)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Trees/sec written as indented Node trees and as brackets")
+    parser.add_argument("--corpus", default=RAW_DATASET)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    # parsed once up front so only writing is timed
+    trees = []
+    for text in sentences(args.corpus):
+        try:
+            errors, tree = Parser().parse(text, check=False)
+        except Exception:
+            continue
+        if tree is not None:
+            trees.append(tree)
+
+    print("{:<10} {:>12} {:>14}".format("format", "trees/sec", "bytes/tree"))
+    for name, write in (("indented", indented), ("brackets", bracketed)):
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            out = io.StringIO()
+            write(trees, out)
+        elapsed = time.perf_counter() - start
+        size = len(out.getvalue().encode("utf-8")) / len(trees)
+        print("{:<10} {:>12.0f} {:>14.0f}".format(name, len(trees) * args.repeat / elapsed, size))
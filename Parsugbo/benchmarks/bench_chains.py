@@ -0,0 +1,48 @@
+import argparse
+import time
+
+from parsugbo.parser import Parser
+from parsugbo.predictive import PredictiveParser
+from parsugbo.visitors import SemanticAnalyzer
+
+# synthetic sentences with `n` items of each chain kind; the phrases of a
+# prepositional run nest in the noun phrase of the one before
+CHAINS = {
+    "noun phrases": lambda n: "nagkaon " + ", ".join(["ang bata"] * n),
+    "compound nouns": lambda n: "nagkaon ang balay ni " + ", ".join(["bata"] * n),
+    "prep phrases": lambda n: "nagkaon " + " ".join(["kang bata"] * n),
+    "sa phrases": lambda n: "nagkaon ang bata " + " ".join(["sa balay"] * n),
+}
+
+
+def run(parser_class, text, repeat):
+    # chains this long need more token matches than the default budget
+    parser = parser_class(max_steps=None)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        errors, tree = parser.parse(text)
+    parsed = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(repeat):
+        SemanticAnalyzer().visit(tree)
+    visited = time.perf_counter() - start
+    return len(errors), parsed / repeat, visited / repeat
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parse and visit time of long chains")
+    parser.add_argument("--items", type=int, nargs="+", default=[1000, 2000, 5000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print("{:<16} {:>6} {:<18} {:>6} {:>10} {:>10}".format("chain", "items", "parser", "errors", "parse ms", "visit ms"))
+    for kind, build in CHAINS.items():
+        for n in args.items:
+            text = build(n)
+            for parser_class in (Parser, PredictiveParser):
+                errors, parsed, visited = run(parser_class, text, args.repeat)
+                print(
+                    "{:<16} {:>6} {:<18} {:>6} {:>10.1f} {:>10.1f}".format(
+                        kind, n, parser_class.__name__, errors, parsed * 1000, visited * 1000
+                    )
+                )
@@ -0,0 +1,34 @@
+import argparse
+import time
+
+from corpus import RAW_DATASET, sentences
+from parsugbo.parser import Parser
+
+
+def parse_all(corpus, check):
+    parser = Parser()
+    for text in corpus:
+        parser.parse(text, check=check)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sentences/sec with and without the grammar checks")
+    parser.add_argument("--corpus", default=RAW_DATASET)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    # warm the lexical-analysis cache and leave out sentences the parser cannot handle
+    corpus = []
+    for text in sentences(args.corpus):
+        try:
+            Parser().parse(text)
+        except Exception:
+            continue
+        corpus.append(text)
+
+    for check in (True, False):
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            parse_all(corpus, check)
+        elapsed = time.perf_counter() - start
+        print("check={:<6} {:>10.0f} sentences/sec".format(str(check), len(corpus) * args.repeat / elapsed))
@@ -0,0 +1,77 @@
+import argparse
+import time
+
+from parsugbo.cky import CKYParser
+
+# CNF version of the grammar in Parser/cky-parser.ipynb
+GRAMMAR = {
+    "S": {("VP", "NP")},
+    "VP": {("Verb", "NP"), ("Verb", "PP")},
+    "NP": {("Det", "Noun"), ("NP", "PP")},
+    "PP": {("Preposition", "NP")},
+    "Det": {"ang", "usa"},
+    "Noun": {"kuting", "iro", "tao", "teleskopyo"},
+    "Verb": {"nagtan-aw", "nagkaon"},
+    "Preposition": {"sa", "uban"},
+}
+
+
+def with_filler(grammar, rules):
+    """`grammar` with `rules` binary rules over symbols no word reaches,
+    which a parser scanning the whole grammar still pays for."""
+    grammar = dict(grammar)
+    for i in range(rules):
+        grammar["X" + str(i)] = {("Y" + str(i), "Z" + str(i))}
+    return grammar
+
+
+def scan_chart(grammar, words):
+    """The chart loop of the notebook CKYParser, without its trees."""
+    n = len(words)
+    table = [[set() for _ in range(n)] for _ in range(n)]
+    for j in range(n):
+        for lhs, rhs in grammar.items():
+            if words[j] in rhs:
+                table[j][j].add(lhs)
+    for length in range(2, n + 1):
+        for start in range(n - length + 1):
+            end = start + length - 1
+            for mid in range(start, end):
+                for lhs, productions in grammar.items():
+                    for production in productions:
+                        if len(production) == 2:
+                            left, right = production
+                            if left in table[start][mid] and right in table[mid + 1][end]:
+                                table[start][end].add(lhs)
+    return table
+
+
+def sentence(phrases):
+    return "nagtan-aw ang tao " + " ".join(["sa ang iro"] * phrases) + " ang kuting"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CKY chart time of the notebook loop against the indexed engine")
+    parser.add_argument("--phrases", type=int, default=6, help="prepositional phrases in the sentence")
+    parser.add_argument("--filler", type=int, nargs="+", default=[0, 100, 1000])
+    args = parser.parse_args()
+
+    words = sentence(args.phrases).split()
+    print("{} words".format(len(words)))
+    print("{:>8} {:>12} {:>12}".format("rules", "notebook ms", "engine ms"))
+    for filler in args.filler:
+        grammar = with_filler(GRAMMAR, filler)
+        engine = CKYParser(grammar)
+        table = scan_chart(grammar, words)
+        chart = engine.parse(words)
+        assert all(table[s][e - 1] == labels for s, e, labels in chart.spans())
+
+        start = time.perf_counter()
+        scan_chart(grammar, words)
+        notebook = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(10):
+            engine.parse(words)
+        indexed = (time.perf_counter() - start) / 10
+        rules = sum(len(p) for p in grammar.values())
+        print("{:>8} {:>12.2f} {:>12.2f}".format(rules, notebook * 1000, indexed * 1000))
@@ -0,0 +1,64 @@
+import argparse
+import os
+import tempfile
+import time
+
+from parsugbo.cky import Grammar
+from parsugbo.cnf import cached_grammar, compile_rules
+
+# Parser/cky-parser.ipynb's grammar, with a unary, a ternary and several
+# multiword rules
+NOTEBOOK = {
+    "S": {("VP",)},
+    "VP": {("Verb", "NP"), ("Verb", "PP"), ("Verb",)},
+    "NP": {("Det", "Noun"), ("Det", "Adj", "Noun"), ("Pronoun",)},
+    "PP": {("Preposition", "NP")},
+    "Det": {"ang", "usa ka"},
+    "Noun": {"kuting", "iro", "tao", "teleskopyo"},
+    "Pronoun": {"ako", "ikaw", "siya"},
+    "Verb": {"nag kuting", "nag tan-aw", "nag kaon", "nag mag", "mag kaon", "nag", "mag"},
+    "Adj": {"maayong", "gamay"},
+    "Preposition": {"sa", "uban sa"},
+}
+
+
+def with_filler(grammar, rules):
+    """`grammar` with `rules` more groups of long rules, unary chains and
+    multiword terminals, the shapes compiling has work to do on."""
+    grammar = dict(grammar)
+    for i in range(rules):
+        x, y, z = "X" + str(i), "Y" + str(i), "Z" + str(i)
+        grammar[x] = {(y, z, "NP", "PP"), (y, "Adj", z), (y,)}
+        grammar[y] = {(z,), "y" + str(i) + " sa"}
+        grammar[z] = {("NP",), "z" + str(i)}
+    return grammar
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time to compile grammars into CNF against loading them from the cache")
+    parser.add_argument("--filler", type=int, nargs="+", default=[0, 100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print("{:>8} {:>8} {:>12} {:>12} {:>12}".format("rules", "symbols", "compile ms", "load ms", "index ms"))
+    with tempfile.TemporaryDirectory() as directory:
+        for filler in args.filler:
+            grammar = with_filler(NOTEBOOK, filler)
+            rules = sum(len(productions) for productions in grammar.values())
+            compile_time = load_time = index_time = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                compiled = compile_rules(grammar)
+                compile_time = min(compile_time, time.perf_counter() - start)
+                cached_grammar(grammar, "S", directory)
+                start = time.perf_counter()
+                loaded = cached_grammar(grammar, "S", directory)
+                load_time = min(load_time, time.perf_counter() - start)
+                start = time.perf_counter()
+                Grammar(loaded)
+                index_time = min(index_time, time.perf_counter() - start)
+                for name in os.listdir(directory):
+                    os.remove(os.path.join(directory, name))
+            assert loaded.binary == compiled.binary and loaded.unary == compiled.unary
+            print("{:>8} {:>8} {:>12.2f} {:>12.2f} {:>12.2f}".format(
+                rules, len(compiled.symbols), compile_time * 1000, load_time * 1000, index_time * 1000))
@@ -0,0 +1,52 @@
+import argparse
+import io
+import time
+
+from corpus import GOLDEN, sentences
+from parsugbo.parser import Parser
+from parsugbo.visitors import SemanticAnalyzer
+
+
+def visit_all(trees, compact):
+    analyzer = SemanticAnalyzer(compact)
+    return [analyzer.visit(tree) for tree in trees]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Output bytes and visit time per sentence, full and compact")
+    parser.add_argument("--corpus", default=GOLDEN)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    # parsed once up front so only visiting is timed
+    trees = []
+    for text in sentences(args.corpus):
+        try:
+            errors, tree = Parser().parse(text)
+        except Exception:
+            continue
+        if tree is not None:
+            trees.append(tree)
+
+    # the modes take turns, best round kept, so drift on a busy machine
+    # hits both alike
+    best = {False: float("inf"), True: float("inf")}
+    for _ in range(args.rounds):
+        for compact in (False, True):
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                nodes = visit_all(trees, compact)
+            best[compact] = min(best[compact], time.perf_counter() - start)
+
+    print("{:<8} {:>14} {:>16}".format("mode", "bytes/sentence", "visit us/sentence"))
+    for compact in (False, True):
+        out = io.StringIO()
+        for node in visit_all(trees, compact):
+            node.write(out)
+        size = len(out.getvalue().encode("utf-8"))
+        print(
+            "{:<8} {:>14.0f} {:>16.1f}".format(
+                "compact" if compact else "full", size / len(trees), best[compact] * 1e6 / (len(trees) * args.repeat)
+            )
+        )
@@ -0,0 +1,29 @@
+import argparse
+import time
+
+from bench_cky import GRAMMAR, sentence
+from parsugbo.cky import CKYParser
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Size and time of the packed forest as ambiguity grows")
+    parser.add_argument("--phrases", type=int, nargs="+", default=[2, 8, 16, 32, 64])
+    args = parser.parse_args()
+
+    engine = CKYParser(GRAMMAR)
+    print("{:>8} {:>24} {:>14} {:>10} {:>10} {:>14}".format(
+        "phrases", "parses", "backpointers", "parse ms", "count ms", "first tree ms"))
+    for phrases in args.phrases:
+        words = sentence(phrases).split()
+        start = time.perf_counter()
+        chart = engine.parse(words)
+        parse = time.perf_counter() - start
+        start = time.perf_counter()
+        parses = chart.count()
+        count = time.perf_counter() - start
+        start = time.perf_counter()
+        chart.tree()
+        first = time.perf_counter() - start
+        pointers = sum(len(splits) for entries in chart.back if entries for splits in entries.values())
+        print("{:>8} {:>24.4g} {:>14} {:>10.2f} {:>10.2f} {:>14.2f}".format(
+            phrases, parses, pointers, parse * 1000, count * 1000, first * 1000))
@@ -0,0 +1,30 @@
+import argparse
+import time
+
+from corpus import RAW_DATASET, sentences
+from parsugbo.lexer import TOKEN_EOF, Lexer, RegexLexer
+
+
+def lex_all(lexer_class, corpus):
+    count = 0
+    for text in corpus:
+        lexer = lexer_class(text)
+        while TOKEN_EOF not in lexer.get_next_token().types:
+            count += 1
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tokens/sec of the lexer implementations")
+    parser.add_argument("--corpus", default=RAW_DATASET)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    corpus = list(sentences(args.corpus))
+    # first pass fills the lexical-analysis cache so only scanning is timed
+    lex_all(Lexer, corpus)
+    for lexer_class in (Lexer, RegexLexer):
+        start = time.perf_counter()
+        tokens = sum(lex_all(lexer_class, corpus) for _ in range(args.repeat))
+        elapsed = time.perf_counter() - start
+        print("{:<12} {:>10.0f} tokens/sec".format(lexer_class.__name__, tokens / elapsed))
@@ -0,0 +1,83 @@
+import argparse
+import gc
+import tracemalloc
+
+from corpus import RAW_DATASET, sentences
+from parsugbo.parser import Parser
+
+# plain stand-ins of the slotted classes, keeping their attributes in a
+# per-instance __dict__ as Token, Error and the AST classes did before they
+# were slotted
+DICT_CLASSES = {}
+
+
+def slots(kind):
+    return [name for klass in kind.__mro__ for name in getattr(klass, "__slots__", ())]
+
+
+def rebuild(value, dict_backed: bool):
+    """A copy of the objects of a parse result, in the slotted layout or the
+    dict-backed one. Strings and numbers are shared with `value`, so the two
+    copies differ only in how their objects are laid out."""
+    kind = type(value)
+    if kind is list:
+        return [rebuild(item, dict_backed) for item in value]
+    if kind is tuple:
+        return tuple(rebuild(item, dict_backed) for item in value)
+    names = slots(kind)
+    if not names:
+        return value
+    if dict_backed:
+        if kind not in DICT_CLASSES:
+            DICT_CLASSES[kind] = type(kind.__name__, (object,), {})
+        copy = object.__new__(DICT_CLASSES[kind])
+        for name in names:
+            if hasattr(value, name):
+                copy.__dict__[name] = rebuild(getattr(value, name), dict_backed)
+    else:
+        copy = object.__new__(kind)
+        for name in names:
+            if hasattr(value, name):
+                setattr(copy, name, rebuild(getattr(value, name), dict_backed))
+    return copy
+
+
+def resident(build):
+    """Bytes still allocated after `build()`, with its result kept."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, kept
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resident bytes per parsed sentence")
+    parser.add_argument("--corpus", default=RAW_DATASET)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    # warm the lexical-analysis cache so it is not counted against the trees,
+    # and leave out sentences the parser cannot handle
+    corpus = []
+    for text in sentences(args.corpus):
+        try:
+            Parser().parse(text)
+        except Exception:
+            continue
+        corpus.append(text)
+
+    size, kept = resident(lambda: [Parser().parse(text) for _ in range(args.repeat) for text in corpus])
+    slotted, copies = resident(lambda: [rebuild(result, False) for result in kept])
+    del copies
+    dict_backed, copies = resident(lambda: [rebuild(result, True) for result in kept])
+
+    print("sentences parsed          : {}".format(len(kept)))
+    print("bytes / sentence          : {:.0f}".format(size / len(kept)))
+    print("object bytes / sentence")
+    print("  before, __dict__        : {:.0f}".format(dict_backed / len(kept)))
+    print("  after, __slots__        : {:.0f}".format(slotted / len(kept)))
+    print("  saved                   : {:.0%}".format(1 - slotted / dict_backed))
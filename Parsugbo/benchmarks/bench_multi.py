@@ -0,0 +1,89 @@
+import argparse
+import time
+from collections import Counter
+
+from corpus import RAW_DATASET, sentences
+from parsugbo.parser import AST, NounPhraseSingularPlural, Parser, VerbComplex, Word
+from parsugbo.visitors import MultiVisitor, NodeVisitor, SemanticAnalyzer
+
+
+class Statistics(NodeVisitor):
+    """Counts over the nodes it handles, walking down to them through
+    generic_visit when run alone."""
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def visit_NoneType(self, node):
+        return None
+
+    def generic_visit(self, node: AST):
+        for name in node.__slots__:
+            child = getattr(node, name)
+            if type(child) == list:
+                for v in child:
+                    if isinstance(v, AST):
+                        self.visit(v)
+            elif isinstance(child, AST):
+                self.visit(child)
+
+
+class WordTypes(Statistics):
+    def visit_Word(self, node: Word):
+        if node.content is not None:
+            self.counts[node.type] += 1
+
+
+class VerbTenses(Statistics):
+    def visit_VerbComplex(self, node: VerbComplex):
+        self.counts[node.prefix.type] += 1
+
+
+class NounPhrases(Statistics):
+    def visit_NounPhraseSingularPlural(self, node: NounPhraseSingularPlural):
+        self.counts[node.type] += 1
+        self.generic_visit(node)
+
+    def visit_Word(self, node: Word):
+        pass
+
+
+def visitors():
+    return [SemanticAnalyzer(), WordTypes(), VerbTenses(), NounPhrases()]
+
+
+def separate(trees):
+    walks = visitors()
+    for tree in trees:
+        for visitor in walks:
+            visitor.visit(tree)
+
+
+def fused(trees):
+    walk = MultiVisitor(*visitors())
+    for tree in trees:
+        walk.visit(tree)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Trees/sec of SemanticAnalyzer and three statistics visitors, one walk each and in one walk")
+    parser.add_argument("--corpus", default=RAW_DATASET)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    # parsed once up front so only visiting is timed
+    trees = []
+    for text in sentences(args.corpus):
+        try:
+            errors, tree = Parser().parse(text, check=False)
+        except Exception:
+            continue
+        if tree is not None:
+            trees.append(tree)
+
+    for name, run in (("separate", separate), ("fused", fused)):
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            run(trees)
+        elapsed = time.perf_counter() - start
+        print("{:<10} {:>10.0f} trees/sec".format(name, len(trees) * args.repeat / elapsed))
@@ -0,0 +1,74 @@
+import argparse
+import os
+import time
+
+from corpus import GOLDEN, ROOT
+from parsugbo.cky import CKYParser
+from parsugbo.pcfg import bracket_scores, read_treebank, train, words
+
+TESTDATA = os.path.join(ROOT, "Dataset", "01_testdata.txt")
+
+
+def held_out(base, gold, unknown, seen=False):
+    """A parser per test tree, trained on `base` and every other test tree
+    (or on all of them, with `seen`)."""
+    if seen:
+        engine = CKYParser(train(base + gold, unknown=unknown))
+        return [engine] * len(gold)
+    return [CKYParser(train(base + gold[:i] + gold[i + 1 :], unknown=unknown)) for i in range(len(gold))]
+
+
+def timed(parse, engines, sentences, repeat):
+    """Best time of `repeat` passes of `parse(engine, sentence)` over the
+    sentences, and the results of the last."""
+    seconds = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [parse(engine, sentence) for engine, sentence in zip(engines, sentences)]
+        seconds = min(seconds, time.perf_counter() - start)
+    return seconds, results
+
+
+def first_parse(engine, sentence):
+    chart = engine.parse(sentence)
+    return chart.count(), chart.tree()
+
+
+def viterbi(engine, sentence):
+    tree = engine.viterbi(sentence).tree()
+    return int(tree is not None), tree
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Held-out Viterbi parses of a treebank PCFG against the first of every parse")
+    parser.add_argument("--train", nargs="*", default=[TESTDATA], help="treebanks always trained on")
+    parser.add_argument("--test", default=GOLDEN, help="treebank to parse and score, each tree held out of training in turn")
+    parser.add_argument("--seen", action="store_true", help="train on the test trees too, so they are not held out")
+    parser.add_argument("--unknown", type=int, default=1, help="words seen at most this often train the unknown word")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    base = []
+    for path in args.train:
+        base.extend(read_treebank(path))
+    gold = read_treebank(args.test)
+    sentences = [" ".join(words(tree)).lower() for tree in gold]
+    engines = held_out(base, gold, args.unknown, args.seen)
+    print("{} trees trained on, {} test sentences {}".format(
+        len(base) + len(gold) - (0 if args.seen else 1), len(gold),
+        "also trained on" if args.seen else "each held out of training"))
+
+    runs = [
+        ("first parse", first_parse, engines),
+        ("viterbi", viterbi, engines),
+        ("viterbi, no <unk>", viterbi, held_out(base, gold, 0, args.seen)),
+    ]
+    print("{:>18} {:>8} {:>10} {:>10} {:>10} {:>10} {:>10}".format(
+        "", "parsed", "parses", "ms", "precision", "recall", "F1"))
+    for name, parse, parsers in runs:
+        seconds, results = timed(parse, parsers, sentences, args.repeat)
+        trees = [tree for count, tree in results]
+        precision, recall, f1 = bracket_scores(gold, trees)
+        parsed = sum(tree is not None for tree in trees)
+        print("{:>18} {:>8} {:>10.4g} {:>10.2f} {:>10.3f} {:>10.3f} {:>10.3f}".format(
+            name, "{}/{}".format(parsed, len(gold)), sum(count for count, tree in results), seconds * 1000, precision, recall, f1))
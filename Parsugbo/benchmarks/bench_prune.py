@@ -0,0 +1,92 @@
+import argparse
+import statistics
+import time
+
+from bench_pcfg import TESTDATA, held_out
+from corpus import GOLDEN
+from parsugbo.cky import PruneStats
+from parsugbo.pcfg import bracket_scores, read_treebank, words
+
+
+def best_trees(engines, sentences, options):
+    """The pruning stats and best tree of each sentence, parsed by its own
+    engine."""
+    stats = PruneStats()
+    best = []
+    for engine, sentence in zip(engines, sentences):
+        chart = engine.viterbi(sentence, **options)
+        stats.add(chart.stats)
+        best.append(chart.tree())
+    return stats, best
+
+
+def timings(engine, sentences, settings, rounds):
+    """Seconds of each round of parsing `sentences` under each of the
+    (name, options) `settings`. The settings take turns within a round, so
+    drift on a busy machine hits them alike; a first round warms up and is
+    left out."""
+    times = {name: [] for name, options in settings}
+    for _ in range(rounds + 1):
+        for name, options in settings:
+            start = time.perf_counter()
+            for sentence in sentences:
+                engine.viterbi(sentence, **options)
+            times[name].append(time.perf_counter() - start)
+    return {name: seconds[1:] for name, seconds in times.items()}
+
+
+def settings(args):
+    yield "none", {}
+    for beam in args.beam:
+        yield "beam {}".format(beam), {"beam": beam}
+    for threshold in args.threshold:
+        yield "threshold {:g}".format(threshold), {"threshold": threshold}
+    for max_span in args.max_span:
+        yield "max span {}".format(max_span), {"max_span": max_span}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Held-out accuracy against speed of pruned Viterbi parses on a treebank")
+    parser.add_argument("--train", nargs="*", default=[TESTDATA], help="treebanks always trained on")
+    parser.add_argument("--test", default=GOLDEN, help="treebank to parse and score, each tree held out of training in turn")
+    parser.add_argument("--beam", type=int, nargs="*", default=[4, 8, 16, 24, 32])
+    parser.add_argument("--threshold", type=float, nargs="*", default=[-4, -5, -6, -7, -8])
+    parser.add_argument("--max-span", type=int, nargs="*", default=[3, 5, 7, 9])
+    parser.add_argument("--join", type=int, default=10, help="golden sentences per long sentence")
+    parser.add_argument("--rounds", type=int, default=20, help="timed passes over the long sentences per setting")
+    args = parser.parse_args()
+
+    base = []
+    for path in args.train:
+        base.extend(read_treebank(path))
+    gold = read_treebank(args.test)
+    sentences = [" ".join(words(tree)).lower() for tree in gold]
+    named = list(settings(args))
+
+    print("{} test sentences, each held out of training".format(len(gold)))
+    print("{:>14} {:>8} {:>10} {:>8} {:>8} {:>8}".format("pruning", "parsed", "pruned", "prec", "recall", "F1"))
+    engines = held_out(base, gold, 1)
+    for name, options in named:
+        stats, best = best_trees(engines, sentences, options)
+        precision, recall, f1 = bracket_scores(gold, best)
+        print("{:>14} {:>8} {:>10.1%} {:>8.3f} {:>8.3f} {:>8.3f}".format(
+            name, "{}/{}".format(sum(tree is not None for tree in best), len(gold)), stats.pruned_rate,
+            precision, recall, f1))
+
+    # the golden sentences are short; joined they fill charts the size of
+    # long scraped sentences, which no tree spans but whose cells are
+    # filled all the same. Held out or not makes no odds to the time, so
+    # one grammar trained on everything parses them
+    engine = held_out(base, gold, 1, seen=True)[0]
+    joined = [" ".join(sentences[i : i + args.join]) for i in range(0, len(sentences), args.join)]
+    print()
+    print("{} sentences of {} golden sentences each, {:.0f} words on average, {} rounds".format(
+        len(joined), args.join, sum(len(sentence.split()) for sentence in joined) / len(joined), args.rounds))
+    print("{:>14} {:>10} {:>10} {:>10} {:>8} {:>10}".format("pruning", "median ms", "min ms", "max ms", "speedup", "pruned"))
+    times = timings(engine, joined, named, args.rounds)
+    baseline = statistics.median(times["none"])
+    for name, options in named:
+        stats, best = best_trees([engine] * len(joined), joined, options)
+        median = statistics.median(times[name])
+        print("{:>14} {:>10.2f} {:>10.2f} {:>10.2f} {:>8.2f} {:>10.1%}".format(
+            name, median * 1000, min(times[name]) * 1000, max(times[name]) * 1000, baseline / median, stats.pruned_rate))
@@ -0,0 +1,50 @@
+import argparse
+import time
+
+from parsugbo.lexer import RegexLexer, TokenArray
+from parsugbo.parser import Parser
+
+# a sentence with `n` coordinated noun phrases, each with a prepositional phrase
+SENTENCE = lambda n: "nagkaon " + ", ".join(["ang bata sa balay"] * n)
+
+# typed one character at a time into the sentence
+TYPED = " ang iro"
+
+
+def keystrokes(text, where):
+    """(offset, deleted, inserted) edits typing TYPED at the end of the
+    sentence or in its middle, then deleting it again."""
+    offset = len(text) if where == "end" else text.index(",", len(text) // 2)
+    edits = [(offset + i, 0, c) for i, c in enumerate(TYPED)]
+    edits += [(offset + i, 1, "") for i in reversed(range(len(TYPED)))]
+    return edits
+
+
+def run(text, where, check):
+    # long sentences need more token matches than the default budget
+    parser = Parser(max_steps=None)
+    edits = keystrokes(text, where)
+    _, _, tokens = parser.parse_editable(text, check)
+    start = time.perf_counter()
+    for offset, deleted, inserted in edits:
+        parser.reparse(tokens, offset, deleted, inserted, check)
+    incremental = time.perf_counter() - start
+    start = time.perf_counter()
+    for offset, deleted, inserted in edits:
+        text = text[:offset] + inserted + text[offset + deleted :]
+        parser.parse_tokens(TokenArray.from_text(text, RegexLexer), check)
+    full = time.perf_counter() - start
+    return incremental / len(edits), full / len(edits)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-keystroke reparse time against parsing from scratch")
+    parser.add_argument("--items", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--check", action="store_true", help="include the grammar checks")
+    args = parser.parse_args()
+
+    print("{:<8} {:>6} {:>14} {:>14}".format("typing", "items", "reparse ms", "full parse ms"))
+    for where in ("end", "middle"):
+        for n in args.items:
+            incremental, full = run(SENTENCE(n), where, args.check)
+            print("{:<8} {:>6} {:>14.3f} {:>14.3f}".format(where, n, incremental * 1000, full * 1000))
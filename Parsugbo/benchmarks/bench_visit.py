@@ -0,0 +1,43 @@
+import argparse
+import time
+
+from corpus import RAW_DATASET, sentences
+from parsugbo.parser import Parser
+from parsugbo.visitors import SemanticAnalyzer
+
+
+class GetattrAnalyzer(SemanticAnalyzer):
+    """SemanticAnalyzer with the old lookup: a method name built and
+    resolved for every node."""
+
+    def visit(self, node):
+        return getattr(self, "visit_" + type(node).__name__, self.generic_visit)(node)
+
+
+def visit_all(analyzer_class, trees):
+    for tree in trees:
+        analyzer_class().visit(tree)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Trees/sec of SemanticAnalyzer over a parsed corpus")
+    parser.add_argument("--corpus", default=RAW_DATASET)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    # parsed once up front so only visiting is timed
+    trees = []
+    for text in sentences(args.corpus):
+        try:
+            errors, tree = Parser().parse(text)
+        except Exception:
+            continue
+        if tree is not None:
+            trees.append(tree)
+
+    for analyzer_class in (GetattrAnalyzer, SemanticAnalyzer):
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            visit_all(analyzer_class, trees)
+        elapsed = time.perf_counter() - start
+        print("{:<16} {:>10.0f} trees/sec".format(analyzer_class.__name__, len(trees) * args.repeat / elapsed))
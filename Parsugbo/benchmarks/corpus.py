@@ -0,0 +1,18 @@
+import os
+import re
+
+# repository root, one level above the Parsugbo project
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+RAW_DATASET = os.path.join(ROOT, "Dataset", "04_rawdataset.txt")
+GOLDEN = os.path.join(ROOT, "Evaluation", "golden.txt")
+
+LEAF_PATTERN = re.compile(r"\(\S+ ([^()]+)\)")
+
+
+def sentences(path: str):
+    """Plain sentences recovered from the leaves of a bracketed corpus."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            words = " ".join(LEAF_PATTERN.findall(line)).split()
+            if words:
+                yield " ".join(words).lower()
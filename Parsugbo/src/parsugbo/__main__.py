@@ -1,13 +1,12 @@
 import argparse
+import sys
+from .brackets import LABELS, BracketWriter
 from .parser import Parser
 from .visitors import SemanticAnalyzer
 
 
-def run_parser(text: str):
-    parser = Parser()
-    errors, tree = parser.parse(text)
-
-    long = len(parser.errors)
+def print_result(errors, tree, semantic_analyzer: SemanticAnalyzer):
+    long = len(errors)
     if long == 0:
         print("No errors")
     for x in range(long):
@@ -20,17 +19,58 @@ def run_parser(text: str):
         if errors[x].right_value is not None:
             print("Right values: " + ", ".join(errors[x].right_value))
 
-    semantic_analyzer = SemanticAnalyzer()
     try:
         one = semantic_analyzer.visit(tree)
     except Exception as e:
         print(e)
         raise
-    print(one)
+    if one is not None:
+        one.write(sys.stdout)
+    print()
+
+
+def run_parser(text: str, backtrack: bool = False, compact: bool = False):
+    parser = Parser(backtrack=backtrack)
+    errors, tree = parser.parse(text)
+    print_result(errors, tree, SemanticAnalyzer(compact))
+
+
+def run_file(path: str, jobs: int, lexicon: str | None, backtrack: bool = False, compact: bool = False):
+    texts = read_sentences(path)
+    semantic_analyzer = SemanticAnalyzer(compact)
+    results = Parser(backtrack=backtrack).parse_many(texts, jobs=jobs, lexicon=lexicon)
+    for text, (errors, tree) in zip(texts, results):
+        print(text)
+        print_result(errors, tree, semantic_analyzer)
+
+
+def run_brackets(texts: list[str], jobs: int, lexicon: str | None, backtrack: bool, labels: str):
+    # one bracketed tree per line, as in Evaluation/golden.txt
+    writer = BracketWriter(LABELS[labels], merge=labels == "golden")
+    results = Parser(backtrack=backtrack).parse_many(texts, jobs=jobs, lexicon=lexicon, check=False)
+    writer.write_all((tree for errors, tree in results), sys.stdout)
+
+
+def read_sentences(path: str):
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--input", type=str, help="input string")
+    parser.add_argument("--file", type=str, help="file with one sentence per line")
+    parser.add_argument("--jobs", type=int, default=1, help="worker processes for --file")
+    parser.add_argument("--lexicon", type=str, help="compiled lexicon to load")
+    parser.add_argument("--backtrack", action="store_true", help="try every matching branch of ambiguous rules")
+    parser.add_argument("--compact", action="store_true", help="leave 'Empty' placeholders out of the tree")
+    parser.add_argument("--format", choices=["tree", "brackets"], default="tree", help="print trees indented or bracketed")
+    parser.add_argument("--labels", choices=sorted(LABELS), default="codes", help="bracket labels: Dataset/03_codes.txt or Evaluation/golden.txt")
     args = parser.parse_args()
-    run_parser(args.input)
+    if args.format == "brackets":
+        texts = read_sentences(args.file) if args.file is not None else [args.input]
+        run_brackets(texts, args.jobs, args.lexicon, args.backtrack, args.labels)
+    elif args.file is not None:
+        run_file(args.file, args.jobs, args.lexicon, args.backtrack, args.compact)
+    else:
+        run_parser(args.input, args.backtrack, args.compact)
@@ -0,0 +1,315 @@
+import io
+from .parser import *
+
+###############################################################################
+#                                                                             #
+#  LABELS                                                                     #
+#                                                                             #
+###############################################################################
+
+# Labels are looked up by AST class name for phrases and by word type for
+# leaves. A phrase missing from the map is transparent: its children go
+# straight into the enclosing bracket. A word mapped to None is left out.
+
+# the codes of Dataset/03_codes.txt, with Penn Treebank tags for the parts
+# of speech the list has no code for (adverbs, conjunctions, numbers)
+CODES = {
+    "Sentence": "S",
+    "VerbPhrase": "VP",
+    "NounPhraseSingularPlural": "NP",
+    "DemPronoun": "NP",
+    "Date": "NP",
+    "PrepPhrase": "PP",
+    "Adjective": "JJP",
+    "AdjOrd": "JJP",
+    "AdjNum": "JJP",
+    "Adverb": "ADVP",
+    # verbs by the tense of their prefix
+    "PAST_PREFIX": "VBD",
+    "PRESENT_PREFIX": "VBP",
+    "FUTURE_PREFIX": "VB",
+    TOKEN_IMPERATIVE: "VB",
+    TOKEN_VERB: "VB",
+    TOKEN_NOUN: "NN",
+    TOKEN_TIME_NOUN: "NN",
+    TOKEN_TIME_NOUN_A: "NN",
+    TOKEN_TIME_OF_DAY: "NN",
+    TOKEN_MONTH: "NNP",
+    TOKEN_PRON_PER: "PRP",
+    TOKEN_PRON_PER_PLURAL: "PRP",
+    TOKEN_PRON_POS: "PRP$",
+    TOKEN_PRON_POS_NG: "PRP$",
+    TOKEN_PRON_POS_N: "PRP$",
+    TOKEN_PRON_POS_PLURAL: "PRP$",
+    TOKEN_PRON_POS_PLURAL_NG: "PRP$",
+    TOKEN_PRON_POS_PLURAL_N: "PRP$",
+    TOKEN_PRON_DEM: "DET",
+    TOKEN_DET: "DET",
+    TOKEN_DET_PLURAL: "DET",
+    TOKEN_ANG: "DET",
+    TOKEN_MGA: "DET",
+    TOKEN_PREP: "IN",
+    TOKEN_POS_LINK: "IN",
+    TOKEN_ADJ: "JJ",
+    TOKEN_NIAGING: "JJ",
+    TOKEN_SUNOD: "JJ",
+    TOKEN_KARONG: "JJ",
+    TOKEN_NGA: "PAR",
+    TOKEN_KA: "PAR",
+    TOKEN_AN: "PAR",
+    TOKEN_IKA: "PAR",
+    TOKEN_CLIT_NG: "PAR",
+    TOKEN_CLIT_Y: "PAR",
+    TOKEN_DILI: "NEG",
+    TOKEN_ADV: "RB",
+    TOKEN_ADV_SPE: "RB",
+    TOKEN_PLACE: "RB",
+    TOKEN_TIME: "RB",
+    TOKEN_CONJ: "CC",
+    TOKEN_UG: "CC",
+    TOKEN_NUM: "CD",
+    TOKEN_DAY: "CD",
+    TOKEN_YEAR: "CD",
+    TOKEN_HOUR: "CD",
+    TOKEN_COMMA: ",",
+    # the dash of "ika-" and the "ng" of "gamayng" are split off by the
+    # parser, not written in the sentence
+    TOKEN_DASH: None,
+    "NG_PREFIX": None,
+}
+
+# the labels of Evaluation/golden.txt; use with merge=True, since the golden
+# trees put runs such as "usa ka" or "gamay nga" under one label. Every word
+# type the parser writes is listed, so nothing outside the golden label set
+# gets through; the golden trees have no punctuation
+GOLDEN_LABELS = {
+    "Sentence": "S",
+    "VerbPhrase": "VP",
+    "NounPhraseSingularPlural": "NP",
+    "DemPronoun": "NP",
+    "Date": "NP",
+    "PrepPhrase": "PP",
+    "Adverb": "AdvP",
+    TOKEN_VERB: "V",
+    TOKEN_NOUN: "N",
+    TOKEN_MONTH: "N",
+    TOKEN_DAY: "N",
+    TOKEN_YEAR: "N",
+    TOKEN_HOUR: "N",
+    TOKEN_TIME_NOUN: "N",
+    TOKEN_TIME_NOUN_A: "N",
+    TOKEN_TIME_OF_DAY: "N",
+    TOKEN_PRON_PER: "N",
+    TOKEN_PRON_PER_PLURAL: "N",
+    TOKEN_PRON_DEM: "N",
+    TOKEN_PRON_POS: "Det",
+    TOKEN_PRON_POS_NG: "Det",
+    TOKEN_PRON_POS_N: "Det",
+    TOKEN_PRON_POS_PLURAL: "Det",
+    TOKEN_PRON_POS_PLURAL_NG: "Det",
+    TOKEN_PRON_POS_PLURAL_N: "Det",
+    TOKEN_DET: "Det",
+    TOKEN_DET_PLURAL: "Det",
+    TOKEN_ANG: "Det",
+    TOKEN_MGA: "Det",
+    TOKEN_NUM: "Det",
+    TOKEN_KA: "Det",
+    TOKEN_AN: "Det",
+    TOKEN_IKA: "Det",
+    TOKEN_CLIT_NG: "Det",
+    TOKEN_CLIT_Y: "Det",
+    TOKEN_PREP: "P",
+    TOKEN_POS_LINK: "P",
+    TOKEN_ADJ: "Adj",
+    TOKEN_NGA: "Adj",
+    TOKEN_NIAGING: "Adj",
+    TOKEN_SUNOD: "Adj",
+    TOKEN_KARONG: "Adj",
+    TOKEN_ADV: "Adv",
+    TOKEN_ADV_SPE: "Adv",
+    TOKEN_TIME: "Adv",
+    TOKEN_PLACE: "Adv",
+    TOKEN_INT: "Adv",
+    TOKEN_DILI: "Neg",
+    TOKEN_CONJ: "C",
+    TOKEN_UG: "C",
+    TOKEN_COMMA: None,
+    TOKEN_DASH: None,
+    "NG_PREFIX": None,
+}
+
+LABELS = {"codes": CODES, "golden": GOLDEN_LABELS}
+
+###############################################################################
+#                                                                             #
+#  SURFACE ORDER                                                              #
+#                                                                             #
+###############################################################################
+
+# child fields of each phrase in the order their words appear in the sentence
+SURFACE_ORDER = {
+    SentencePart: ("left", "conj", "right"),
+    NounPhrasePart: ("left", "conj", "right"),
+    Sentence: ("pred_phrase", "noun_phrase"),
+    PredPhrase: ("pred", "mid_adv", "verb_phr", "adv"),
+    Predicate: ("content",),
+    Descriptive: ("content",),
+    Adverb: ("content", "addition"),
+    Time: ("noun", "number", "day"),
+    Date: ("month", "day", "comma", "year"),
+    NounPhrase: ("complex_noun", "nga", "clause", "prep_phrase"),
+    VerbPhrase: ("complex_verb", "opt"),
+    PrepPhrase: ("prep", "second_prep", "noun_phrase", "adv", "extra"),
+    Possess: ("link", "noun"),
+    AdjOrd: ("marker", "dash", "number", "nga"),
+    AdjNum: ("number", "ka"),
+    Noun: ("mga", "adjective", "nouns", "possess"),
+    CompoundNoun: ("noun_phrase", "extra", "other_phrase"),
+    NounPhraseSingularPlural: ("start", "pos", "ordinal", "number", "mga", "noun_sp", "extra"),
+    DemPronoun: ("pronoun", "clit", "ordinal", "number", "mga"),
+}
+
+# "ika-5 sa Enero, 2024"
+SPANISH_DATE = ("extra", "day", "sa", "month", "comma", "year")
+
+
+def surface_children(node: AST):
+    """The children of `node` in sentence order."""
+    kind = type(node)
+    if kind is Adjective:
+        # adjectives and their linkers alternate
+        children = []
+        for i, adjective in enumerate(node.adjectives):
+            children.append(adjective)
+            if i < len(node.nga):
+                children.append(node.nga[i])
+        children.append(node.clit_ng)
+        return children
+    if kind is AdjNum and type(node.number) == list and node.conj is not None:
+        # ka NUM an ug NUM ka
+        return node.number[:3] + [node.conj] + node.number[3:] + [node.ka]
+    if kind is Date and node.type == "Spanish":
+        return [getattr(node, name) for name in SPANISH_DATE]
+    return [getattr(node, name) for name in SURFACE_ORDER[kind]]
+
+
+###############################################################################
+#                                                                             #
+#  BRACKET WRITER                                                             #
+#                                                                             #
+###############################################################################
+
+# marks the end of a labelled phrase on the walk stack
+CLOSE = object()
+
+
+class BracketWriter(object):
+    """Writes ASTs as one-line bracketed trees such as
+    `(S (VP (VBD nagkaon)) (NP (DET ang) (NN bata)))`.
+
+    The tree is walked once, iteratively, and written to the stream as it
+    goes. A phrase's bracket is only written once its first word is, so
+    phrases the sentence leaves empty don't show up. A verb is written as a
+    single word, prefix and suffix included.
+
+    With `merge`, consecutive words with the same label in the same phrase
+    share one bracket, as in `(Det usa ka)`.
+    """
+
+    def __init__(self, labels: dict | None = None, merge: bool = False):
+        self.labels = CODES if labels is None else labels
+        self.merge = merge
+
+    def root_label(self):
+        return self.labels.get("Sentence") or "S"
+
+    def write(self, tree: AST | None, out):
+        """Write `tree` to the text stream `out`, without a newline."""
+        labels, merge = self.labels, self.merge
+        # a single sentence is written without its SentencePart wrapper
+        while type(tree) is SentencePart and tree.conj is None and tree.right is None:
+            tree = tree.left
+        # brackets opened on the walk but not written yet
+        pending = []
+        if tree is None or labels.get(type(tree).__name__) is None:
+            # several sentences, or a phrase with no label of its own
+            pending.append(self.root_label())
+            stack = [CLOSE, tree]
+        else:
+            stack = [tree]
+        # [label, words] of the last word, held back while merging
+        held = None
+        sep = ""
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            if node is CLOSE:
+                if pending:
+                    pending.pop()
+                    if not sep and not stack:
+                        # nothing at all in the tree
+                        out.write("(" + self.root_label() + ")")
+                        sep = " "
+                    continue
+                if held is not None:
+                    out.write(sep + "(" + held[0] + " " + " ".join(held[1]) + ")")
+                    held = None
+                out.write(")")
+                continue
+            kind = type(node)
+            if kind is list:
+                stack.extend(reversed(node))
+                continue
+            if kind is Word:
+                content = node.content
+                if content is None:
+                    continue
+                label = labels.get(node.type, node.type)
+                text = str(content.value) if type(content) is Token else content
+            elif kind is VerbComplex:
+                root = node.root.content
+                prefix, suffix = node.prefix, node.suffix
+                text = (prefix.content or "") + root.value + (suffix.content or "")
+                label = labels.get(prefix.type.partition(",")[0])
+                if label is None:
+                    label = labels.get(TOKEN_VERB, TOKEN_VERB)
+                if node.extra is not None:
+                    stack.append(node.extra)
+            else:
+                label = labels.get(kind.__name__)
+                if label is not None:
+                    pending.append(label)
+                    stack.append(CLOSE)
+                stack.extend(reversed(surface_children(node)))
+                continue
+            if label is None:
+                continue
+            if merge and held is not None and not pending and held[0] == label:
+                held[1].append(text)
+                continue
+            if held is not None:
+                out.write(sep + "(" + held[0] + " " + " ".join(held[1]) + ")")
+                held = None
+            for opened in pending:
+                out.write(sep + "(" + opened)
+                sep = " "
+            pending.clear()
+            if merge:
+                held = [label, [text]]
+            else:
+                out.write(sep + "(" + label + " " + text + ")")
+                sep = " "
+
+    def dumps(self, tree: AST | None):
+        """`tree` as a bracket string."""
+        out = io.StringIO()
+        self.write(tree, out)
+        return out.getvalue()
+
+    def write_all(self, trees, out):
+        """Write each tree on its own line, in the layout of
+        Evaluation/golden.txt."""
+        for tree in trees:
+            self.write(tree, out)
+            out.write("\n")
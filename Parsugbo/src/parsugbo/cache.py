@@ -0,0 +1,97 @@
+from collections import OrderedDict
+
+###############################################################################
+#                                                                             #
+#  LEXICAL ANALYSIS CACHE                                                     #
+#                                                                             #
+###############################################################################
+
+EVICTION_LRU = "lru"
+EVICTION_FIFO = "fifo"
+
+
+class CacheStats(object):
+    def __init__(self, hits=0, misses=0, evictions=0, size=0, maxsize=0):
+        self.hits = hits
+        self.misses = misses
+        self.evictions = evictions
+        self.size = size
+        self.maxsize = maxsize
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __str__(self):
+        return "CacheStats(hits={}, misses={}, evictions={}, size={}/{}, hit_rate={:.2%})".format(
+            self.hits, self.misses, self.evictions, self.size, self.maxsize, self.hit_rate
+        )
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class LexiconCache(object):
+    """Size-bounded cache from a surface form to its lexical analysis.
+
+    With the "lru" policy a hit moves the entry to the back of the eviction
+    queue; with "fifo" entries leave in insertion order regardless of use.
+    A maxsize of 0 disables caching.
+    """
+
+    def __init__(self, maxsize: int = 65536, policy: str = EVICTION_LRU):
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.configure(maxsize, policy)
+
+    def configure(self, maxsize: int | None = None, policy: str | None = None):
+        if policy is not None:
+            if policy not in (EVICTION_LRU, EVICTION_FIFO):
+                raise ValueError("Unknown eviction policy: " + str(policy))
+            self.policy = policy
+        if maxsize is not None:
+            if maxsize < 0:
+                raise ValueError("Cache size must not be negative")
+            self.maxsize = maxsize
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def get(self, key: str):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if self.policy == EVICTION_LRU:
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, value):
+        if self.maxsize == 0:
+            return
+        if key in self.entries:
+            self.entries[key] = value
+            if self.policy == EVICTION_LRU:
+                self.entries.move_to_end(key)
+            return
+        if len(self.entries) >= self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        self.entries[key] = value
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        return CacheStats(self.hits, self.misses, self.evictions, len(self.entries), self.maxsize)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
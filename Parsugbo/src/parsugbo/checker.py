@@ -0,0 +1,361 @@
+from .parser import *
+
+###############################################################################
+#                                                                             #
+#  GRAMMAR CHECKS                                                             #
+#                                                                             #
+###############################################################################
+
+# children in the order the parser finishes them, where that differs from
+# the order of the node's fields
+CHILD_ORDER = {
+    PredPhrase: ("pred", "mid_adv", "verb_phr", "adv"),
+    NounPhrase: ("complex_noun", "nga", "clause", "prep_phrase"),
+    CompoundNoun: ("noun_phrase", "extra", "other_phrase"),
+}
+
+
+class Checker(object):
+    """Agreement, tense, hour and date checks over a finished AST.
+
+    The parser only reports what it cannot match; everything that needs a
+    complete phrase to judge is checked here, node by node in the order the
+    parser completes them, so the errors come out in the order the parser
+    used to report them.
+    """
+
+    def __init__(self):
+        self.errors = []
+
+    def check(self, tree: AST, clean: set | None = None):
+        """Return the errors found in `tree`.
+
+        `clean` holds phrases already checked without errors, which are not
+        walked again; it is refilled with the clean phrases of `tree`, so a
+        tree sharing most of its phrases with the last one (see
+        Parser.reparse) costs only what changed.
+        """
+        self.errors = []
+        # iterative walk, since long coordinated chains are deep: nodes are
+        # taken parent first with children pushed left to right, so the
+        # reversed visit order is the post-order the parser completes them in
+        found = []
+        stack = [tree]
+        # (phrase, first index in `found`) is pushed under a phrase's
+        # children and popped once its whole subtree has been walked
+        phrases = []
+        kept = set()
+        checks, fields_of = CHECKS, FIELDS.get
+        while stack:
+            node = stack.pop()
+            kind = type(node)
+            if kind is tuple:
+                phrases.append((node[0], node[1], len(found)))
+                continue
+            if clean is not None and kind in PHRASES:
+                if node in clean:
+                    kept.add(node)
+                    continue
+                stack.append((node, len(found)))
+            if kind in checks:
+                found.append(node)
+            fields = fields_of(kind)
+            if fields is None:
+                fields = FIELDS[kind] = child_fields(kind)
+            for name in fields:
+                child = getattr(node, name)
+                if type(child) == list:
+                    stack.extend(c for c in child if isinstance(c, AST) and type(c) is not Word)
+                elif child is not None and type(child) is not Word:
+                    stack.append(child)
+        if clean is None:
+            for node in reversed(found):
+                checks[type(node)](self, node)
+            return self.errors
+        # errors found from each index of `found` on, to tell which phrases
+        # had none
+        since = [0] * (len(found) + 1)
+        for i in reversed(range(len(found))):
+            checks[type(found[i])](self, found[i])
+            since[i] = len(self.errors)
+        for node, first, end in phrases:
+            if since[first] == since[end]:
+                kept.add(node)
+        clean.clear()
+        clean.update(kept)
+        return self.errors
+
+    def check_sentence(self, node: Sentence):
+        self.agreement(node.pred_phrase, node.noun_phrase)
+
+    def check_pred_phrase(self, node: PredPhrase):
+        self.tenses(node.verb_phr, node.adv)
+
+    def check_time(self, node: Time):
+        if type(node.noun) == list and node.noun[0].type == TOKEN_HOUR:
+            self.hour_condition(node.noun[0].content, node.day.content)
+
+    def check_date(self, node: Date):
+        year = node.year.content.value if node.year is not None else None
+        self.date_condition(node.month.content.value, node.day.content.value, year)
+
+    def agreement(self, pred_phrase, noun_phrase):
+        # singular/plural verb prefixes must agree with the subject
+        if pred_phrase.verb_phr is not None:
+            pref = pred_phrase.verb_phr.complex_verb.prefix.content
+            opt = pred_phrase.verb_phr.opt
+            # a prepositional object leaves the sentence's own noun phrase
+            # as the subject
+            noun = opt if type(opt) is NounPhrasePart else noun_phrase
+            if pref is None or type(noun) is not NounPhrasePart:
+                return
+            number = grammatical_number(noun.left)
+            if (
+                pref in ["nang", "mang"]
+                and number == "Singular"
+                and noun.conj is None
+            ):
+                self.errors.append(
+                    Error(
+                        "Using a plural prefix for a singular noun",
+                        "Use a singular prefix",
+                        pref + "-",
+                        ["nag-", "naga-", "mag-", "maga-"],
+                    )
+                )
+            elif (
+                pref in ["nag", "naga", "mag", "maga"]
+                and number is not None
+                and (number == "Plural" or noun.conj is not None)
+            ):
+                self.errors.append(
+                    Error(
+                        "Using a singular prefix for a plural noun",
+                        "Use a plural prefix",
+                        pref + "-",
+                        ["nang-", "mang-"],
+                    )
+                )
+
+    def tenses(self, verb, end):
+        if verb is not None:
+            prefix = verb.complex_verb.prefix
+            suffix = verb.complex_verb.suffix
+            if end is not None and type(end.content) == Time:
+                noun = (
+                    end.content.noun.content
+                    if type(end.content.noun) != list
+                    else end.content.noun[0].content
+                )
+                if TOKEN_HOUR not in noun.types:
+                    self.tenses_condition(
+                        noun.value, prefix, suffix, verb.complex_verb.root.content.value
+                    )
+            elif end is not None and type(end.addition) == Time:
+                noun = (
+                    end.addition.noun.content
+                    if type(end.addition.noun) != list
+                    else end.addition.noun[0].content
+                )
+                if TOKEN_HOUR not in noun.types:
+                    self.tenses_condition(
+                        noun.value, prefix, suffix, verb.complex_verb.root.content.value
+                    )
+
+    def tenses_condition(self, given, one, two, root):
+        words_p = words_s = correct = None
+        if given in [TOKEN_NIAGING.lower(), "kaganina", "kagahapon"]:
+            words_p = LITERALS_PAST_PREFIX
+            words_s = LITERALS_PAST_SUFFIX
+            correct = "PAST"
+        elif given in [TOKEN_KARONG.lower(), "karon"]:
+            words_p = LITERALS_PRESENT_PREFIX
+            words_s = LITERALS_PRESENT_SUFFIX
+            correct = "PRESENT"
+        elif given in [TOKEN_SUNOD.lower(), "ugma"]:
+            words_p = LITERALS_FUTURE_PREFIX
+            words_s = LITERALS_FUTURE_SUFFIX
+            correct = "FUTURE"
+        else:
+            # a time word that says nothing of the tense
+            return
+        if (
+            one.content is not None and one.content not in words_p
+        ) and two.content is None:
+            self.errors.append(
+                Error(
+                    one.type + " from root " + root,
+                    correct + "_PREFIX",
+                    one.content,
+                    words_p,
+                )
+            )
+        elif one.content is None and (two.content is not None and two.content in words_s):
+            self.errors.append(
+                Error(
+                    two.type + " from root " + root,
+                    correct + "_SUFFIX",
+                    two.content,
+                    words_s,
+                )
+            )
+        elif one.content is not None and two.content is not None:
+            if one.content not in words_p:
+                self.errors.append(
+                    Error(
+                        one.type + " from root " + root,
+                        correct + "_PREFIX",
+                        one.content,
+                        words_p,
+                    )
+                )
+            if two.content not in words_s:
+                self.errors.append(
+                    Error(
+                        two.type + " from root " + root,
+                        correct + "_SUFFIX",
+                        two.content,
+                        words_s,
+                    )
+                )
+
+    def hour_condition(self, time, day):
+        if time.value in [
+            "uno",
+            "dos",
+            "tres",
+            "kwatro",
+            "singko",
+        ] and day.value not in ["ka-adlawon", "hapon"]:
+            corr = ["ka-adlawon", "hapon"]
+            self.errors.append(
+                Error(
+                    "Wrong part of day for a particular hour",
+                    "Should be " + ", or ".join(corr),
+                    day.value,
+                )
+            )
+        if time.value in [
+            "sais",
+            "siete",
+            "otso",
+            "nuwebe",
+            "diyes",
+            "onse",
+        ] and day.value not in ["gabi-i", "buntag"]:
+            corr = ["gabi-i", "buntag"]
+            self.errors.append(
+                Error(
+                    "Wrong part of day for a particular hour",
+                    "Should be " + ", or ".join(corr),
+                    day.value,
+                )
+            )
+        if time.value == "dose" and day.value != "udto":
+            self.errors.append(
+                Error(
+                    "Wrong part of day for a particular hour",
+                    "Should be udto",
+                    day.value,
+                    ["udto"],
+                )
+            )
+
+    def date_condition(self, month, day, year=None):
+        if month in [
+            "enero",
+            "marso",
+            "mayo",
+            "hulyo",
+            "agosto",
+            "oktubre",
+            "disyembre",
+        ] and day not in range(1, 32):
+            self.errors.append(
+                Error(
+                    "Way beyond the number of dates for " + month,
+                    "Should be between 1 and 31",
+                    day,
+                )
+            )
+        elif month in [
+            "abril",
+            "hunyo",
+            "septiyembre",
+            "nubiyembre",
+        ] and day not in range(1, 31):
+            self.errors.append(
+                Error(
+                    "Way beyond the number of dates for " + month,
+                    "Should be between 1 and 30",
+                    day,
+                )
+            )
+        elif (
+            month == "pebrero"
+            and day not in range(1, 30)
+            and year is not None
+            and self.leap_year(year) == True
+        ):
+            self.errors.append(
+                Error(
+                    "Way beyond the number of dates for " + month,
+                    "Should be between 1 and 29 in a leap year",
+                    day,
+                )
+            )
+        elif (
+            month == "pebrero"
+            and day not in range(1, 29)
+            and year is not None
+            and self.leap_year(year) == False
+        ):
+            self.errors.append(
+                Error(
+                    "Way beyond the number of dates for " + month,
+                    "Should be between 1 and 28",
+                    day,
+                )
+            )
+
+    def leap_year(self, year):
+        if (year % 4) == 0:
+            if (year % 100) == 0:
+                if (year % 400) == 0:
+                    return True
+                else:
+                    return False
+            else:
+                return True
+        else:
+            return False
+
+
+def grammatical_number(noun):
+    """"Singular" or "Plural" for the head of a noun phrase ("" for a bare
+    demonstrative), or None for a date, a number or a missing phrase."""
+    if type(noun) is NounPhrase:
+        noun = noun.complex_noun
+    if type(noun) in (NounPhraseSingularPlural, DemPronoun):
+        return noun.type
+    return None
+
+
+CHECKS = {
+    Sentence: Checker.check_sentence,
+    PredPhrase: Checker.check_pred_phrase,
+    Time: Checker.check_time,
+    Date: Checker.check_date,
+}
+
+# subtrees Parser.reparse can reuse, so the ones worth remembering as clean
+PHRASES = {Sentence, NounPhrase, NounPhraseSingularPlural, DemPronoun, PrepPhrase}
+
+# per AST class, the fields that can hold child nodes, in completion order
+FIELDS = {}
+
+
+def child_fields(kind):
+    if not issubclass(kind, AST) or kind is Word:
+        return ()
+    return tuple(name for name in CHILD_ORDER.get(kind, kind.__slots__) if name != "type")
@@ -0,0 +1,518 @@
+###############################################################################
+#                                                                             #
+#  CKY PARSER                                                                 #
+#                                                                             #
+###############################################################################
+#
+# The chart parser of Parser/cky-parser.ipynb, over a grammar written as in
+# the notebooks:
+#
+#   grammar = {
+#       "S": {("NP", "VP")},
+#       "NP": {("Det", "Noun"), ("Det", "Adj", "Noun"), ("Pronoun",)},
+#       "Det": {"ang", "usa ka"},
+#       ...
+#   }
+#
+# A tuple is a rule over nonterminals; a string is one or more words.
+# parsugbo.cnf compiles the grammar into Chomsky normal form first. The
+# nonterminals are numbered, so a chart cell is an int with bit i set when
+# nonterminal i spans the cell's words.
+#
+# Trees are not built while parsing. Each entry of a cell keeps how it can
+# be made: from a split (mid, B, C), from the entry B of the same cell
+# through the k-th chain of unary rules up from it (UNARY, B, k), or from
+# the cell's words (WORDS, -1, -1). That packs every parse of the sentence
+# into space that doesn't grow with their number; trees are unpacked from
+# it one at a time on request.
+#
+# Over a probabilistic grammar, `CKYParser.viterbi` keeps a row of
+# log-probabilities per cell, one per nonterminal, and only the best entry
+# of each nonterminal, so the chart holds the single best tree. It can
+# also prune cells as it goes: to the `beam` best nonterminals of a cell,
+# to entries whose figure of merit, the average log-probability per word
+# of their span, reaches a global `threshold`, and to spans of at most
+# `max_span` words for every label but the start symbol and the pieces of
+# its binarized rules. What a cell loses can't be used by the spans above
+# it, which is where the time is saved.
+#
+# A grammar with a terminal UNKNOWN, such as a PCFG trained with unknown
+# words, reads any word no one-word terminal matches as that terminal;
+# trees keep the word itself.
+
+import math
+from .cnf import CompiledGrammar, cached_grammar, compile_rules
+
+# the `mid` of entries that are not splits
+UNARY = -1
+WORDS = -2
+WORD_ENTRY = (WORDS, -1, -1)
+
+# the terminal standing for words the grammar doesn't have
+UNKNOWN = "<unk>"
+
+
+def bits(mask: int):
+    """Indices of the bits set in `mask`, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class Grammar(object):
+    """A grammar indexed for CKY.
+
+    `binary` maps a pair (B, C) of nonterminal numbers to the numbers of
+    every A with a rule A -> B C, and `right_of[B]` has the bit of each C
+    that some rule pairs with B, so a split of the chart only looks at the
+    rules whose children are both there. `closure[B]` has the bit of each A
+    with A =>+ B through unary rules, `chains[A, B]` every chain of rules
+    from A down to B, best first, and `trie` the terminals word by word,
+    the bitset of a terminal's nonterminals under the key None.
+    `binary_scores`, `unary_scores` and `terminal_scores` hold the same rules
+    with their log-probabilities, for `CKYParser.viterbi`. `unknown` has
+    the bit of each nonterminal with the terminal UNKNOWN.
+
+    Given a `cache` directory, the compiled grammar is kept there and
+    loaded instead of compiled again while the rules stay the same.
+    """
+
+    def __init__(self, rules: dict | CompiledGrammar, start: str = "S", cache: str | None = None):
+        if type(rules) != CompiledGrammar:
+            rules = compile_rules(rules, start) if cache is None else cached_grammar(rules, start, cache)
+        self.symbols: list[str] = rules.symbols
+        self.index: dict[str, int] = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.start = rules.start
+        # bitset of the intermediate symbols of binarized rules
+        self.hidden = 0
+        for a in rules.hidden:
+            self.hidden |= 1 << a
+        self.binary: dict[tuple[int, int], list[int]] = {}
+        # (B, C) -> bitset of `binary[B, C]`
+        self.binary_mask: dict[tuple[int, int], int] = {}
+        self.right_of: dict[int, int] = {}
+        # (B, C) -> [(A, log-probability of A -> B C)]
+        self.binary_scores: dict[tuple[int, int], list[tuple[int, float]]] = {}
+        for a, b, c, logp in rules.binary:
+            self.binary.setdefault((b, c), []).append(a)
+            self.binary_scores.setdefault((b, c), []).append((a, logp))
+            self.binary_mask[b, c] = self.binary_mask.get((b, c), 0) | 1 << a
+            self.right_of[b] = self.right_of.get(b, 0) | 1 << c
+        self.closure: list[int] = [0] * len(self.symbols)
+        # (A, B) -> the symbols between A and B on each unary chain
+        self.chains: dict[tuple[int, int], tuple[tuple[int, ...], ...]] = {}
+        # B -> [(A, log-probability of the best chain)] for each A in
+        # closure[B]
+        self.unary_scores: dict[int, list[tuple[int, float]]] = {}
+        for a, b, chain, logp in rules.unary:
+            if (a, b) not in self.chains:
+                self.closure[b] |= 1 << a
+                self.chains[a, b] = (chain,)
+                # the first chain of a pair is its best
+                self.unary_scores.setdefault(b, []).append((a, logp))
+            else:
+                self.chains[a, b] += (chain,)
+        self.trie: dict = {}
+        # words -> [(A, log-probability of A -> words)]
+        self.terminal_scores: dict[tuple[str, ...], list[tuple[int, float]]] = {}
+        for a, words, logp in rules.terminals:
+            node = self.trie
+            for word in words:
+                node = node.setdefault(word, {})
+            node[None] = node.get(None, 0) | 1 << a
+            self.terminal_scores.setdefault(words, []).append((a, logp))
+        self.unknown = self.trie.get(UNKNOWN, {}).get(None, 0)
+
+        # the start symbol and the pieces of its binarized rules, which
+        # span the whole sentence whatever `max_span` is
+        self.top = 1 << self.start
+        for a in rules.hidden:
+            if self.symbols[a].startswith(self.symbols[self.start] + "|"):
+                self.top |= 1 << a
+
+    def names(self, mask: int):
+        return {self.symbols[i] for i in bits(mask & ~self.hidden)}
+
+
+class PruneStats(object):
+    """Chart entries a Viterbi parse kept, and those it dropped for each
+    kind of pruning."""
+
+    def __init__(self, kept=0, span=0, threshold=0, beam=0):
+        self.kept = kept
+        self.span = span
+        self.threshold = threshold
+        self.beam = beam
+
+    @property
+    def pruned(self):
+        return self.span + self.threshold + self.beam
+
+    @property
+    def pruned_rate(self):
+        built = self.kept + self.pruned
+        return self.pruned / built if built else 0.0
+
+    def add(self, other):
+        self.kept += other.kept
+        self.span += other.span
+        self.threshold += other.threshold
+        self.beam += other.beam
+
+    def __str__(self):
+        return "PruneStats(kept={}, span={}, threshold={}, beam={}, pruned_rate={:.2%})".format(
+            self.kept, self.span, self.threshold, self.beam, self.pruned_rate
+        )
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class Tree(object):
+    """A parse tree; `children` holds Trees, or the word of a leaf.
+    Trees unpacked from one chart share their subtrees, so they are not to
+    be changed in place."""
+
+    __slots__ = ("label", "children")
+
+    def __init__(self, label: str, children: list):
+        self.label = label
+        self.children = children
+
+    def __str__(self):
+        if type(self.children[0]) == str:
+            return "(" + self.label + " " + self.children[0] + ")"
+        return "(" + self.label + " " + " ".join(str(child) for child in self.children) + ")"
+
+
+class Chart(object):
+    """Filled CKY chart of a sentence. Spans are half-open, [start, end)
+    over the words; the cell of a span is `cells[start * (n + 1) + end]`.
+
+    `back` parallels `cells` with, for each nonterminal number in a cell,
+    the list of entries it was built from. It is None when the chart was
+    filled without a forest. `scores` parallels them with the row of
+    log-probabilities of a Viterbi chart, and is None otherwise.
+    """
+
+    def __init__(self, grammar: Grammar, words: list[str], forest: bool = True):
+        self.grammar = grammar
+        self.words = words
+        self.n = len(words)
+        size = (self.n + 1) * (self.n + 1)
+        self.cells = [0] * size
+        self.back: list[dict[int, list]] | None = [None] * size if forest else None
+        self.scores: list[list[float]] | None = None
+        # what a pruned Viterbi parse dropped
+        self.stats: PruneStats | None = None
+        # trees per (cell index, nonterminal number), filled by count
+        self.counts: dict[tuple[int, int], int] | None = None
+
+    def cell(self, start: int, end: int):
+        return self.cells[start * (self.n + 1) + end]
+
+    def labels(self, start: int, end: int):
+        """Names of the nonterminals spanning words[start:end]."""
+        return self.grammar.names(self.cell(start, end))
+
+    @property
+    def accepted(self):
+        return self.n > 0 and self.cell(0, self.n) >> self.grammar.start & 1 == 1
+
+    def count(self, label: str | None = None, start: int = 0, end: int | None = None):
+        """Number of trees for `label` (the start symbol by default) over
+        words[start:end] (the whole sentence by default)."""
+        end = self.n if end is None else end
+        a = self.grammar.start if label is None else self.grammar.index.get(label)
+        if a is None or not self.cell(start, end) >> a & 1:
+            return 0
+        if self.counts is None:
+            self.count_all()
+        return self.counts[start * (self.n + 1) + end, a]
+
+    def score(self, label: str | None = None, start: int = 0, end: int | None = None):
+        """Log-probability of the best tree for `label` (the start symbol
+        by default) over words[start:end] (the whole sentence by default),
+        -inf if there is none. Only for charts filled by `viterbi`."""
+        if self.scores is None:
+            raise ValueError("Chart was not filled by viterbi")
+        end = self.n if end is None else end
+        a = self.grammar.start if label is None else self.grammar.index.get(label)
+        if a is None or not self.cell(start, end) >> a & 1:
+            return -math.inf
+        return self.scores[start * (self.n + 1) + end][a]
+
+    def ambiguity(self, start: int, end: int):
+        """Number of trees of each label over words[start:end]."""
+        grammar = self.grammar
+        return {grammar.symbols[a]: self.count(grammar.symbols[a], start, end) for a in bits(self.cell(start, end) & ~grammar.hidden)}
+
+    def count_all(self):
+        # bottom up, shortest spans first, so every split is counted
+        # before the spans made of it
+        self.needs_forest()
+        width = self.n + 1
+        counts = self.counts = {}
+        unary = bool(self.grammar.chains)
+        for length in range(1, self.n + 1):
+            for start in range(self.n - length + 1):
+                end = start + length
+                index = start * width + end
+                entries = self.back[index]
+                if not entries:
+                    continue
+                for a, made in entries.items():
+                    total = 0
+                    for mid, b, c in made:
+                        if mid > 0:
+                            total += counts[start * width + mid, b] * counts[mid * width + end, c]
+                        elif mid == WORDS:
+                            total += 1
+                    counts[index, a] = total
+                if unary:
+                    # so far the trees without a unary rule on top, which
+                    # is what a unary entry is made of
+                    below = {a: counts[index, a] for a in entries}
+                    for a, made in entries.items():
+                        for mid, b, c in made:
+                            if mid == UNARY:
+                                counts[index, a] += below[b]
+
+    def trees(self, label: str | None = None, start: int = 0, end: int | None = None):
+        """Every tree for `label` (the start symbol by default) over
+        words[start:end] (the whole sentence by default), unpacked one at
+        a time."""
+        self.needs_forest()
+        end = self.n if end is None else end
+        a = self.grammar.start if label is None else self.grammar.index.get(label)
+        if a is None or not self.cell(start, end) >> a & 1:
+            return iter(())
+        return self.unpack(a, start, end)
+
+    def unpack(self, a: int, start: int, end: int, unary: bool = True):
+        grammar = self.grammar
+        symbols = grammar.symbols
+        for mid, b, c in self.back[start * (self.n + 1) + end][a]:
+            if mid == WORDS:
+                yield Tree(symbols[a], [" ".join(self.words[start:end])])
+            elif mid == UNARY:
+                if not unary:
+                    continue
+                chain = grammar.chains[a, b][c]
+                for tree in self.unpack(b, start, end, False):
+                    for s in reversed(chain):
+                        tree = Tree(symbols[s], [tree])
+                    yield Tree(symbols[a], [tree])
+            else:
+                for left in self.unpack(b, start, mid):
+                    for right in self.unpack(c, mid, end):
+                        # the intermediate symbol of a binarized rule gives
+                        # its children to the rule's own
+                        if grammar.hidden >> c & 1:
+                            yield Tree(symbols[a], [left] + right.children)
+                        else:
+                            yield Tree(symbols[a], [left, right])
+
+    def tree(self, label: str | None = None, start: int = 0, end: int | None = None):
+        """The first of `trees`, or None."""
+        return next(self.trees(label, start, end), None)
+
+    def needs_forest(self):
+        if self.back is None:
+            raise ValueError("Chart was filled without a forest")
+
+    def spans(self):
+        """(start, end, labels) of every span something covers, shortest
+        first."""
+        for length in range(1, self.n + 1):
+            for start in range(self.n - length + 1):
+                mask = self.cell(start, start + length) & ~self.grammar.hidden
+                if mask:
+                    yield start, start + length, self.grammar.names(mask)
+
+
+class CKYParser(object):
+    def __init__(self, grammar: Grammar | dict, start: str = "S", cache: str | None = None):
+        self.grammar = grammar if type(grammar) == Grammar else Grammar(grammar, start, cache)
+
+    def parse(self, sentence: str | list[str], forest: bool = True):
+        """Fill and return the chart of `sentence`, a string of words
+        separated by spaces or a list of words. Without `forest` no
+        backpointers are kept, which is enough to recognize it."""
+        words = sentence.split() if type(sentence) == str else list(sentence)
+        chart = Chart(self.grammar, words, forest)
+        n, cells, back = chart.n, chart.cells, chart.back
+        width = n + 1
+        binary, binary_mask, right_of = self.grammar.binary, self.grammar.binary_mask, self.grammar.right_of
+        closure, chains = self.grammar.closure, self.grammar.chains
+        # terminals, walking the trie from each word
+        trie, unknown = self.grammar.trie, self.grammar.unknown
+        for i in range(n):
+            node = trie
+            for j in range(i, n):
+                node = node.get(words[j])
+                if node is None:
+                    break
+                if None in node:
+                    cells[i * width + j + 1] = node[None]
+            if unknown and not cells[i * width + i + 1]:
+                cells[i * width + i + 1] = unknown
+        for length in range(1, n + 1):
+            for start in range(n - length + 1):
+                end = start + length
+                found = cells[start * width + end]
+                entries = None
+                if back is not None:
+                    entries = {a: [WORD_ENTRY] for a in bits(found)} if found else {}
+                for mid in range(start + 1, end):
+                    left = cells[start * width + mid]
+                    if not left:
+                        continue
+                    right = cells[mid * width + end]
+                    if not right:
+                        continue
+                    for b in bits(left):
+                        pairs = right_of.get(b, 0) & right
+                        for c in bits(pairs):
+                            found |= binary_mask[b, c]
+                            if entries is not None:
+                                for a in binary[b, c]:
+                                    if a in entries:
+                                        entries[a].append((mid, b, c))
+                                    else:
+                                        entries[a] = [(mid, b, c)]
+                if found and chains:
+                    # unary rules over what the cell holds so far; the
+                    # closure already goes up every chain
+                    for b in bits(found):
+                        above = closure[b]
+                        if above:
+                            found |= above
+                            if entries is not None:
+                                # an entry per chain: each is another tree
+                                for a in bits(above):
+                                    made = [(UNARY, b, k) for k in range(len(chains[a, b]))]
+                                    if a in entries:
+                                        entries[a].extend(made)
+                                    else:
+                                        entries[a] = made
+                cells[start * width + end] = found
+                if entries:
+                    back[start * width + end] = entries
+        return chart
+
+    def viterbi(self, sentence: str | list[str], beam: int | None = None, threshold: float | None = None, max_span: int | None = None):
+        """Fill and return the chart of `sentence` keeping, for each span
+        and nonterminal, only the entry that scores best; `tree()` and
+        `score()` of the chart give the most probable parse.
+
+        With `beam`, a cell keeps its `beam` best nonterminals; with
+        `threshold`, only entries scoring at least `threshold` per word;
+        with `max_span`, spans longer than `max_span` words only hold the
+        start symbol and the pieces of its rules. The chart's `stats` count
+        what was dropped.
+        """
+        words = sentence.split() if type(sentence) == str else list(sentence)
+        chart = Chart(self.grammar, words)
+        stats = chart.stats = PruneStats()
+        top = self.grammar.top
+        n, cells, back = chart.n, chart.cells, chart.back
+        width = n + 1
+        scores = chart.scores = [None] * (width * width)
+        empty = [-math.inf] * len(self.grammar.symbols)
+        binary_mask, right_of, binary_scores = self.grammar.binary_mask, self.grammar.right_of, self.grammar.binary_scores
+        closure, unary_scores = self.grammar.closure, self.grammar.unary_scores
+        trie, terminal_scores, unknown = self.grammar.trie, self.grammar.terminal_scores, self.grammar.unknown
+        # ends of the cells filled so far from each start, shortest first,
+        # so a split is only tried where the left cell has something: what
+        # pruning empties costs nothing further up
+        ends = [[] for _ in range(n)]
+        for i in range(n):
+            node = trie
+            for j in range(i, n):
+                node = node.get(words[j])
+                if node is None:
+                    break
+                if None in node:
+                    index = i * width + j + 1
+                    row = scores[index] = empty[:]
+                    for a, logp in terminal_scores[tuple(words[i : j + 1])]:
+                        row[a] = logp
+                    cells[index] = node[None]
+                    back[index] = {a: [WORD_ENTRY] for a in bits(node[None])}
+            index = i * width + i + 1
+            if unknown and not cells[index]:
+                row = scores[index] = empty[:]
+                for a, logp in terminal_scores[UNKNOWN,]:
+                    row[a] = logp
+                cells[index] = unknown
+                back[index] = {a: [WORD_ENTRY] for a in bits(unknown)}
+        for length in range(1, n + 1):
+            for start in range(n - length + 1):
+                end = start + length
+                index = start * width + end
+                found = cells[index]
+                # words of the sentence already filled these
+                row = scores[index]
+                entries = back[index]
+                for mid in ends[start]:
+                    right = cells[mid * width + end]
+                    if not right:
+                        continue
+                    left = cells[start * width + mid]
+                    left_row, right_row = scores[start * width + mid], scores[mid * width + end]
+                    for b in bits(left):
+                        pairs = right_of.get(b, 0) & right
+                        if not pairs:
+                            continue
+                        if row is None:
+                            row = empty[:]
+                            entries = {}
+                        left_score = left_row[b]
+                        for c in bits(pairs):
+                            found |= binary_mask[b, c]
+                            below = left_score + right_row[c]
+                            for a, logp in binary_scores[b, c]:
+                                if below + logp > row[a]:
+                                    row[a] = below + logp
+                                    entries[a] = [(mid, b, c)]
+                if not found:
+                    continue
+                if unary_scores:
+                    # from the scores before any unary rule; the closure
+                    # already has the best chain to each symbol above
+                    base = [(b, row[b]) for b in bits(found) if closure[b]]
+                    for b, below in base:
+                        found |= closure[b]
+                        for a, logp in unary_scores[b]:
+                            if below + logp > row[a]:
+                                row[a] = below + logp
+                                entries[a] = [(UNARY, b, 0)]
+                # dropped entries stay in `entries`, where the trees of the
+                # entries kept above them may still lead
+                if max_span is not None and length > max_span and found & ~top:
+                    stats.span += (found & ~top).bit_count()
+                    found &= top
+                if threshold is not None and found:
+                    for a in bits(found):
+                        if row[a] < threshold * length:
+                            found ^= 1 << a
+                            stats.threshold += 1
+                if beam is not None and found.bit_count() > beam:
+                    ranked = sorted(bits(found), key=row.__getitem__, reverse=True)
+                    for a in ranked[beam:]:
+                        found ^= 1 << a
+                    stats.beam += len(ranked) - beam
+                stats.kept += found.bit_count()
+                cells[index] = found
+                if not found:
+                    continue
+                ends[start].append(end)
+                scores[index] = row
+                back[index] = entries
+        return chart
+
+    def recognize(self, sentence: str | list[str]):
+        """Whether the grammar derives `sentence` from its start symbol."""
+        return self.parse(sentence, forest=False).accepted
@@ -0,0 +1,268 @@
+import hashlib
+import math
+import os
+import struct
+
+###############################################################################
+#                                                                             #
+#  GRAMMAR COMPILER                                                           #
+#                                                                             #
+###############################################################################
+#
+# Turns a grammar written as in the notebooks, with rules of any length and
+# terminals of several words, into the Chomsky normal form parsugbo.cky
+# parses with:
+#
+#   - a rule of three or more symbols is binarized to the right through
+#     intermediate symbols named "A|X.Y", which are marked hidden so trees
+#     leave them out again;
+#   - unary rules A -> B are kept as a closure: every chain A =>+ B
+#     through unary rules that passes no symbol twice, with the symbols in
+#     between, so the engine can add A wherever it finds B and rebuild the
+#     chain in trees. Two chains from A down to B are two trees;
+#   - a terminal is a tuple of words ("usa ka" is two), for the engine to
+#     match with a trie.
+#
+# A probabilistic grammar is written the same way, with a dict from each
+# production to its probability in place of the set. Every compiled rule
+# carries its log-probability (0.0 without probabilities): a binarized rule
+# keeps it on its first piece, and a unary chain the sum over its rules. The
+# chains of a pair (A, B) come best first, the shortest first among equals,
+# which is the one a Viterbi parse takes.
+#
+# A compiled grammar can be saved as a single binary file, each part in one
+# block so that loading it is a few bulk unpacks:
+#
+#   header    MAGIC, start symbol, the counts of symbols, binary rules,
+#             unary pairs, chain symbols and terminals, and the byte
+#             lengths of the two text blocks (u32 each)
+#   symbols   the names, newline separated (utf-8)
+#   hidden    one byte per symbol, 1 when hidden
+#   binary    A, B, C per rule (u32 each), then the log-probabilities
+#             (f64 each)
+#   unary     A, B, chain length per chain, then all the chains (u32 each),
+#             then the log-probabilities (f64 each)
+#   terminals A and word count per terminal (u32 each), then the
+#             log-probabilities (f64 each), then the words, newline
+#             separated (utf-8)
+
+MAGIC = b"PSGCNF\x00\x03"
+HEADER = struct.Struct("<8sIIIIIIII")
+
+
+class CompiledGrammar(object):
+    """A grammar in the form parsugbo.cky.Grammar indexes; symbols are
+    numbers into `symbols`."""
+
+    __slots__ = ("symbols", "start", "hidden", "binary", "unary", "terminals")
+
+    def __init__(self, symbols: list[str], start: int, hidden: set[int], binary: list, unary: list, terminals: list):
+        self.symbols = symbols
+        self.start = start
+        self.hidden = hidden
+        # (A, B, C, log-probability) for A -> B C
+        self.binary = binary
+        # (A, B, chain, log-probability) for each A =>+ B, chain being the
+        # symbols in between; the chains of a pair best first
+        self.unary = unary
+        # (A, words, log-probability) for A -> words
+        self.terminals = terminals
+
+
+def compile_rules(rules: dict, start: str = "S"):
+    """Compile `rules`, a dict from each left-hand side to its productions:
+    a tuple of symbols, or a string of one or more words separated by
+    spaces. The productions are a set, or a dict giving the probability of
+    each."""
+    symbols = []
+    index = {}
+
+    def number(symbol):
+        if symbol not in index:
+            index[symbol] = len(symbols)
+            symbols.append(symbol)
+        return index[symbol]
+
+    number(start)
+    hidden = set()
+    binary = {}
+    units = {}
+    terminals = {}
+    # sets come in a different order every run; sorting keeps the symbol
+    # numbers, and so a saved grammar, the same for the same rules
+    for lhs, productions in rules.items():
+        a = number(lhs)
+        for production in sorted(productions, key=production_key):
+            logp = 0.0
+            if type(productions) == dict:
+                if not productions[production] > 0:
+                    raise ValueError("Probability of {} -> {} is not positive".format(lhs, production))
+                logp = math.log(productions[production])
+            if type(production) == str:
+                words = tuple(production.split())
+                if not words:
+                    raise ValueError("Empty terminal in the rules of " + lhs)
+                terminals[a, words] = max(logp, terminals.get((a, words), -math.inf))
+            elif len(production) == 0:
+                raise ValueError("Empty production in the rules of " + lhs)
+            elif len(production) == 1:
+                b = number(production[0])
+                if a != b:
+                    units[a, b] = max(logp, units.get((a, b), -math.inf))
+            else:
+                # A -> X1 X2 ... Xn as A -> X1 A|X2..Xn, A|X2..Xn -> X2 A|X3..Xn, ...
+                parent = a
+                for i in range(len(production) - 2):
+                    rest = lhs + "|" + ".".join(production[i + 1 :])
+                    child = number(rest)
+                    hidden.add(child)
+                    rule = (parent, number(production[i]), child)
+                    binary[rule] = max(logp, binary.get(rule, -math.inf))
+                    parent = child
+                    logp = 0.0
+                rule = (parent, number(production[-2]), number(production[-1]))
+                binary[rule] = max(logp, binary.get(rule, -math.inf))
+    return CompiledGrammar(
+        symbols,
+        0,
+        hidden,
+        [rule + (logp,) for rule, logp in sorted(binary.items())],
+        unary_closure(units),
+        [key + (logp,) for key, logp in sorted(terminals.items())],
+    )
+
+
+def production_key(production):
+    return (type(production) == str, production)
+
+
+def unary_closure(units: dict):
+    """(A, B, chain, log-probability) for every chain A =>+ B over the unary
+    rules `units`, a dict from (A, B) to log-probability, A != B, that
+    passes no symbol twice. The chains of a pair come best first."""
+    parents = {}
+    for (a, b), logp in units.items():
+        parents.setdefault(b, []).append((a, logp))
+    closure = []
+    for b in sorted(parents):
+        # depth first up from B; `path` is B and the symbols above it so
+        # far, and a symbol already on it would close a cycle
+        found = {}
+        stack = [((b,), 0.0)]
+        while stack:
+            path, score = stack.pop()
+            for a, logp in parents.get(path[-1], ()):
+                if a in path:
+                    continue
+                found.setdefault(a, []).append((score + logp, path[:0:-1]))
+                stack.append((path + (a,), score + logp))
+        for a in sorted(found):
+            for logp, chain in sorted(found[a], key=lambda item: (-item[0], len(item[1]), item[1])):
+                closure.append((a, b, chain, logp))
+    return closure
+
+
+def source_hash(rules: dict, start: str = "S"):
+    """Hex digest identifying `rules` and `start`, whatever the order of
+    their sets."""
+    digest = hashlib.sha256(MAGIC)
+    digest.update(start.encode() + b"\n")
+    for lhs in sorted(rules):
+        for production in sorted(rules[lhs], key=production_key):
+            text = '"' + production + '"' if type(production) == str else " ".join(production)
+            if type(rules[lhs]) == dict:
+                text += "\t" + repr(rules[lhs][production])
+            digest.update((lhs + "\t" + text + "\n").encode())
+    return digest.hexdigest()
+
+
+def u32s(values: list[int]):
+    return struct.pack("<%dI" % len(values), *values)
+
+
+def f64s(values: list[float]):
+    return struct.pack("<%dd" % len(values), *values)
+
+
+def save_grammar(grammar: CompiledGrammar, path: str):
+    names = "\n".join(grammar.symbols).encode()
+    words = "\n".join(word for a, terminal, logp in grammar.terminals for word in terminal).encode()
+    chains = [s for a, b, chain, logp in grammar.unary for s in chain]
+    out = [
+        HEADER.pack(MAGIC, grammar.start, len(grammar.symbols), len(grammar.binary), len(grammar.unary),
+                    len(chains), len(grammar.terminals), len(names), len(words)),
+        names,
+        bytes(i in grammar.hidden for i in range(len(grammar.symbols))),
+        u32s([x for rule in grammar.binary for x in rule[:3]]),
+        f64s([rule[3] for rule in grammar.binary]),
+        u32s([x for a, b, chain, logp in grammar.unary for x in (a, b, len(chain))]),
+        u32s(chains),
+        f64s([logp for a, b, chain, logp in grammar.unary]),
+        u32s([x for a, terminal, logp in grammar.terminals for x in (a, len(terminal))]),
+        f64s([logp for a, terminal, logp in grammar.terminals]),
+        words,
+    ]
+    # written aside and moved into place, so a reader never sees half a file
+    with open(path + ".tmp", "wb") as f:
+        f.write(b"".join(out))
+    os.replace(path + ".tmp", path)
+
+
+def load_grammar(path: str):
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < HEADER.size or data[:len(MAGIC)] != MAGIC:
+        raise ValueError("Not a compiled grammar: " + path)
+    _, start, n_symbols, n_binary, n_unary, n_chains, n_terminals, names_size, words_size = HEADER.unpack_from(data)
+    pos = HEADER.size
+
+    def block(count, kind="I"):
+        nonlocal pos
+        values = struct.unpack_from("<%d%s" % (count, kind), data, pos)
+        pos += struct.calcsize(kind) * count
+        return values
+
+    symbols = data[pos : pos + names_size].decode().split("\n") if n_symbols else []
+    pos += names_size
+    hidden = {i for i, flag in enumerate(data[pos : pos + n_symbols]) if flag}
+    pos += n_symbols
+    flat = block(3 * n_binary)
+    scores = block(n_binary, "d")
+    binary = [flat[3 * i : 3 * i + 3] + (scores[i],) for i in range(n_binary)]
+    flat = block(3 * n_unary)
+    chains = block(n_chains)
+    scores = block(n_unary, "d")
+    unary = []
+    used = 0
+    for i in range(n_unary):
+        a, b, length = flat[3 * i : 3 * i + 3]
+        unary.append((a, b, chains[used : used + length], scores[i]))
+        used += length
+    flat = block(2 * n_terminals)
+    scores = block(n_terminals, "d")
+    words = data[pos : pos + words_size].decode().split("\n")
+    terminals = []
+    used = 0
+    for i in range(n_terminals):
+        a, count = flat[2 * i], flat[2 * i + 1]
+        terminals.append((a, tuple(words[used : used + count]), scores[i]))
+        used += count
+    if len(symbols) != n_symbols or pos + words_size != len(data):
+        raise ValueError("Corrupt compiled grammar: " + path)
+    return CompiledGrammar(symbols, start, hidden, binary, unary, terminals)
+
+
+def cached_grammar(rules: dict, start: str = "S", directory: str = "."):
+    """`compile_rules(rules, start)`, saved under `directory` by the hash
+    of the rules and loaded from there the next time."""
+    path = os.path.join(directory, source_hash(rules, start) + ".cnf")
+    if os.path.exists(path):
+        try:
+            return load_grammar(path)
+        except (ValueError, struct.error, UnicodeDecodeError):
+            # unreadable; compiled again below
+            pass
+    grammar = compile_rules(rules, start)
+    os.makedirs(directory, exist_ok=True)
+    save_grammar(grammar, path)
+    return grammar
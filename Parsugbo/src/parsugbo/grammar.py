@@ -0,0 +1,248 @@
+from .tokens import TOKEN_EOF, TYPE_BITS
+
+###############################################################################
+#                                                                             #
+#  GRAMMAR TABLES                                                             #
+#                                                                             #
+###############################################################################
+#
+# A grammar is written one rule per block:
+#
+#   rule : symbol symbol ...   {action}
+#        | @SET symbol ...     {action}
+#        |                     {action}
+#
+# Lowercase names are rules. Everything else is a terminal: a token type
+# (NOUN), a token type with a fixed value (DET:ang) or a bare value ("ka").
+# `%set NAME = ...` names a group of terminals; `@NAME` in front of an
+# alternative predicts it on that group instead of its computed FIRST set,
+# for the places where the grammar deliberately looks at less than it could.
+#
+# Alternatives are tried in the order written: when a token could start
+# more than one of them the earlier one wins, and a token that starts none
+# of them takes the last one, which is where the empty alternative goes.
+
+EPSILON = None
+
+
+class Terminal(object):
+    __slots__ = ("name", "kind", "value", "mask")
+
+    def __init__(self, name: str):
+        self.name = name
+        if name.startswith('"'):
+            self.kind = None
+            self.value = name.strip('"')
+            self.mask = 0
+        else:
+            self.kind, _, value = name.partition(":")
+            if self.kind not in TYPE_BITS:
+                raise ValueError("Unknown token type in grammar: " + self.kind)
+            self.value = value or None
+            self.mask = TYPE_BITS[self.kind]
+
+    def matches(self, token):
+        if self.value is not None and token.value != self.value:
+            return False
+        return self.mask == 0 or token.mask & self.mask != 0
+
+    def __repr__(self):
+        return self.name
+
+
+class Alternative(object):
+    __slots__ = ("rule", "index", "symbols", "action", "guard", "size", "stack")
+
+    def __init__(self, rule: str, index: int, symbols: list, action: str, guard: str | None):
+        self.rule = rule
+        self.index = index
+        self.symbols = symbols
+        self.action = action
+        self.guard = guard
+        self.size = len(symbols)
+        # symbols resolved to Rule/Terminal objects in reverse, ready to push
+        self.stack = None
+
+    def __repr__(self):
+        return "{} : {}".format(self.rule, " ".join(self.symbols) or "empty")
+
+
+class Rule(object):
+    __slots__ = ("name", "alternatives", "table", "dispatch")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.alternatives = []
+        # terminal name -> alternative, from FIRST and FOLLOW
+        self.table = {}
+        # (token mask, token value) -> alternative, filled on first sight
+        self.dispatch = {}
+
+    def __repr__(self):
+        return self.name
+
+
+class Grammar(object):
+    """LL(1) tables for a grammar written in the format above.
+
+    FIRST and FOLLOW sets and the per-rule prediction tables are computed
+    once on construction. Overlapping predictions are resolved by the order
+    of the alternatives and kept in `conflicts` for inspection.
+    """
+
+    def __init__(self, text: str):
+        self.rules = {}
+        self.terminals = {}
+        self.sets = {}
+        self.start = None
+        self.read(text)
+        for rule in self.rules.values():
+            for alt in rule.alternatives:
+                for symbol in alt.symbols:
+                    if self.is_rule(symbol) and symbol not in self.rules:
+                        raise ValueError("Undefined rule in grammar: " + symbol)
+        # only these values can change which alternative a token predicts
+        self.values = {t.value for t in self.terminals.values() if t.value is not None}
+        self.nullable = set()
+        self.first = {}
+        self.follow = {}
+        self.conflicts = []
+        self.compute_first()
+        self.compute_follow()
+        self.build_tables()
+
+    def is_rule(self, symbol: str):
+        return symbol[0].islower()
+
+    def terminal(self, name: str):
+        if name not in self.terminals:
+            self.terminals[name] = Terminal(name)
+        return self.terminals[name]
+
+    def read(self, text: str):
+        rule = None
+        for line in text.splitlines():
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            if line.startswith("%set"):
+                name, _, members = line[len("%set") :].partition("=")
+                self.sets[name.strip()] = members.split()
+                for member in members.split():
+                    self.terminal(member)
+                continue
+            if line.startswith("|"):
+                body = line[1:]
+            else:
+                name, _, body = line.partition(":")
+                rule = self.rules[name.strip()] = Rule(name.strip())
+                if self.start is None:
+                    self.start = rule
+            body, _, action = body.partition("{")
+            symbols = body.split()
+            guard = None
+            if symbols and symbols[0].startswith("@"):
+                guard = symbols.pop(0)[1:]
+                if guard not in self.sets:
+                    raise ValueError("Undefined terminal set in grammar: " + guard)
+            for symbol in symbols:
+                if not self.is_rule(symbol):
+                    self.terminal(symbol)
+            index = len(rule.alternatives)
+            rule.alternatives.append(Alternative(rule.name, index, symbols, action.rstrip("}").strip(), guard))
+
+    def first_of(self, symbols: list):
+        """FIRST set of a symbol sequence; EPSILON is in it if all can be empty."""
+        result = set()
+        for symbol in symbols:
+            if not self.is_rule(symbol):
+                result.add(symbol)
+                return result
+            result |= self.first[symbol] - {EPSILON}
+            if symbol not in self.nullable:
+                return result
+        result.add(EPSILON)
+        return result
+
+    def compute_first(self):
+        for name in self.rules:
+            self.first[name] = set()
+        changed = True
+        while changed:
+            changed = False
+            for name, rule in self.rules.items():
+                for alt in rule.alternatives:
+                    first = self.first_of(alt.symbols)
+                    if EPSILON in first and name not in self.nullable:
+                        self.nullable.add(name)
+                        changed = True
+                    if not first <= self.first[name]:
+                        self.first[name] |= first
+                        changed = True
+
+    def compute_follow(self):
+        for name in self.rules:
+            self.follow[name] = set()
+        self.follow[self.start.name].add(TOKEN_EOF)
+        changed = True
+        while changed:
+            changed = False
+            for name, rule in self.rules.items():
+                for alt in rule.alternatives:
+                    for i, symbol in enumerate(alt.symbols):
+                        if not self.is_rule(symbol):
+                            continue
+                        rest = self.first_of(alt.symbols[i + 1 :])
+                        follow = rest - {EPSILON}
+                        if EPSILON in rest:
+                            follow |= self.follow[name]
+                        if not follow <= self.follow[symbol]:
+                            self.follow[symbol] |= follow
+                            changed = True
+
+    def predict(self, alt: Alternative):
+        if alt.guard is not None:
+            return set(self.sets[alt.guard])
+        return self.first_of(alt.symbols) - {EPSILON}
+
+    def build_tables(self):
+        if TOKEN_EOF not in self.terminals:
+            self.terminal(TOKEN_EOF)
+        for rule in self.rules.values():
+            for alt in rule.alternatives:
+                for name in sorted(self.predict(alt)):
+                    kept = rule.table.setdefault(name, alt)
+                    if kept is not alt:
+                        self.conflicts.append((rule.name, name, kept.index, alt.index))
+            # the last alternative is the default; when it can be empty it
+            # also covers whatever may follow the rule
+            default = rule.alternatives[-1]
+            if EPSILON in self.first_of(default.symbols):
+                for name in self.follow[rule.name]:
+                    rule.table.setdefault(name, default)
+            for alt in rule.alternatives:
+                alt.stack = [
+                    self.rules[s] if self.is_rule(s) else self.terminals[s]
+                    for s in reversed(alt.symbols)
+                ]
+
+    def bind(self, actions: dict):
+        """Replace every alternative's action name with its function."""
+        for rule in self.rules.values():
+            for alt in rule.alternatives:
+                if alt.action not in actions:
+                    raise ValueError("Undefined action in grammar: " + alt.action)
+                alt.action = actions[alt.action]
+
+    def select(self, rule: Rule, token):
+        """The alternative of `rule` that `token` predicts."""
+        value = token.value if token.value in self.values else None
+        alt = rule.dispatch.get((token.mask, value))
+        if alt is None:
+            alt = rule.alternatives[-1]
+            for name, terminal in self.terminals.items():
+                candidate = rule.table.get(name)
+                if candidate is not None and candidate.index < alt.index and terminal.matches(token):
+                    alt = candidate
+            rule.dispatch[(token.mask, value)] = alt
+        return alt
@@ -1,8 +1,11 @@
+import bisect
+import mmap
+import re
+import sys
 from collections import defaultdict
-from cebdict import dictionary
-from cebstemmer import stemmer
 from .tokens import *
 from .literals import *
+from .cache import LexiconCache
 
 ###############################################################################
 #                                                                             #
@@ -40,9 +43,28 @@ for literals, token in LITERALS_TOKEN_PAIRS:
         LITERAL_TOKEN_MAP[literal].append(token)
 
 class Token(object):
-    def __init__(self, types: list[str], value: str | int):
+    __slots__ = ("types", "value", "mask", "root", "prefix", "suffix", "start", "end")
+
+    def __init__(
+        self,
+        types: list[str],
+        value: str | int,
+        mask: int | None = None,
+        root: str | None = None,
+        prefix: str | None = None,
+        suffix: str | None = None,
+    ):
         self.types = types
         self.value = value
+        # bitmask view of `types` (see tokens.TokenType)
+        self.mask = type_mask(types) if mask is None else mask
+        # stemmer analysis of words resolved by Lexer.general
+        self.root = root
+        self.prefix = prefix
+        self.suffix = suffix
+        # offsets into the source, filled in by RegexLexer and FileLexer
+        self.start: int | None = None
+        self.end: int | None = None
 
     def __str__(self):
         """String representation of the class instance.
@@ -56,6 +78,61 @@ class Token(object):
     def __repr__(self):
         return self.__str__()
 
+# process-wide memo of Lexer.general, keyed on the surface form
+LEXICON_CACHE = LexiconCache()
+
+
+def configure_cache(maxsize: int | None = None, policy: str | None = None):
+    """Resize the lexical-analysis cache or switch its eviction policy
+    ("lru" or "fifo"). A maxsize of 0 turns caching off."""
+    LEXICON_CACHE.configure(maxsize, policy)
+
+
+def cache_stats():
+    return LEXICON_CACHE.stats()
+
+# compiled lexicon snapshot consulted before the dictionary packages
+LEXICON = None
+
+
+def use_lexicon(path: str | None):
+    """Map a compiled lexicon (see parsugbo.lexicon) for every Lexer in this
+    process, or drop the current one when given None."""
+    from .lexicon import Lexicon
+
+    global LEXICON
+    if LEXICON is not None:
+        LEXICON.close()
+    LEXICON = Lexicon(path) if path is not None else None
+    LEXICON_CACHE.clear()
+
+
+def swap_lexicon(lexicon):
+    """Put an open Lexicon (or None) in place of the current one and return
+    that one, still open."""
+    global LEXICON
+    previous, LEXICON = LEXICON, lexicon
+    LEXICON_CACHE.clear()
+    return previous
+
+
+def analyze(given: str):
+    """Resolve a word through the literal table, stemmer and dictionary.
+    Returns the token types and the stemmer analysis."""
+    # imported here so processes served by a compiled lexicon never load them
+    from cebdict import dictionary
+    from cebstemmer import stemmer
+
+    ret = []
+    if given in LITERAL_TOKEN_MAP:
+        ret += LITERAL_TOKEN_MAP[given]
+    stem = stemmer.stem_word(given, as_object=True)
+    types = dictionary.search(stem.root)
+    if types == None:
+        types = [TOKEN_NOUN]
+    ret += types
+    return tuple(ret), stem
+
 RESERVED_WORDS = {
     "MGA": Token([TOKEN_MGA], "mga"),
     "NGA": Token([TOKEN_NGA], "nga"),
@@ -71,7 +148,7 @@ class Lexer(object):
         self.text = text
         # self.pos is an index into self.text
         self.pos = 0
-        self.current_char: str | None = self.text[self.pos]
+        self.current_char: str | None = self.text[self.pos] if self.text else None
 
     def error(self):
         raise Exception("Invalid character")
@@ -105,15 +182,19 @@ class Lexer(object):
         return Token([TOKEN_NUM], int(result))
 
     def general(self, given: str):
-        ret = []
-        if given in LITERAL_TOKEN_MAP:
-            ret += LITERAL_TOKEN_MAP[given]
-        picked = stemmer.stem_word(given, as_object=True).root
-        types = dictionary.search(picked)
-        if types == None:
-            types = [TOKEN_NOUN]
-        ret += types
-        return Token(ret, given)
+        # the same few words recur all over a corpus; share one string each
+        given = sys.intern(given)
+        cached = LEXICON_CACHE.get(given)
+        if cached is None:
+            entry = LEXICON.lookup(given) if LEXICON is not None else None
+            if entry is None:
+                types, entry = analyze(given)
+            else:
+                types = entry.types
+            cached = (types, type_mask(types), entry.root, entry.prefix, entry.suffix)
+            LEXICON_CACHE.put(given, cached)
+        types, mask, root, prefix, suffix = cached
+        return Token(list(types), given, mask, root, prefix, suffix)
 
     def word(self):
         """Handle words, reserved or not"""
@@ -158,4 +239,227 @@ class Lexer(object):
 
             self.error()
 
-        return Token([TOKEN_EOF], None)
\ No newline at end of file
+        return Token([TOKEN_EOF], None)
+
+
+# one alternative per token class recognised by Lexer.get_next_token; the
+# leading \s* folds whitespace skipping into the same match
+TOKEN_PATTERN = re.compile(
+    r"\s*(?:"
+    r"(?P<word>[^\W\d_](?:[^\W\d_]|-)*)"
+    r"|(?P<number>\d+)"
+    r"|(?P<comma>,)"
+    r"|(?P<clit_y>'y)"
+    r"|(?P<clit_ng>'ng)"
+    r"|(?P<error>\S))"
+)
+
+
+class RegexLexer(Lexer):
+    """Lexer that scans the sentence with TOKEN_PATTERN instead of walking it
+    character by character. Produces the same tokens as Lexer, with
+    `start`/`end` set to character offsets into the text."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.matches = TOKEN_PATTERN.finditer(text)
+
+    def get_next_token(self):
+        for match in self.matches:
+            kind = match.lastgroup
+            if kind == "word":
+                result = match.group(kind)
+                reserved = RESERVED_WORDS.get(result.upper())
+                if reserved is not None:
+                    # reserved tokens are shared; this occurrence gets its own
+                    token = Token(reserved.types, reserved.value, reserved.mask)
+                else:
+                    token = self.general(result)
+            elif kind == "number":
+                token = Token([TOKEN_NUM], int(match.group(kind)))
+            elif kind == "comma":
+                token = Token([TOKEN_COMMA], ",")
+            elif kind == "clit_y":
+                token = Token([TOKEN_CLIT_Y], "'y")
+            elif kind == "clit_ng":
+                token = Token([TOKEN_CLIT_NG], "'ng")
+            else:
+                self.error()
+            token.start, token.end = match.span(kind)
+            return token
+
+        token = Token([TOKEN_EOF], None)
+        token.start = token.end = len(self.text)
+        return token
+
+
+class TokenArray(object):
+    """A whole sentence lexed up front. `tokens` always ends with the EOF
+    token; `types`, `masks` and `values` are parallel views of the same
+    tokens."""
+
+    def __init__(self, tokens: list[Token]):
+        self.tokens = tokens
+        # line number and byte span when read by FileLexer
+        self.sentence: int | None = None
+        self.start: int | None = None
+        self.end: int | None = None
+        # source sentence when lexed by from_text, needed by edit
+        self.text: str | None = None
+        # parser rule results and phrases the checker passed, kept across
+        # edits by Parser.reparse
+        self.subtrees: dict | None = None
+        self.checked: set | None = None
+        self.types = [token.types for token in tokens]
+        self.masks = [token.mask for token in tokens]
+        self.values = [token.value for token in tokens]
+
+    @classmethod
+    def from_lexer(cls, lexer: Lexer):
+        tokens = []
+        token = lexer.get_next_token()
+        while TOKEN_EOF not in token.types:
+            tokens.append(token)
+            token = lexer.get_next_token()
+        tokens.append(token)
+        return cls(tokens)
+
+    @classmethod
+    def from_text(cls, text: str, lexer_class: type[Lexer] = Lexer):
+        array = cls.from_lexer(lexer_class(text))
+        array.text = text
+        return array
+
+    def edit(self, offset: int, deleted: int, inserted: str, lexer_class: type[Lexer] = RegexLexer):
+        """Replace `deleted` characters at `offset` with `inserted` and relex
+        only the tokens around the change, in place.
+
+        Tokens wholly before the edit, and tokens after it that follow
+        whitespace, lex the same however the edit goes, so they are kept as
+        the same objects (the ones after it with their offsets shifted).
+        Needs character offsets, so the array must come from from_text with
+        RegexLexer or another lexer that sets them.
+        """
+        if self.text is None or self.tokens[-1].start is None:
+            raise ValueError("Editing needs a token array lexed with offsets")
+        old = self.text
+        text = old[:offset] + inserted + old[offset + deleted :]
+        tokens = self.tokens
+        last = len(tokens) - 1
+        # first token not wholly before the edit
+        lo = bisect.bisect_left(tokens, offset, 0, last, key=lambda token: token.end)
+        # first token after the edit with whitespace in front of it; a token
+        # stuck to the one before may lex differently once that one changes
+        hi = lo
+        while hi < last and (tokens[hi].start <= offset + deleted or not old[tokens[hi].start - 1].isspace()):
+            hi += 1
+        start = tokens[lo - 1].end if lo > 0 else 0
+        shift = len(inserted) - deleted
+        end = (tokens[hi].start if hi < last else len(old)) + shift
+        fresh = TokenArray.from_text(text[start:end], lexer_class).tokens[:-1]
+        for token in fresh:
+            token.start += start
+            token.end += start
+        for token in tokens[hi:]:
+            token.start += shift
+            token.end += shift
+        if self.subtrees is not None:
+            for token in tokens[lo:hi]:
+                self.subtrees.pop(token, None)
+        tokens[lo:hi] = fresh
+        self.types[lo:hi] = [token.types for token in fresh]
+        self.masks[lo:hi] = [token.mask for token in fresh]
+        self.values[lo:hi] = [token.value for token in fresh]
+        self.text = text
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def __getitem__(self, index):
+        return self.tokens[index]
+
+    def __iter__(self):
+        return iter(self.tokens)
+
+
+class FileLexer(object):
+    """Lexes a corpus with one sentence per line straight from disk.
+
+    Regular files are memory-mapped; other binary streams are read line by
+    line. Either way only the current line is decoded, so memory stays flat
+    however large the corpus is. Iterating yields one TokenArray per
+    non-blank line, tagged with its line number and byte span, and every
+    token's `start`/`end` are byte offsets into the file, so later stages
+    can slice the source buffer instead of keeping copies.
+
+    A line that can't be decoded or lexed is skipped, not the rest of the
+    file; `errors` lists the (line number, message) of each one.
+    """
+
+    def __init__(self, source, encoding: str = "utf-8"):
+        # a path or an open binary file
+        self.source = source
+        self.encoding = encoding
+        self.buffer: mmap.mmap | None = None
+        self.errors: list[tuple[int, str]] = []
+
+    def lines(self):
+        """Yield (line number, byte offset, raw line) for every line."""
+        if isinstance(self.source, str):
+            with open(self.source, "rb") as f:
+                try:
+                    self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError:
+                    # empty files cannot be mapped
+                    return
+        if self.buffer is None:
+            offset = 0
+            for number, raw in enumerate(self.source):
+                yield number, offset, raw
+                offset += len(raw)
+            return
+        buf = self.buffer
+        offset = 0
+        number = 0
+        size = len(buf)
+        while offset < size:
+            newline = buf.find(b"\n", offset)
+            end = size if newline < 0 else newline + 1
+            yield number, offset, buf[offset:end]
+            offset = end
+            number += 1
+
+    def __iter__(self):
+        for number, offset, raw in self.lines():
+            raw = raw.rstrip(b"\r\n")
+            try:
+                text = raw.decode(self.encoding)
+                if not text.strip():
+                    continue
+                tokens = TokenArray.from_text(text, RegexLexer).tokens
+            except Exception as e:
+                self.errors.append((number, str(e)))
+                continue
+            if len(text) == len(raw):
+                # plain ASCII: character and byte offsets coincide
+                for token in tokens:
+                    token.start += offset
+                    token.end += offset
+            else:
+                for token in tokens:
+                    token.start = offset + len(text[: token.start].encode(self.encoding))
+                    token.end = offset + len(text[: token.end].encode(self.encoding))
+            array = TokenArray(tokens)
+            array.sentence = number
+            array.start = offset
+            array.end = offset + len(raw)
+            yield array
+
+    def text(self, token: Token):
+        """Source text of a token, sliced from the mapped file."""
+        return self.buffer[token.start : token.end].decode(self.encoding)
+
+    def close(self):
+        if self.buffer is not None:
+            self.buffer.close()
+            self.buffer = None
@@ -0,0 +1,190 @@
+import argparse
+import mmap
+import os
+import re
+import struct
+
+###############################################################################
+#                                                                             #
+#  COMPILED LEXICON                                                           #
+#                                                                             #
+###############################################################################
+#
+# A lexicon snapshot is a single read-only file laid out as:
+#
+#   header   MAGIC, type count, word count, type table / index / blob offsets
+#   types    per type: u8 length + utf-8 name
+#   index    per word, sorted by utf-8 key: key offset, key length,
+#            record offset (u32 each)
+#   blob     keys and records; a record is u8 type count + one u8 type id
+#            per type (in lexer order), then root, prefix and suffix as
+#            u8 length + utf-8 (length 255 means None)
+#
+# Lookups binary-search the index straight out of the mmap, so opening a
+# snapshot only decodes the small type table.
+
+MAGIC = b"PSGLEX\x00\x01"
+HEADER = struct.Struct("<8sIIIII")
+INDEX_ENTRY = struct.Struct("<III")
+NONE_LENGTH = 255
+
+WORD_PATTERN = re.compile(r"[^\W\d_](?:[^\W\d_]|-)*")
+
+
+class LexiconEntry(object):
+    def __init__(self, types: tuple, root: str | None, prefix: str | None, suffix: str | None):
+        self.types = types
+        self.root = root
+        self.prefix = prefix
+        self.suffix = suffix
+
+    def __repr__(self):
+        return "LexiconEntry({}, root={!r}, prefix={!r}, suffix={!r})".format(
+            self.types, self.root, self.prefix, self.suffix
+        )
+
+
+class Lexicon(object):
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n_types, n_words, types_off, index_off, _ = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC:
+            self.buffer.close()
+            raise ValueError("Not a compiled lexicon: " + path)
+        self.size = n_words
+        self.index_offset = index_off
+        self.type_names = []
+        pos = types_off
+        for _ in range(n_types):
+            length = self.buffer[pos]
+            self.type_names.append(self.buffer[pos + 1 : pos + 1 + length].decode())
+            pos += 1 + length
+
+    def find(self, key: bytes):
+        """Binary search for the index slot of `key`, or -1."""
+        buf = self.buffer
+        lo, hi = 0, self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            key_off, key_len, _ = INDEX_ENTRY.unpack_from(buf, self.index_offset + mid * INDEX_ENTRY.size)
+            probe = buf[key_off : key_off + key_len]
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                return mid
+        return -1
+
+    def read_string(self, pos):
+        length = self.buffer[pos]
+        if length == NONE_LENGTH:
+            return None, pos + 1
+        return self.buffer[pos + 1 : pos + 1 + length].decode(), pos + 1 + length
+
+    def lookup(self, word: str):
+        slot = self.find(word.encode())
+        if slot < 0:
+            return None
+        _, _, pos = INDEX_ENTRY.unpack_from(self.buffer, self.index_offset + slot * INDEX_ENTRY.size)
+        count = self.buffer[pos]
+        names = self.type_names
+        types = tuple(names[i] for i in self.buffer[pos + 1 : pos + 1 + count])
+        root, pos = self.read_string(pos + 1 + count)
+        prefix, pos = self.read_string(pos)
+        suffix, pos = self.read_string(pos)
+        return LexiconEntry(types, root, prefix, suffix)
+
+    def __contains__(self, word: str):
+        return self.find(word.encode()) >= 0
+
+    def __len__(self):
+        return self.size
+
+    def close(self):
+        self.buffer.close()
+
+
+def pack_string(value: str | None):
+    if value is None:
+        return bytes([NONE_LENGTH])
+    data = value.encode()
+    if len(data) >= NONE_LENGTH:
+        raise ValueError("String too long for lexicon: " + value)
+    return bytes([len(data)]) + data
+
+
+def compile_lexicon(words, path: str, analyze=None):
+    """Analyze every word once and write the results as a lexicon snapshot.
+
+    The literal and reserved word tables from the lexer are always included.
+    `analyze` maps a word to (types, stem) and defaults to the stemmer and
+    dictionary analysis used by the lexer. Returns the number of entries.
+    """
+    from .lexer import LITERAL_TOKEN_MAP, RESERVED_WORDS
+    from .lexer import analyze as analyze_word
+
+    analyze = analyze or analyze_word
+    vocabulary = set(words)
+    vocabulary.update(LITERAL_TOKEN_MAP)
+    vocabulary.update(token.value for token in RESERVED_WORDS.values())
+
+    type_ids = {}
+    records = []
+    for word in sorted(vocabulary, key=str.encode):
+        types, stem = analyze(word)
+        ids = bytes(type_ids.setdefault(kind, len(type_ids)) for kind in types)
+        record = (
+            bytes([len(ids)])
+            + ids
+            + pack_string(stem.root)
+            + pack_string(stem.prefix)
+            + pack_string(stem.suffix)
+        )
+        records.append((word.encode(), record))
+    if len(type_ids) > 255:
+        raise ValueError("Too many token types for lexicon")
+
+    types_blob = b"".join(pack_string(kind) for kind in type_ids)
+    types_off = HEADER.size
+    index_off = types_off + len(types_blob)
+    blob_off = index_off + INDEX_ENTRY.size * len(records)
+
+    index = bytearray()
+    blob = bytearray()
+    for key, record in records:
+        key_off = blob_off + len(blob)
+        blob += key
+        index += INDEX_ENTRY.pack(key_off, len(key), blob_off + len(blob))
+        blob += record
+
+    header = HEADER.pack(MAGIC, len(type_ids), len(records), types_off, index_off, blob_off)
+    # write next to the target and rename so running workers never map a partial file
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(header)
+        f.write(types_blob)
+        f.write(index)
+        f.write(blob)
+    os.replace(tmp, path)
+    return len(records)
+
+
+def read_words(path: str):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            yield from WORD_PATTERN.findall(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile a word list into a lexicon snapshot")
+    parser.add_argument("words", nargs="+", help="word list or corpus files")
+    parser.add_argument("--output", "-o", required=True, help="lexicon file to write")
+    args = parser.parse_args()
+    words = set()
+    for path in args.words:
+        words.update(read_words(path))
+    count = compile_lexicon(words, args.output)
+    print("Wrote {} entries to {}".format(count, args.output))
@@ -1,5 +1,9 @@
-from .lexer import Lexer, Token
-from cebstemmer import stemmer
+import functools
+import multiprocessing
+import sys
+import time
+from .lexer import Lexer, RegexLexer, Token, TokenArray, analyze, swap_lexicon, use_lexicon
+from .lexicon import Lexicon
 from .tokens import *
 from .literals import *
 
@@ -8,18 +12,103 @@ from .literals import *
 #  PARSER                                                                     #
 #                                                                             #
 ###############################################################################
+
+# first-token masks of the parse branches, tested with a single AND
+VERB_OBJECT_FIRST = (
+    MASK_DET
+    | MASK_PRON_POS
+    | MASK_PRON_POS_NG
+    | MASK_PRON_POS_PLURAL_NG
+    | MASK_PRON_PER
+    | MASK_DET_PLURAL
+    | MASK_PRON_POS_PLURAL
+    | MASK_PRON_PER_PLURAL
+    | MASK_PRON_DEM
+    | MASK_IKA
+    | MASK_NUM
+    | MASK_NOUN
+    | MASK_MONTH
+)
+PREDICATE_NOUN_FIRST = (
+    MASK_DET
+    | MASK_PRON_DEM
+    | MASK_PRON_POS
+    | MASK_PRON_POS_NG
+    | MASK_PRON_POS_PLURAL_NG
+    | MASK_PRON_PER
+    | MASK_DET_PLURAL
+    | MASK_PRON_POS_PLURAL
+    | MASK_PRON_PER_PLURAL
+    | MASK_IKA
+    | MASK_NUM
+    | MASK_ADJ
+    | MASK_KA
+    | MASK_NOUN
+    | MASK_MONTH
+)
+PREDICATE_DESCRIPTIVE_FIRST = MASK_PLACE | MASK_ADJ | MASK_ADV | MASK_ADV_SPE
+DESCRIPTIVE_ADVERB_FIRST = MASK_PLACE | MASK_ADV | MASK_ADV_SPE
+PLACE_TIME_FIRST = MASK_TIME | MASK_NIAGING | MASK_SUNOD | MASK_KARONG
+ADVERB_TIME_FIRST = MASK_TIME | MASK_NIAGING | MASK_SUNOD | MASK_KARONG | MASK_HOUR
+NOUN_EXTRAS_FIRST = MASK_KA | MASK_NUM | MASK_ADJ
+NOUN_SINGULAR_FIRST = MASK_DET | MASK_PRON_POS | MASK_PRON_PER | MASK_NOUN | MASK_PRON_POS_NG
+NOUN_PLURAL_FIRST = (
+    MASK_DET_PLURAL
+    | MASK_PRON_POS_PLURAL
+    | MASK_PRON_POS_PLURAL_NG
+    | MASK_PRON_PER_PLURAL
+    | MASK_MGA
+)
+POSSESS_PREP_FIRST = PREDICATE_NOUN_FIRST | MASK_PREP
+# tokens panic-mode recovery skips ahead to
+SYNC_TOKENS = MASK_COMMA | MASK_CONJ | MASK_NGA | MASK_EOF
+
+# branches of the rules with overlapping first tokens, in priority order:
+# (first-token mask, required value or None, method)
+PREDICATE_BRANCHES = (
+    (PREDICATE_NOUN_FIRST, None, "noun_phrase_part"),
+    (PREDICATE_DESCRIPTIVE_FIRST, None, "descriptive"),
+    (MASK_PREP, None, "prep_phrase"),
+    (MASK_INT, None, "predicate_int"),
+)
+DESCRIPTIVE_BRANCHES = (
+    (MASK_ADJ, None, "descriptive_adj"),
+    (DESCRIPTIVE_ADVERB_FIRST, None, "adverb"),
+)
+NOUN_PHRASE_BRANCHES = (
+    (MASK_IKA, None, "noun_phrase_ika"),
+    (MASK_MONTH, None, "date"),
+    (MASK_DET, "ang", "noun_phrase_ang_nga"),
+    (NOUN_EXTRAS_FIRST, None, "noun_phrase_extras"),
+    (NOUN_SINGULAR_FIRST, None, "noun_phrase_singular_nga"),
+    (NOUN_PLURAL_FIRST, None, "noun_phrase_plural_nga"),
+    (MASK_PRON_DEM, None, "dem_pron_nga"),
+)
+
+
 class Error(object):
+    __slots__ = ("error", "correct", "wrong_value", "right_value")
+
     def __init__(self, error: str, fix: str, evalue: str, svalue: str | None=None):
         self.error = error
         self.correct = fix
         self.wrong_value = evalue
         self.right_value = svalue
 
+class ParseAborted(Exception):
+    """Raised inside the parser when a sentence exceeds its step budget or
+    deadline; parse() turns it into an error and a missing tree."""
+
+
+# AST nodes are slotted: a long sentence creates hundreds of them, most
+# fields stay None, and parsed corpora are kept resident for evaluation
 class AST(object):
-    pass
+    __slots__ = ()
 
 
 class SentencePart(AST):
+    __slots__ = ("left", "conj", "right")
+
     def __init__(self, left, conj=None, right=None):
         self.left = left
         self.conj = conj
@@ -27,6 +116,8 @@ class SentencePart(AST):
 
 
 class NounPhrasePart(AST):
+    __slots__ = ("left", "conj", "right")
+
     def __init__(self, left, conj=None, right=None):
         self.left = left
         self.conj = conj
@@ -34,12 +125,16 @@ class NounPhrasePart(AST):
 
 
 class Sentence(AST):
+    __slots__ = ("pred_phrase", "noun_phrase")
+
     def __init__(self, pred, nounp=None):
         self.pred_phrase = pred
         self.noun_phrase = nounp
 
 
 class PredPhrase(AST):
+    __slots__ = ("pred", "verb_phr", "adv", "mid_adv")
+
     def __init__(self, verbph, endadv, pred=None, midadv=None):
         self.pred = pred
         self.verb_phr = verbph
@@ -48,6 +143,8 @@ class PredPhrase(AST):
 
 
 class Date(AST):
+    __slots__ = ("type", "month", "day", "comma", "year", "extra", "sa")
+
     def __init__(self, kind, month, day, com=None, year=None, extra=None, sa=None):
         self.type = kind
         self.month = month
@@ -59,22 +156,30 @@ class Date(AST):
 
 
 class Predicate(AST):
+    __slots__ = ("content",)
+
     def __init__(self, element):
         self.content = element
 
 
 class Descriptive(AST):
+    __slots__ = ("content",)
+
     def __init__(self, element):
         self.content = element
 
 
 class Adverb(AST):
+    __slots__ = ("content", "addition")
+
     def __init__(self, element, add=None):
         self.content = element
         self.addition = add
 
 
 class Time(AST):
+    __slots__ = ("noun", "number", "day")
+
     def __init__(self, time, num=None, day=None):
         self.noun = time
         self.number = num
@@ -82,6 +187,8 @@ class Time(AST):
 
 
 class NounPhrase(AST):
+    __slots__ = ("complex_noun", "prep_phrase", "nga", "clause")
+
     def __init__(self, noun, prep, nga=None, other=None):
         self.complex_noun = noun
         self.prep_phrase = prep
@@ -90,12 +197,16 @@ class NounPhrase(AST):
 
 
 class VerbPhrase(AST):
+    __slots__ = ("complex_verb", "opt")
+
     def __init__(self, verb, opt):
         self.complex_verb = verb
         self.opt = opt
 
 
 class PrepPhrase(AST):
+    __slots__ = ("prep", "second_prep", "noun_phrase", "adv", "extra")
+
     def __init__(self, prep, second, noun, adv=None, extra=None):
         self.prep = prep
         self.second_prep = second
@@ -105,6 +216,8 @@ class PrepPhrase(AST):
 
 
 class Adjective(AST):
+    __slots__ = ("adjectives", "nga", "clit_ng")
+
     def __init__(self, adj, nga, ng=None):
         self.adjectives = adj
         self.nga = nga
@@ -112,12 +225,16 @@ class Adjective(AST):
 
 
 class Word(AST):
+    __slots__ = ("content", "type")
+
     def __init__(self, content: Token, type):
         self.content = content
         self.type = type
 
 
 class Possess(AST):
+    __slots__ = ("type", "link", "noun")
+
     def __init__(self, type, pos, noun=None):
         self.type = type
         self.link = pos
@@ -125,6 +242,8 @@ class Possess(AST):
 
 
 class AdjOrd(AST):
+    __slots__ = ("marker", "dash", "number", "nga")
+
     def __init__(self, mark, dash, num, nga):
         self.marker = mark
         self.dash = dash
@@ -133,6 +252,8 @@ class AdjOrd(AST):
 
 
 class AdjNum(AST):
+    __slots__ = ("number", "ka", "conj")
+
     def __init__(self, num, ka, conj=None):
         self.number = num
         self.ka = ka
@@ -140,6 +261,8 @@ class AdjNum(AST):
 
 
 class Noun(AST):
+    __slots__ = ("type", "adjective", "nouns", "possess", "mga")
+
     def __init__(self, type, adj, noun, poss, mga=None):
         self.type = type
         self.adjective = adj
@@ -149,6 +272,8 @@ class Noun(AST):
 
 
 class CompoundNoun(AST):
+    __slots__ = ("type", "other_phrase", "noun_phrase", "extra")
+
     def __init__(self, kind, noun, other=None, extra=None):
         self.type = kind
         self.other_phrase = other
@@ -157,6 +282,8 @@ class CompoundNoun(AST):
 
 
 class NounPhraseSingularPlural(AST):
+    __slots__ = ("type", "noun_sp", "start", "pos", "ordinal", "number", "mga", "extra")
+
     def __init__(
         self,
         type,
@@ -179,6 +306,8 @@ class NounPhraseSingularPlural(AST):
 
 
 class DemPronoun(AST):
+    __slots__ = ("type", "pronoun", "clit", "ordinal", "number", "mga")
+
     def __init__(self, type, dem, clit=None, ordinal=None, num=None, mga=None):
         self.type = type
         self.pronoun = dem
@@ -189,6 +318,8 @@ class DemPronoun(AST):
 
 
 class VerbComplex(AST):
+    __slots__ = ("prefix", "root", "suffix", "extra")
+
     def __init__(self, prefix, root, suffix, extra=None):
         self.prefix = prefix
         self.root = root
@@ -197,9 +328,54 @@ class VerbComplex(AST):
 
 
 class Parser(object):
-    def __init__(self):
+    def __init__(
+        self,
+        lexer_class: type[Lexer] = Lexer,
+        pretokenize: bool = False,
+        max_steps: int | None = 50000,
+        timeout: float | None = None,
+        max_stall: int = 8,
+        backtrack: bool = False,
+    ):
         self.errors = []
+        # per-sentence limits: token matches attempted, wall-clock seconds,
+        # and failed matches in a row before panic-mode recovery kicks in
+        self.max_steps = max_steps
+        self.timeout = timeout
+        self.max_stall = max_stall
+        self.steps = 0
+        self.stall = 0
+        # failed matches and skips so far; agreement and date diagnostics
+        # are not counted, so backtracking never steers around them
+        self.mismatches = 0
+        self.deadline: float | None = None
+        # set when the last sentence was abandoned
+        self.failed = False
+        # Lexer or a drop-in replacement such as RegexLexer
+        self.lexer_class = lexer_class
+        # lex the whole sentence into a TokenArray before parsing
+        self.pretokenize = pretokenize
+        # try every matching branch of predicate, noun_phrase and descriptive
+        # and keep the best; needs a token array to rewind, so implies
+        # pretokenize. `memo` maps (rule, position) to the chosen parse.
+        self.backtrack = backtrack
+        self.memo: dict | None = None
+        # results of sentence, noun_phrase and prep_phrase keyed on their
+        # first token, carried from one parse of a token array to the next
+        # by reparse; `reach` is the furthest position looked at so far
+        self.subtrees: dict | None = None
+        self.reach = 0
+        # set while prep_phrase_add parses the noun phrase of a chain item:
+        # the phrase leaves a following preposition to the chain's loop
+        # instead of nesting the rest of the chain inside itself
+        self.in_chain = False
         self.lexer: Lexer = None
+        # with a token array the parser moves a cursor over `token_list`,
+        # otherwise it pulls from the lexer through `lookahead`
+        self.tokens: TokenArray = None
+        self.token_list: list[Token] = None
+        self.pos = 0
+        self.lookahead: list[Token] = []
         # set current token to the first token taken from the input
         self.current_token: Token = None
 
@@ -213,8 +389,22 @@ class Parser(object):
         # otherwise raise an exception.
         # print (self.current_token.types+" "+token_type)
         # print ("eee")
-        if token_type in self.current_token.types:
-            self.current_token = self.lexer.get_next_token()
+        self.steps += 1
+        if self.max_steps is not None and self.steps > self.max_steps:
+            raise ParseAborted("step budget of {} exceeded".format(self.max_steps))
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise ParseAborted("deadline of {}s exceeded".format(self.timeout))
+        if self.current_token.mask & TYPE_BITS.get(token_type, 0):
+            self.stall = 0
+            if self.token_list is not None:
+                # the cursor stays on the trailing EOF token
+                if self.pos < len(self.token_list) - 1:
+                    self.pos += 1
+                    self.current_token = self.token_list[self.pos]
+            elif self.lookahead:
+                self.current_token = self.lookahead.pop(0)
+            else:
+                self.current_token = self.lexer.get_next_token()
         else:
             self.errors.append(
                 Error(
@@ -223,76 +413,195 @@ class Parser(object):
                     self.current_token.value,
                 )
             )
+            self.mismatches += 1
+            self.stall += 1
+            if self.stall >= self.max_stall:
+                self.synchronize()
+
+    def next_token(self):
+        """Move past the current token whatever its type."""
+        if self.token_list is not None:
+            if self.pos < len(self.token_list) - 1:
+                self.pos += 1
+                self.current_token = self.token_list[self.pos]
+        elif self.lookahead:
+            self.current_token = self.lookahead.pop(0)
+        else:
+            self.current_token = self.lexer.get_next_token()
+
+    def synchronize(self):
+        """Panic-mode recovery after repeated failed matches on one token:
+        drop tokens up to the next COMMA, CONJ, NGA or EOF so the rules
+        above can carry on from there."""
+        self.stall = 0
+        if self.current_token.mask & MASK_EOF:
+            raise ParseAborted("no progress at end of input")
+        skipped = []
+        if self.current_token.mask & SYNC_TOKENS:
+            # the sync token itself is what the rules keep failing on
+            skipped.append(str(self.current_token.value))
+            self.next_token()
+        while not self.current_token.mask & SYNC_TOKENS:
+            skipped.append(str(self.current_token.value))
+            self.next_token()
+        if skipped:
+            self.mismatches += 1
+            self.errors.append(
+                Error("Skipped unexpected tokens", "Resumed at the next separator", " ".join(skipped))
+            )
+
+    def peek_token(self, offset=1):
+        """Return the token `offset` places after the current one without
+        consuming anything. Past the end of input this is the EOF token."""
+        if self.token_list is not None:
+            return self.token_list[min(self.pos + offset, len(self.token_list) - 1)]
+        while len(self.lookahead) < offset:
+            last = self.lookahead[-1] if self.lookahead else self.current_token
+            if TOKEN_EOF in last.types:
+                return last
+            self.lookahead.append(self.lexer.get_next_token())
+        return self.lookahead[offset - 1]
+
+    def stem(self, token: Token):
+        """Root, prefix and suffix of a word token. The lexer attaches these
+        to every word it resolves; anything else is stemmed here."""
+        if token.root is None:
+            _, analysis = analyze(token.value)
+            return analysis
+        return token
 
     def contain(self, words):
-        result = False
-        for x in self.current_token.types:
-            if x in words:
-                result = True
-                break
+        # `words` is a type mask or a list of type names
+        if type(words) != int:
+            words = type_mask(words)
+        return self.current_token.mask & words != 0
+
+    def branch(self, rule: str, branches):
+        """Parse the first of `branches` whose first-token test the current
+        token passes, or return None if none does. In backtracking mode
+        every passing branch is tried instead; see best_branch."""
+        token = self.current_token
+        if self.memo is not None:
+            return self.best_branch(rule, branches)
+        for mask, value, name in branches:
+            if token.mask & mask and (value is None or token.value == value):
+                return getattr(self, name)()
+        return None
+
+    def best_branch(self, rule: str, branches):
+        """Try each branch the current token can start from the same
+        position and keep the one with the fewest failed matches, then the
+        most tokens consumed, earlier branches winning ties. The outcome is
+        memoized per (rule, position), so a sentence is still parsed in
+        linear time however often the alternatives above revisit it."""
+        start = self.pos
+        key = (rule, start)
+        memo = self.memo.get(key)
+        if memo is None:
+            token = self.current_token
+            errors = len(self.errors)
+            mismatches = self.mismatches
+            stall = self.stall
+            best = None
+            reach = start
+            for mask, value, name in branches:
+                if not (token.mask & mask and (value is None or token.value == value)):
+                    continue
+                if best is not None:
+                    self.pos, self.current_token, self.stall = start, token, stall
+                    self.mismatches = mismatches
+                result = getattr(self, name)()
+                reach = max(reach, self.pos)
+                score = (self.mismatches - mismatches, start - self.pos)
+                if best is None or score < best[0]:
+                    best = (score, result, self.pos, self.stall, score[0], self.errors[errors:])
+                del self.errors[errors:]
+            self.mismatches = mismatches
+            if best is None:
+                memo = (None, start, stall, 0, [], reach)
+            else:
+                memo = best[1:] + (reach,)
+            self.memo[key] = memo
+        result, end, stall, mismatches, errors, reach = memo
+        self.pos = end
+        self.current_token = self.token_list[end]
+        self.stall = stall
+        self.mismatches += mismatches
+        self.errors.extend(errors)
+        # abandoned branches may have looked further than the kept one
+        self.reach = max(self.reach, reach)
         return result
 
+    def subtree(self, rule: str, parse, *args):
+        """Run `parse(*args)` for `rule` at the current token, or reuse what
+        it returned in an earlier parse of the same token array. A recorded
+        result still holds when every token it looked at is still in place
+        (tokens kept by TokenArray.edit are the same objects) and it starts
+        in the same recovery state."""
+        start = self.pos
+        token = self.current_token
+        entries = self.subtrees.get(token)
+        if entries is None:
+            entries = self.subtrees[token] = {}
+        entry = entries.get(rule)
+        if entry is not None:
+            node, seen, stall, end, end_stall, steps, mismatches, errors = entry
+            if stall == self.stall and self.token_list[start : start + len(seen)] == seen:
+                self.steps += steps
+                if self.max_steps is not None and self.steps > self.max_steps:
+                    raise ParseAborted("step budget of {} exceeded".format(self.max_steps))
+                self.pos = start + end
+                self.current_token = self.token_list[self.pos]
+                self.stall = end_stall
+                self.mismatches += mismatches
+                self.errors.extend(errors)
+                self.reach = max(self.reach, start + len(seen) - 1)
+                return node
+        reach = self.reach
+        self.reach = start
+        stall, steps, mismatches, errors = self.stall, self.steps, self.mismatches, len(self.errors)
+        node = parse(*args)
+        self.reach = max(self.reach, self.pos)
+        entries[rule] = (
+            node,
+            self.token_list[start : self.reach + 1],
+            stall,
+            self.pos - start,
+            self.stall,
+            self.steps - steps,
+            self.mismatches - mismatches,
+            self.errors[errors:],
+        )
+        self.reach = max(reach, self.reach)
+        return node
+
     def sentence_part(self):
         """sentence_part : sentence
         | sentence (CONJ|COMMA) sentence_part
         """
+        # parsed as a loop so long enumerations don't recurse per item;
+        # the tree is still nested to the right
+        parts = []
         left = self.sentence()
-
-        if TOKEN_CONJ in self.current_token.types:
+        while self.current_token.mask & (MASK_CONJ | MASK_COMMA):
             conjunct = self.current_token
-            self.eat(TOKEN_CONJ)
-            return self.sentence_part_extra(left, conjunct)
-        elif TOKEN_COMMA in self.current_token.types:
-            conjunct = self.current_token
-            self.eat(TOKEN_COMMA)
-            return self.sentence_part_extra(left, conjunct)
-        else:
-            return SentencePart(left)
-
-    def sentence_part_extra(self, left, conj):
-        right = self.sentence_part()
-        return SentencePart(left, Word(conj, TOKEN_CONJ), right)
+            self.eat(TOKEN_CONJ if self.current_token.mask & MASK_CONJ else TOKEN_COMMA)
+            parts.append((left, Word(conjunct, TOKEN_CONJ)))
+            left = self.sentence()
+        node = SentencePart(left)
+        for left, conj in reversed(parts):
+            node = SentencePart(left, conj, node)
+        return node
 
     def sentence(self):
         """sentence : pred_phrase (noun_phrase_part)?"""
+        if self.subtrees is not None:
+            return self.subtree("sentence", self.sentence_parts)
+        return self.sentence_parts()
+
+    def sentence_parts(self):
         pred_phrase = self.pred_phrase()
         noun_phrase = self.noun_phrase_part()
-        if pred_phrase.verb_phr is not None:
-            pref = pred_phrase.verb_phr.complex_verb.prefix.content
-            noun = (
-                pred_phrase.verb_phr.opt
-                if pred_phrase.verb_phr.opt is not None
-                else noun_phrase
-            )
-            if (
-                pref is not None
-                and pref in ["nang", "mang"]
-                and noun.left is not None
-                and noun.left.complex_noun.type == "Singular"
-                and noun.conj is None
-            ):
-                self.errors.append(
-                    Error(
-                        "Using a plural prefix for a singular noun",
-                        "Use a singular prefix",
-                        pref + "-",
-                        ["nag-", "naga-", "mag-", "maga-"],
-                    )
-                )
-            elif (
-                pref is not None
-                and pref in ["nag", "naga", "mag", "maga"]
-                and noun.left is not None
-                and (noun.left.complex_noun.type == "Plural" or noun.conj is not None)
-            ):
-                self.errors.append(
-                    Error(
-                        "Using a singular prefix for a plural noun",
-                        "Use a plural prefix",
-                        pref + "-",
-                        ["nang-", "mang-"],
-                    )
-                )
         return Sentence(pred_phrase, noun_phrase)
 
     def conditions(self, conds):
@@ -302,100 +611,19 @@ class Parser(object):
         """pred_phrase : verb_phrase (adverb)?
         | predicate (adverb)? verb_phrase (adverb)?
         """
-        if TOKEN_VERB in self.current_token.types:
+        if self.current_token.mask & MASK_VERB:
             verb_phrase = self.verb_phrase()
             end_adv = self.adverb()
-            self.tenses(verb_phrase, end_adv)
             return PredPhrase(verb_phrase, end_adv)
         else:
             predicate = self.predicate()
             mid_adv = self.adverb()
             verb_phrase = (
-                self.verb_phrase() if TOKEN_VERB in self.current_token.types else None
+                self.verb_phrase() if self.current_token.mask & MASK_VERB else None
             )
             end_adv = self.adverb()
-            self.tenses(verb_phrase, end_adv, mid_adv)
             return PredPhrase(verb_phrase, end_adv, predicate, mid_adv)
 
-    def tenses_condition(self, given, one, two, root):
-        words_p = words_s = correct = None
-        if given in [TOKEN_NIAGING.lower(), "kaganina", "kagahapon"]:
-            words_p = LITERALS_PAST_PREFIX
-            words_s = LITERALS_PAST_SUFFIX
-            correct = "PAST"
-        elif given in [TOKEN_KARONG.lower(), "karon"]:
-            words_p = LITERALS_PRESENT_PREFIX
-            words_s = LITERALS_PRESENT_SUFFIX
-            correct = "PRESENT"
-        elif given in [TOKEN_SUNOD.lower(), "ugma"]:
-            words_p = LITERALS_FUTURE_PREFIX
-            words_s = LITERALS_FUTURE_SUFFIX
-            correct = "FUTURE"
-        if (
-            one.content is not None and one.content not in words_p
-        ) and two.content is None:
-            self.errors.append(
-                Error(
-                    one.type + " from root " + root,
-                    correct + "_PREFIX",
-                    one.content,
-                    words_p,
-                )
-            )
-        elif one.content is None and (two.content is not None and two.content in words_s):
-            self.errors.append(
-                Error(
-                    two.type + " from root " + root,
-                    correct + "_SUFFIX",
-                    two.content,
-                    words_s,
-                )
-            )
-        elif one.content is not None and two.content is not None:
-            if one.content not in words_p:
-                self.errors.append(
-                    Error(
-                        one.type + " from root " + root,
-                        correct + "_PREFIX",
-                        one.content,
-                        words_p,
-                    )
-                )
-            if two.content not in words_s:
-                self.errors.append(
-                    Error(
-                        two.type + " from root " + root,
-                        correct + "_SUFFIX",
-                        two.content,
-                        words_s,
-                    )
-                )
-
-    def tenses(self, verb, end, mid=None):
-        if verb is not None:
-            prefix = verb.complex_verb.prefix
-            suffix = verb.complex_verb.suffix
-            if end is not None and type(end.content) == Time:
-                noun = (
-                    end.content.noun.content
-                    if type(end.content.noun) != list
-                    else end.content.noun[0].content
-                )
-                if TOKEN_HOUR not in noun.type:
-                    self.tenses_condition(
-                        noun.value, prefix, suffix, verb.complex_verb.root.content.value
-                    )
-            elif end is not None and type(end.addition) == Time:
-                noun = (
-                    end.addition.noun.content
-                    if type(end.addition.noun) != list
-                    else end.addition.noun[0].content
-                )
-                if TOKEN_HOUR not in noun.type:
-                    self.tenses_condition(
-                        noun.value, prefix, suffix, verb.complex_verb.root.content.value
-                    )
-
     def verb_phrase(self):
         """verb_phrase : verb_complex
         | verb_complex noun_phrase_part
@@ -404,27 +632,11 @@ class Parser(object):
         verb = self.verb_complex()
         end = None
         if (
-            self.contain(
-                [
-                    TOKEN_DET,
-                    TOKEN_PRON_POS,
-                    TOKEN_PRON_POS_NG,
-                    TOKEN_PRON_POS_PLURAL_NG,
-                    TOKEN_PRON_PER,
-                    TOKEN_DET_PLURAL,
-                    TOKEN_PRON_POS_PLURAL,
-                    TOKEN_PRON_PER_PLURAL,
-                    TOKEN_PRON_DEM,
-                    TOKEN_IKA,
-                    TOKEN_NUM,
-                    TOKEN_NOUN,
-                    TOKEN_MONTH,
-                ]
-            )
+            self.current_token.mask & VERB_OBJECT_FIRST
             or self.current_token.value == "ka"
         ):
             end = self.noun_phrase_part()
-        elif TOKEN_PREP in self.current_token.types:
+        elif self.current_token.mask & MASK_PREP:
             end = self.prep_phrase()
         return VerbPhrase(verb, end)
 
@@ -432,8 +644,18 @@ class Parser(object):
         """verb_complex : (verb_prefix)? VERB (verb_suffix)?"""
         verb = self.current_token
         self.eat(TOKEN_VERB)
-        word = stemmer.stem_word(verb.value, as_object=True)
-        verb.value = word.root
+        if self.current_token.mask & MASK_CLIT_Y:
+            clit = self.current_token
+            self.eat(TOKEN_CLIT_Y)
+        else:
+            clit = None
+        return self.complex_verb(verb, clit)
+
+    def complex_verb(self, verb: Token, clit: Token | None = None):
+        """Split a matched VERB into prefix, root and suffix with their tense labels."""
+        word = self.stem(verb)
+        # the root gets its own token so the lexed one stays reusable
+        verb = Token(verb.types, word.root, verb.mask, word.root, word.prefix, word.suffix)
         pref_tense = []
         suff_tense = []
         if word.prefix in LITERALS_PAST_PREFIX:
@@ -450,11 +672,9 @@ class Parser(object):
             suff_tense.append("FUTURE_SUFFIX")
         if word.suffix in LITERALS_PRESENT_SUFFIX:
             suff_tense.append("PRESENT_SUFFIX")
-        suff = ", ".join(suff_tense) if len(suff_tense) > 0 else "SUFFIX"
-        pre = ", ".join(pref_tense) if len(pref_tense) > 0 else "PREFIX"
-        if TOKEN_CLIT_Y in self.current_token.types:
-            clit = self.current_token
-            self.eat(TOKEN_CLIT_Y)
+        suff = sys.intern(", ".join(suff_tense)) if len(suff_tense) > 0 else "SUFFIX"
+        pre = sys.intern(", ".join(pref_tense)) if len(pref_tense) > 0 else "PREFIX"
+        if clit is not None:
             return VerbComplex(
                 Word(word.prefix, pre),
                 Word(verb, TOKEN_VERB),
@@ -473,49 +693,23 @@ class Parser(object):
         | INT
         | empty
         """
-        if self.contain(
-            [
-                TOKEN_DET,
-                TOKEN_PRON_DEM,
-                TOKEN_PRON_POS,
-                TOKEN_PRON_POS_NG,
-                TOKEN_PRON_POS_PLURAL_NG,
-                TOKEN_PRON_PER,
-                TOKEN_DET_PLURAL,
-                TOKEN_PRON_POS_PLURAL,
-                TOKEN_PRON_PER_PLURAL,
-                TOKEN_IKA,
-                TOKEN_NUM,
-                TOKEN_ADJ,
-                TOKEN_KA,
-                TOKEN_NOUN,
-                TOKEN_MONTH,
-            ]
-        ):
-            thing = element = self.noun_phrase_part()
-        elif self.contain([TOKEN_PLACE, TOKEN_ADJ, TOKEN_ADV, TOKEN_ADV_SPE]):
-            thing = element = self.descriptive()
-        elif TOKEN_PREP in self.current_token.types:
-            thing = element = self.prep_phrase()
-        elif TOKEN_INT in self.current_token.types:
-            element = self.current_token
-            self.eat(TOKEN_INT)
-            thing = Word(element, TOKEN_INT)
-        else:
-            thing = None
-        return Predicate(thing)
+        return Predicate(self.branch("predicate", PREDICATE_BRANCHES))
+
+    def predicate_int(self):
+        element = self.current_token
+        self.eat(TOKEN_INT)
+        return Word(element, TOKEN_INT)
 
     def descriptive(self):
         """descriptive : ADJ
         | adverb
         """
-        if TOKEN_ADJ in self.current_token.types:
-            element = self.current_token
-            self.eat(TOKEN_ADJ)
-            thing = Word(element, TOKEN_ADJ)
-        elif self.contain([TOKEN_PLACE, TOKEN_ADV, TOKEN_ADV_SPE]):
-            thing = element = self.adverb()
-        return Descriptive(thing)
+        return Descriptive(self.branch("descriptive", DESCRIPTIVE_BRANCHES))
+
+    def descriptive_adj(self):
+        element = self.current_token
+        self.eat(TOKEN_ADJ)
+        return Word(element, TOKEN_ADJ)
 
     def adverb(self):
         """adverb : PLACE (time)?
@@ -526,39 +720,39 @@ class Parser(object):
         | DILI (ADV_SPE)?
         | empty
         """
-        if TOKEN_PLACE in self.current_token.types:
+        if self.current_token.mask & MASK_PLACE:
             place = self.current_token
             self.eat(TOKEN_PLACE)
-            if self.contain([TOKEN_TIME, TOKEN_NIAGING, TOKEN_SUNOD, TOKEN_KARONG]):
+            if self.current_token.mask & PLACE_TIME_FIRST:
                 time = self.time()
                 return Adverb(Word(place, TOKEN_PLACE), time)
             else:
                 return Adverb(Word(place, TOKEN_PLACE))
-        elif TOKEN_ADV_SPE in self.current_token.types:
+        elif self.current_token.mask & MASK_ADV_SPE:
             element = self.current_token
             self.eat(TOKEN_ADV_SPE)
             return Adverb(Word(element, TOKEN_ADV_SPE))
-        elif self.contain([TOKEN_TIME, TOKEN_NIAGING, TOKEN_SUNOD, TOKEN_KARONG, TOKEN_HOUR]):
+        elif self.current_token.mask & ADVERB_TIME_FIRST:
             element = self.time()
-            if TOKEN_ADV_SPE in self.current_token.types:
+            if self.current_token.mask & MASK_ADV_SPE:
                 opt = self.current_token
                 self.eat(TOKEN_ADV_SPE)
                 return Adverb(element, Word(opt, TOKEN_ADV_SPE))
             else:
                 return Adverb(element)
-        elif TOKEN_ADV in self.current_token.types and self.current_token.value == "alas":
+        elif self.current_token.mask & MASK_ADV and self.current_token.value == "alas":
             element = self.current_token
             self.eat(TOKEN_ADV)
             time = self.time()
             return Adverb(Word(element, TOKEN_ADV), time)
-        elif TOKEN_ADV in self.current_token.types:
+        elif self.current_token.mask & MASK_ADV:
             element = self.current_token
             self.eat(TOKEN_ADV)
             return Adverb(Word(element, TOKEN_ADV))
-        elif TOKEN_ADV in self.current_token.types and self.current_token.value == "dili":
+        elif self.current_token.mask & MASK_ADV and self.current_token.value == "dili":
             element = self.current_token
             self.eat(TOKEN_ADV)
-            if TOKEN_ADV_SPE in self.current_token.types:
+            if self.current_token.mask & MASK_ADV_SPE:
                 opt = self.current_token
                 self.eat(TOKEN_ADV_SPE)
                 return Adverb(Word(element, TOKEN_ADV), Word(opt, TOKEN_ADV_SPE))
@@ -574,18 +768,18 @@ class Parser(object):
         | KARONG TOKEN_TIME_NOUN_A
         | HOUR sa TIME_OF_DAY
         """
-        if TOKEN_TIME in self.current_token.types:
+        if self.current_token.mask & MASK_TIME:
             time = self.current_token
             self.eat(TOKEN_TIME)
             return Time(Word(time, TOKEN_TIME))
-        elif TOKEN_NIAGING in self.current_token.types:
+        elif self.current_token.mask & MASK_NIAGING:
             time = self.current_token
             self.eat(TOKEN_NIAGING)
             num = self.adj_num()
             noun = self.current_token
             self.eat(TOKEN_TIME_NOUN)
             return Time(Word(time, TOKEN_NIAGING), num, Word(noun, TOKEN_TIME_NOUN))
-        elif TOKEN_SUNOD in self.current_token.types:
+        elif self.current_token.mask & MASK_SUNOD:
             times = []
             times.append(Word(self.current_token, TOKEN_SUNOD))
             self.eat(TOKEN_SUNOD)
@@ -595,13 +789,13 @@ class Parser(object):
             noun = self.current_token
             self.eat(TOKEN_TIME_NOUN)
             return Time(times, num, Word(noun, TOKEN_TIME_NOUN))
-        elif TOKEN_KARONG in self.current_token.types:
+        elif self.current_token.mask & MASK_KARONG:
             time = self.current_token
             self.eat(TOKEN_KARONG)
             noun = self.current_token
             self.eat(TOKEN_TIME_NOUN_A)
             return Time(Word(time, TOKEN_KARONG), day=Word(noun, TOKEN_TIME_NOUN_A))
-        elif TOKEN_HOUR in self.current_token.types:
+        elif self.current_token.mask & MASK_HOUR:
             time = self.current_token
             self.eat(TOKEN_HOUR)
             if self.current_token.value != "sa":
@@ -619,107 +813,220 @@ class Parser(object):
                 self.eat(TOKEN_PREP)
             day = self.current_token
             self.eat(TOKEN_TIME_OF_DAY)
-            if time.value in [
-                "uno",
-                "dos",
-                "tres",
-                "kwatro",
-                "singko",
-            ] and day.value not in ["ka-adlawon", "hapon"]:
-                corr = ["ka-adlawon", "hapon"]
-                self.errors.append(
-                    Error(
-                        "Wrong part of day for a particular hour",
-                        "Should be " + ", or ".join(corr),
-                        day.value,
-                    )
-                )
-            if time.value in [
-                "sais",
-                "siete",
-                "otso",
-                "nuwebe",
-                "diyes",
-                "onse",
-            ] and day.value not in ["gabi-i", "buntag"]:
-                corr = ["gabi-i", "buntag"]
-                self.errors.append(
-                    Error(
-                        "Wrong part of day for a particular hour",
-                        "Should be " + ", or ".join(corr),
-                        day.value,
-                    )
-                )
-            if time.value == "dose" and day.value != "udto":
-                self.errors.append(
-                    Error(
-                        "Wrong part of day for a particular hour",
-                        "Should be udto",
-                        day.value,
-                        ["udto"],
-                    )
-                )
             return Time([Word(time, TOKEN_HOUR), sa], day=Word(day, TOKEN_TIME_OF_DAY))
 
     def prep_phrase(self):
         """prep_phrase : PREP (PREP)? noun_phrase_part (ADV_SPE)? (prep_phrase)?
         | empty
         """
-        if TOKEN_PREP in self.current_token.types:
-            prep = self.current_token
-            self.eat(TOKEN_PREP)
-            return self.prep_phrase_add(prep)
+        if self.current_token.mask & MASK_PREP:
+            if self.subtrees is not None:
+                return self.subtree("prep_phrase", self.prep_phrase_first)
+            return self.prep_phrase_first()
         else:
             return None
 
+    def prep_phrase_first(self):
+        prep = self.current_token
+        self.eat(TOKEN_PREP)
+        return self.prep_phrase_add(prep)
+
     def prep_phrase_add(self, prep):
-        if TOKEN_PREP in self.current_token.types:
-            second = self.current_token
-            self.eat(TOKEN_PREP)
-        else:
-            second = None
-        noun_phrase = self.noun_phrase_part()
-        if noun_phrase is None:
-            self.errors.append(
-                Error(
-                    "No noun phrase after preposition; type of speech found: "
-                    + " ".join(self.current_token.types),
-                    "Must be a noun phrase after preposition",
-                    self.current_token.value,
+        # a run of prepositional phrases is parsed in a loop, since each
+        # phrase's noun phrase would otherwise take the next phrase by
+        # recursion. The noun phrases of the run leave a following
+        # preposition to the loop (see in_chain), which hangs the next
+        # phrase where the recursive rules put it: on the phrase before
+        # through `extra`, or on the NounPhrase or possessive Noun that
+        # stopped. Whatever those rules still had to parse after the nested
+        # phrases, such as a comma and another noun phrase, is kept on
+        # `pending` and picked up once the phrases beneath it end.
+        chained, self.in_chain = self.in_chain, True
+        # [prep, second, noun_phrase, adv, index of the `extra` phrase]
+        phrases = []
+        # (NounPhrase or Noun, index of the phrase hung there)
+        nested = []
+        pending = []
+        link = None
+        while True:
+            if self.current_token.mask & MASK_PREP:
+                second = self.current_token
+                self.eat(TOKEN_PREP)
+            else:
+                second = None
+            noun_phrase = self.noun_phrase_part()
+            if noun_phrase is None:
+                self.errors.append(
+                    Error(
+                        "No noun phrase after preposition; type of speech found: "
+                        + " ".join(self.current_token.types),
+                        "Must be a noun phrase after preposition",
+                        self.current_token.value,
+                    )
                 )
-            )
-        if TOKEN_ADV_SPE in self.current_token.types:
-            adv = self.current_token
-            self.eat(TOKEN_ADV_SPE)
-        else:
-            adv = None
-        if TOKEN_PREP in self.current_token.types:
-            extra = self.prep_phrase()
-            return PrepPhrase(
+            if type(link) is int:
+                phrases[link][4] = len(phrases)
+            elif link is not None:
+                nested.append((link, len(phrases)))
+            pending.append(("phrase", len(phrases)))
+            phrases.append([prep, second, noun_phrase, None, None])
+            link = self.chain_stop(noun_phrase, pending)
+            while link is None and pending:
+                link = self.chain_resume(pending, phrases)
+            if link is None:
+                break
+            prep = self.current_token
+            self.eat(TOKEN_PREP)
+        self.in_chain = chained
+        nodes = [None] * len(phrases)
+        for i in reversed(range(len(phrases))):
+            prep, second, noun_phrase, adv, extra = phrases[i]
+            # only the last phrase of a run leaves out an empty adverb
+            if extra is not None or adv is not None:
+                adv = Word(adv, TOKEN_ADV_SPE)
+            nodes[i] = PrepPhrase(
                 Word(prep, TOKEN_PREP),
                 Word(second, TOKEN_PREP),
                 noun_phrase,
-                Word(adv, TOKEN_ADV_SPE),
-                extra,
+                adv,
+                nodes[extra] if extra is not None else None,
             )
-        else:
-            return PrepPhrase(Word(prep, TOKEN_PREP), Word(second, TOKEN_PREP), noun_phrase, adv)
+        for node, i in nested:
+            if type(node) is Noun:
+                node.possess = nodes[i]
+            else:
+                node.prep_phrase = nodes[i]
+        return nodes[0]
+
+    def possess_prep_next(self):
+        """Whether possess_general would take the preposition at the
+        current token as the start of a run of prepositional phrases."""
+        return (
+            self.current_token.mask & MASK_POS_LINK
+            and self.current_token.value == "sa"
+            and self.peek_token().mask & POSSESS_PREP_FIRST
+        )
+
+    def chain_stop(self, node, pending):
+        """The NounPhrase or Noun on the right edge of `node`, a phrase just
+        parsed inside a run, that left the preposition at the current token
+        to the run, or None. The phrases between `node` and it that still
+        had something to parse are pushed on `pending`."""
+        if not self.current_token.mask & MASK_PREP:
+            return None
+        possess = self.possess_prep_next()
+        # walked right edge, and the index in it of the phrase that stopped
+        path = []
+        stop = None
+        while node is not None:
+            kind = type(node)
+            path.append(node)
+            if kind is NounPhrasePart:
+                node = node.right if node.conj is not None else node.left
+            elif kind is NounPhrase:
+                stop = len(path) - 1
+                # after a relative clause only the noun phrase itself is
+                # left to take it
+                if node.nga is not None or not possess:
+                    break
+                node = node.complex_noun
+            elif kind is NounPhraseSingularPlural:
+                node = node.noun_sp if node.extra is None else None
+            elif kind is DemPronoun:
+                node = node.mga
+            elif kind is Noun:
+                if node.possess is None:
+                    if possess:
+                        stop = len(path) - 1
+                    break
+                node = node.possess
+            elif kind is Possess:
+                node = node.noun
+            elif kind is CompoundNoun:
+                node = node.other_phrase if node.other_phrase is not None else node.noun_phrase
+            else:
+                break
+        if stop is None:
+            return None
+        for node in path[:stop]:
+            kind = type(node)
+            if kind is NounPhrasePart and node.conj is None:
+                pending.append(("noun_phrase_part", node))
+            elif kind is NounPhrase:
+                pending.append(("noun_phrase", node))
+            elif kind is CompoundNoun and node.other_phrase is None:
+                pending.append(("compound_nouns", node))
+        return path[stop]
+
+    def chain_resume(self, pending, phrases):
+        """Go on with the innermost phrase on `pending` once the run beneath
+        it has ended, as the rule that parsed it would have. Returns where
+        the next phrase of the run hangs: a phrase's index for its `extra`,
+        a NounPhrase or Noun, or None for no next phrase yet."""
+        kind, node = pending[-1]
+        if kind == "phrase":
+            pending.pop()
+            if self.current_token.mask & MASK_ADV_SPE:
+                phrases[node][3] = self.current_token
+                self.eat(TOKEN_ADV_SPE)
+            return node if self.current_token.mask & MASK_PREP else None
+        if kind == "noun_phrase_part":
+            # the loop of noun_phrase_part, after node.left
+            if self.current_token.mask & MASK_COMMA:
+                conjunct = Word(self.current_token, TOKEN_COMMA)
+                self.eat(TOKEN_COMMA)
+                left = self.noun_phrase()
+                node.conj, node.right = conjunct, NounPhrasePart(left)
+                pending[-1] = (kind, node.right)
+                return self.chain_stop(left, pending)
+            pending.pop()
+            if self.current_token.mask & MASK_CONJ:
+                conjunct = Word(self.current_token, TOKEN_CONJ)
+                self.eat(TOKEN_CONJ)
+                node.conj, node.right = conjunct, self.noun_phrase()
+                return self.chain_stop(node.right, pending)
+            return None
+        if kind == "noun_phrase":
+            # noun_prep_phrase_nga, after the noun
+            pending.pop()
+            if self.current_token.mask & MASK_NGA:
+                node.nga = Word(self.current_token, TOKEN_NGA)
+                self.eat(TOKEN_NGA)
+                self.in_chain = False
+                node.clause = self.sentence()
+                self.in_chain = True
+            return node if self.current_token.mask & MASK_PREP else None
+        # the loop of compound_nouns, after node.noun_phrase
+        if self.current_token.mask & MASK_COMMA:
+            extra = Word(self.current_token, TOKEN_COMMA)
+            self.eat(TOKEN_COMMA)
+            noun = self.noun_plural() if self.current_token.mask & MASK_MGA else self.noun_singular()
+            node.extra, node.other_phrase = extra, CompoundNoun("", noun)
+            pending[-1] = (kind, node.other_phrase)
+            return self.chain_stop(noun, pending)
+        pending.pop()
+        if self.current_token.value == "ug":
+            extra = Word(self.current_token, TOKEN_CONJ)
+            self.eat(TOKEN_CONJ)
+            noun = self.noun_plural() if self.current_token.mask & MASK_MGA else self.noun_singular()
+            node.extra, node.other_phrase = extra, noun
+            return self.chain_stop(noun, pending)
+        return None
 
     def date(self):
         """date : MONTH DAY (COMMA YEAR)?
         | IKA DASH DAY sa MONTH (COMMA YEAR)?
         """
-        if TOKEN_MONTH in self.current_token.types:
+        if self.current_token.mask & MASK_MONTH:
             month = self.current_token
             self.eat(TOKEN_MONTH)
             day = self.current_token
             self.eat(TOKEN_NUM)
-            if TOKEN_COMMA in self.current_token.types:
+            if self.current_token.mask & MASK_COMMA:
                 com = self.current_token
                 self.eat(TOKEN_COMMA)
                 year = self.current_token
                 self.eat(TOKEN_NUM)
-                self.date_condition(month.value, day.value, year.value)
                 return Date(
                     "English",
                     Word(month, TOKEN_MONTH),
@@ -728,12 +1035,13 @@ class Parser(object):
                     Word(year, TOKEN_YEAR),
                 )
             else:
-                self.date_condition(month.value, day.value)
                 return Date("English", Word(month, TOKEN_MONTH), Word(day, TOKEN_DAY))
 
     def date_spanish(self, one, two, day):
-        one.content.value = one.content.value[:-1]
-        if TOKEN_PREP in self.current_token.types and self.current_token.value == "sa":
+        # "ika-" without its dash; a new token, since reserved tokens are shared
+        ika = one.content
+        one = Word(Token(ika.types, ika.value[:-1], ika.mask), one.type)
+        if self.current_token.mask & MASK_PREP and self.current_token.value == "sa":
             sa = self.current_token
             self.eat(TOKEN_PREP)
         else:
@@ -748,12 +1056,11 @@ class Parser(object):
         ex = [one, two]
         month = self.current_token
         self.eat(TOKEN_MONTH)
-        if TOKEN_COMMA in self.current_token.types:
+        if self.current_token.mask & MASK_COMMA:
             com = self.current_token
             self.eat(TOKEN_COMMA)
             year = self.current_token
             self.eat(TOKEN_NUM)
-            self.date_condition(month.value, day.value, year.value)
             return Date(
                 "Spanish",
                 Word(month, TOKEN_MONTH),
@@ -764,7 +1071,6 @@ class Parser(object):
                 Word(sa, TOKEN_PREP),
             )
         else:
-            self.date_condition(month.value, day.value)
             return Date(
                 "Spanish",
                 Word(month, TOKEN_MONTH),
@@ -773,97 +1079,32 @@ class Parser(object):
                 sa=Word(sa, TOKEN_PREP),
             )
 
-    def leap_year(self, year):
-        if (year % 4) == 0:
-            if (year % 100) == 0:
-                if (year % 400) == 0:
-                    return True
-                else:
-                    return False
-            else:
-                return True
-        else:
-            return False
-
-    def date_condition(self, month, day, year=None):
-        if month in [
-            "enero",
-            "marso",
-            "mayo",
-            "hulyo",
-            "agosto",
-            "oktubre",
-            "disyembre",
-        ] and day not in range(1, 32):
-            self.errors.append(
-                Error(
-                    "Way beyond the number of dates for " + month,
-                    "Should be between 1 and 31",
-                    day,
-                )
-            )
-        elif month in [
-            "abril",
-            "hunyo",
-            "septiyembre",
-            "nubiyembre",
-        ] and day not in range(1, 31):
-            self.errors.append(
-                Error(
-                    "Way beyond the number of dates for " + month,
-                    "Should be between 1 and 30",
-                    day,
-                )
-            )
-        elif (
-            month == "pebrero"
-            and day not in range(1, 30)
-            and year is not None
-            and self.leap_year(year) == True
-        ):
-            self.errors.append(
-                Error(
-                    "Way beyond the number of dates for " + month,
-                    "Should be between 1 and 29 in a leap year",
-                    day,
-                )
-            )
-        elif (
-            month == "pebrero"
-            and day not in range(1, 29)
-            and year is not None
-            and self.leap_year(year) == False
-        ):
-            self.errors.append(
-                Error(
-                    "Way beyond the number of dates for " + month,
-                    "Should be between 1 and 28",
-                    day,
-                )
-            )
-
     def noun_phrase_part(self):
         """noun_phrase_part : noun_phrase
         | noun_phrase COMMA noun_phrase_part
         | noun_phrase CONJ noun_phrase
         """
+        parts = []
         left = self.noun_phrase()
-        if TOKEN_COMMA in self.current_token.types:
+        while self.current_token.mask & MASK_COMMA:
             conjunct = self.current_token
             self.eat(TOKEN_COMMA)
-            right = self.noun_phrase_part()
-            return NounPhrasePart(left, Word(conjunct, TOKEN_COMMA), right)
-        elif TOKEN_CONJ in self.current_token.types:
+            parts.append((left, Word(conjunct, TOKEN_COMMA)))
+            left = self.noun_phrase()
+        if self.current_token.mask & MASK_CONJ:
             conjunct = self.current_token
             self.eat(TOKEN_CONJ)
             right = self.noun_phrase()
-            return NounPhrasePart(left, Word(conjunct, TOKEN_CONJ), right)
+            node = NounPhrasePart(left, Word(conjunct, TOKEN_CONJ), right)
         else:
-            return NounPhrasePart(left)
+            node = NounPhrasePart(left)
+        for left, conj in reversed(parts):
+            node = NounPhrasePart(left, conj, node)
+        return node
 
     def noun_phrase_extras(self, ordinal=None):
         number = self.adj_num()
-        if TOKEN_MGA in self.current_token.types:
+        if self.current_token.mask & MASK_MGA:
             noun = self.noun_plural()
             return NounPhraseSingularPlural("Plural", noun, None, ordinal, number)
         else:
@@ -876,49 +1117,55 @@ class Parser(object):
         | number
         | empty
         """
-        if TOKEN_IKA in self.current_token.types:
-            ika = Word(self.current_token, TOKEN_IKA)
-            self.eat(TOKEN_IKA)
-            dash = Word(Token([TOKEN_DASH], "-"), TOKEN_DASH)
-            number = self.current_token
-            self.eat(TOKEN_NUM)
-            if TOKEN_NGA in self.current_token.types:
-                nga = self.current_token
-                self.eat(TOKEN_NGA)
-                adj = AdjOrd(ika, dash, Word(number, TOKEN_NUM), Word(nga, TOKEN_NGA))
-                if self.contain([TOKEN_KA, TOKEN_NUM, TOKEN_ADJ]):
-                    return self.noun_phrase_extras(adj)
-            else:
-                return self.date_spanish(ika, dash, number)
-        elif TOKEN_MONTH in self.current_token.types:
-            return self.date()
-        elif TOKEN_DET in self.current_token.types and self.current_token.value == "ang":
-            noun = self.noun_phrase_ang()
-            return self.noun_prep_phrase_nga(noun)
-        elif self.contain([TOKEN_KA, TOKEN_NUM, TOKEN_ADJ]):
-            return self.noun_phrase_extras()
-        elif self.contain([TOKEN_DET, TOKEN_PRON_POS, TOKEN_PRON_PER, TOKEN_NOUN, TOKEN_PRON_POS_NG]):
-            noun = self.noun_phrase_singular()
-            return self.noun_prep_phrase_nga(noun)
-        elif self.contain(
-            [TOKEN_DET_PLURAL, TOKEN_PRON_POS_PLURAL, TOKEN_PRON_POS_PLURAL_NG, TOKEN_PRON_PER_PLURAL, TOKEN_MGA]
-        ):
-            noun = self.noun_phrase_plural()
-            return self.noun_prep_phrase_nga(noun)
-        elif TOKEN_PRON_DEM in self.current_token.types:
-            noun = self.dem_pron()
-            return self.noun_prep_phrase_nga(noun)
+        if self.in_chain:
+            # stops short of a preposition, and prep_phrase_add fills it in
+            # afterwards, so it is neither the same parse nor safe to reuse
+            return self.branch("chain_noun_phrase", NOUN_PHRASE_BRANCHES)
+        if self.subtrees is not None:
+            return self.subtree("noun_phrase", self.branch, "noun_phrase", NOUN_PHRASE_BRANCHES)
+        return self.branch("noun_phrase", NOUN_PHRASE_BRANCHES)
+
+    def noun_phrase_ika(self):
+        ika = Word(self.current_token, TOKEN_IKA)
+        self.eat(TOKEN_IKA)
+        dash = Word(Token([TOKEN_DASH], "-"), TOKEN_DASH)
+        number = self.current_token
+        self.eat(TOKEN_NUM)
+        if self.current_token.mask & MASK_NGA:
+            nga = self.current_token
+            self.eat(TOKEN_NGA)
+            adj = AdjOrd(ika, dash, Word(number, TOKEN_NUM), Word(nga, TOKEN_NGA))
+            if self.current_token.mask & NOUN_EXTRAS_FIRST:
+                return self.noun_phrase_extras(adj)
         else:
-            return None
+            return self.date_spanish(ika, dash, number)
+
+    def noun_phrase_ang_nga(self):
+        return self.noun_prep_phrase_nga(self.noun_phrase_ang())
+
+    def noun_phrase_singular_nga(self):
+        return self.noun_prep_phrase_nga(self.noun_phrase_singular())
+
+    def noun_phrase_plural_nga(self):
+        return self.noun_prep_phrase_nga(self.noun_phrase_plural())
+
+    def dem_pron_nga(self):
+        return self.noun_prep_phrase_nga(self.dem_pron())
 
     def noun_prep_phrase_nga(self, noun):
-        if TOKEN_NGA in self.current_token.types:
+        if self.current_token.mask & MASK_NGA:
             nga = Word(self.current_token, TOKEN_NGA)
             self.eat(TOKEN_NGA)
+            # a relative clause is a sentence of its own, chain or not
+            chained, self.in_chain = self.in_chain, False
             other = self.sentence()
+            self.in_chain = chained
         else:
             nga = other = None
-        prep_phrase = self.prep_phrase() if TOKEN_PREP in self.current_token.types else None
+        if self.current_token.mask & MASK_PREP and not self.in_chain:
+            prep_phrase = self.prep_phrase()
+        else:
+            prep_phrase = None
         return NounPhrase(noun, prep_phrase, nga, other)
 
     def noun_phrase_singular(self):
@@ -926,10 +1173,10 @@ class Parser(object):
         | PRON_PER (CLIT_Y)?
         | PRON_POS_NG (noun_singular|noun_plural)
         """
-        if TOKEN_PRON_PER in self.current_token.types:
+        if self.current_token.mask & MASK_PRON_PER:
             personal = self.current_token
             self.eat(TOKEN_PRON_PER)
-            if TOKEN_CLIT_Y in self.current_token.types:
+            if self.current_token.mask & MASK_CLIT_Y:
                 clit = Word(self.current_token, TOKEN_CLIT_Y)
                 self.eat(TOKEN_CLIT_Y)
             else:
@@ -937,22 +1184,22 @@ class Parser(object):
             return NounPhraseSingularPlural(
                 "Singular", Word(personal, TOKEN_PRON_PER), extra=clit
             )
-        elif TOKEN_PRON_POS_NG in self.current_token.types:
+        elif self.current_token.mask & MASK_PRON_POS_NG:
             pos = self.current_token
             self.eat(TOKEN_PRON_POS_NG)
             noun = (
                 self.noun_plural()
-                if TOKEN_MGA in self.current_token.types
+                if self.current_token.mask & MASK_MGA
                 else self.noun_singular()
             )
             return NounPhraseSingularPlural("Singular", noun, Word(pos, TOKEN_PRON_POS_NG))
         else:
-            if TOKEN_DET in self.current_token.types:
+            if self.current_token.mask & MASK_DET:
                 det = self.current_token
                 self.eat(TOKEN_DET)
             else:
                 det = None
-            ordinal = self.adj_ord() if TOKEN_IKA in self.current_token.types else None
+            ordinal = self.adj_ord() if self.current_token.mask & MASK_IKA else None
             number = self.adj_num()
             noun = self.noun_singular()
             return NounPhraseSingularPlural(
@@ -964,10 +1211,10 @@ class Parser(object):
         | PRON_PER_PLURAL (CLIT_Y)?
         | PRON_POS_PLURAL_NG (noun_singular|noun_plural)
         """
-        if TOKEN_PRON_PER_PLURAL in self.current_token.types:
+        if self.current_token.mask & MASK_PRON_PER_PLURAL:
             personal = self.current_token
             self.eat(TOKEN_PRON_PER_PLURAL)
-            if TOKEN_CLIT_Y in self.current_token.types:
+            if self.current_token.mask & MASK_CLIT_Y:
                 clit = Word(self.current_token, TOKEN_CLIT_Y)
                 self.eat(TOKEN_CLIT_Y)
             else:
@@ -975,24 +1222,24 @@ class Parser(object):
             return NounPhraseSingularPlural(
                 "Plural", Word(personal, TOKEN_PRON_PER_PLURAL), extra=clit
             )
-        elif TOKEN_PRON_POS_PLURAL_NG in self.current_token.types:
+        elif self.current_token.mask & MASK_PRON_POS_PLURAL_NG:
             pos = self.current_token
             self.eat(TOKEN_PRON_POS_PLURAL_NG)
             noun = (
                 self.noun_plural()
-                if TOKEN_MGA in self.current_token.types
+                if self.current_token.mask & MASK_MGA
                 else self.noun_singular()
             )
             return NounPhraseSingularPlural(
                 "Plural", noun, Word(pos, TOKEN_PRON_POS_PLURAL_NG)
             )
         else:
-            if TOKEN_DET_PLURAL in self.current_token.types:
+            if self.current_token.mask & MASK_DET_PLURAL:
                 det = self.current_token
                 self.eat(TOKEN_DET_PLURAL)
             else:
                 det = None
-            ordinal = self.adj_ord() if TOKEN_IKA in self.current_token.types else None
+            ordinal = self.adj_ord() if self.current_token.mask & MASK_IKA else None
             number = self.adj_num()
             noun = self.noun_plural(det)
             return NounPhraseSingularPlural(
@@ -1003,12 +1250,12 @@ class Parser(object):
         """dem_pron : PRON_DEM (CLIT_NG (adj_ord)? (adj_num)? (noun_singular | noun_plural))?"""
         dem = self.current_token
         self.eat(TOKEN_PRON_DEM)
-        if TOKEN_CLIT_NG in self.current_token.types:
+        if self.current_token.mask & MASK_CLIT_NG:
             clit = self.current_token
             self.eat(TOKEN_CLIT_NG)
-            ordinal = self.adj_ord() if TOKEN_IKA in self.current_token.types else None
+            ordinal = self.adj_ord() if self.current_token.mask & MASK_IKA else None
             number = self.adj_num()
-            if TOKEN_MGA in self.current_token.types:
+            if self.current_token.mask & MASK_MGA:
                 noun = self.noun_plural()
                 return DemPronoun(
                     "Plural",
@@ -1038,19 +1285,19 @@ class Parser(object):
         ang = self.current_token
         self.eat(TOKEN_DET)
         poss = None
-        if TOKEN_PRON_POS_NG in self.current_token.types:
+        if self.current_token.mask & MASK_PRON_POS_NG:
             poss = self.current_token
             self.eat(TOKEN_PRON_POS_NG)
-        elif TOKEN_PRON_POS_PLURAL_NG in self.current_token.types:
+        elif self.current_token.mask & MASK_PRON_POS_PLURAL_NG:
             poss = self.current_token
             self.eat(TOKEN_PRON_POS_PLURAL_NG)
-        ordinal = self.adj_ord() if TOKEN_IKA in self.current_token.types else None
+        ordinal = self.adj_ord() if self.current_token.mask & MASK_IKA else None
         number = (
             self.adj_num()
-            if TOKEN_NUM in self.current_token.types or self.current_token.value == "ka"
+            if self.current_token.mask & MASK_NUM or self.current_token.value == "ka"
             else None
         )
-        if TOKEN_MGA in self.current_token.types:
+        if self.current_token.mask & MASK_MGA:
             noun = self.noun_plural()
             return NounPhraseSingularPlural(
                 "Plural",
@@ -1073,14 +1320,14 @@ class Parser(object):
 
     def noun_singular(self):
         """noun_singular : (adjective)? (NOUN)+ (possess_singular|possess_plural|possess_general)?"""
-        adj = self.adjective() if TOKEN_ADJ in self.current_token.types else None
+        adj = self.adjective() if self.current_token.mask & MASK_ADJ else None
         nouns = []
-        while TOKEN_NOUN in self.current_token.types:
+        while self.current_token.mask & MASK_NOUN:
             nouns.append(Word(self.current_token, TOKEN_NOUN))
             self.eat(TOKEN_NOUN)
-        if TOKEN_PRON_POS_N in self.current_token.types:
+        if self.current_token.mask & MASK_PRON_POS_N:
             poss = self.possess_singular()
-        elif TOKEN_PRON_POS_PLURAL_N in self.current_token.types:
+        elif self.current_token.mask & MASK_PRON_POS_PLURAL_N:
             poss = self.possess_plural()
         else:
             poss = self.possess_general()
@@ -1093,14 +1340,14 @@ class Parser(object):
             self.eat(TOKEN_MGA)
         else:
             mga = None
-        adj = self.adjective() if TOKEN_ADJ in self.current_token.types else None
+        adj = self.adjective() if self.current_token.mask & MASK_ADJ else None
         nouns = []
-        while TOKEN_NOUN in self.current_token.types:
+        while self.current_token.mask & MASK_NOUN:
             nouns.append(Word(self.current_token, TOKEN_NOUN))
             self.eat(TOKEN_NOUN)
-        if TOKEN_PRON_POS_N in self.current_token.types:
+        if self.current_token.mask & MASK_PRON_POS_N:
             poss = self.possess_singular()
-        elif TOKEN_PRON_POS_PLURAL_N in self.current_token.types:
+        elif self.current_token.mask & MASK_PRON_POS_PLURAL_N:
             poss = self.possess_plural()
         else:
             poss = self.possess_general()
@@ -1108,29 +1355,13 @@ class Parser(object):
 
     def possess_general(self):
         """possess_general : POS_LINK compound_nouns"""
-        if TOKEN_POS_LINK in self.current_token.types:
+        if self.in_chain and self.possess_prep_next():
+            # the next item of the chain being parsed
+            return None
+        if self.current_token.mask & MASK_POS_LINK:
             pos_link = self.current_token
             self.eat(TOKEN_POS_LINK)
-            if pos_link.value == "sa" and self.contain(
-                [
-                    TOKEN_DET,
-                    TOKEN_PRON_DEM,
-                    TOKEN_PRON_POS,
-                    TOKEN_PRON_POS_NG,
-                    TOKEN_PRON_POS_PLURAL_NG,
-                    TOKEN_PRON_PER,
-                    TOKEN_DET_PLURAL,
-                    TOKEN_PRON_POS_PLURAL,
-                    TOKEN_PRON_PER_PLURAL,
-                    TOKEN_IKA,
-                    TOKEN_NUM,
-                    TOKEN_ADJ,
-                    TOKEN_KA,
-                    TOKEN_NOUN,
-                    TOKEN_MONTH,
-                    TOKEN_PREP,
-                ]
-            ):
+            if pos_link.value == "sa" and self.current_token.mask & POSSESS_PREP_FIRST:
                 return self.prep_phrase_add(pos_link)
             else:
                 nouns = self.compound_nouns(pos_link)
@@ -1155,7 +1386,7 @@ class Parser(object):
         | (noun_singular|noun_plural) COMMA compound_noun()
         | (noun_singular|noun_plural) UG (noun_singular|noun_plural)
         """
-        if kind.value == "ni" and TOKEN_MGA in self.current_token.types:
+        if kind.value == "ni" and self.current_token.mask & MASK_MGA:
             self.errors.append(
                 Error(
                     "Misappropriate use of possessive linker",
@@ -1163,27 +1394,35 @@ class Parser(object):
                     kind.value,
                 )
             )
+        parts = []
         noun = (
             self.noun_plural()
-            if TOKEN_MGA in self.current_token.types
+            if self.current_token.mask & MASK_MGA
             else self.noun_singular()
         )
-        if TOKEN_COMMA in self.current_token.types:
+        while self.current_token.mask & MASK_COMMA:
             extra = self.current_token
             self.eat(TOKEN_COMMA)
-            other = self.compound_nouns("")
-            return CompoundNoun("", noun, other, Word(extra, TOKEN_COMMA))
-        elif self.current_token.value == "ug":
+            parts.append((noun, Word(extra, TOKEN_COMMA)))
+            noun = (
+                self.noun_plural()
+                if self.current_token.mask & MASK_MGA
+                else self.noun_singular()
+            )
+        if self.current_token.value == "ug":
             extra = self.current_token
             self.eat(TOKEN_CONJ)
             other = (
                 self.noun_plural()
-                if TOKEN_MGA in self.current_token.types
+                if self.current_token.mask & MASK_MGA
                 else self.noun_singular()
             )
-            return CompoundNoun("", noun, other, Word(extra, TOKEN_CONJ))
+            node = CompoundNoun("", noun, other, Word(extra, TOKEN_CONJ))
         else:
-            return CompoundNoun("", noun)
+            node = CompoundNoun("", noun)
+        for noun, extra in reversed(parts):
+            node = CompoundNoun("", noun, node, extra)
+        return node
 
     def adj_ord(self):
         """adj_ord : IKA DASH NUM NGA"""
@@ -1200,10 +1439,10 @@ class Parser(object):
         """adj_num : NUM KA
         | KA NUM AN (UG NUM)? KA
         """
-        if TOKEN_NUM in self.current_token.types:
+        if self.current_token.mask & MASK_NUM:
             number = self.current_token
             self.eat(TOKEN_NUM)
-            if TOKEN_PRON_PER in self.current_token.types:
+            if self.current_token.mask & MASK_PRON_PER:
                 ka = self.current_token
                 self.eat(TOKEN_PRON_PER)
                 return AdjNum(Word(number, TOKEN_NUM), Word(ka, TOKEN_KA))
@@ -1217,9 +1456,9 @@ class Parser(object):
             self.eat(TOKEN_NUM)
             give.append(Word(self.current_token, TOKEN_AN))
             self.eat(TOKEN_AN)
-            if TOKEN_CONJ in self.current_token and self.current_token.value == TOKEN_UG:
+            if self.current_token.mask & MASK_CONJ and self.current_token.value == "ug":
                 conj = self.current_token
-                self.eat(TOKEN_UG)
+                self.eat(TOKEN_CONJ)
                 give.append(Word(self.current_token, TOKEN_NUM))
                 self.eat(TOKEN_NUM)
             else:
@@ -1237,21 +1476,24 @@ class Parser(object):
         current = self.current_token
         adjectives.append(Word(current, TOKEN_ADJ))
         self.eat(TOKEN_ADJ)
-        extra = stemmer.stem_word(current.value, as_object=True).prefix
-        while TOKEN_NGA in self.current_token.types or extra == "ng":
-            if TOKEN_NGA in self.current_token.types:
+        extra = self.stem(current).prefix
+        while self.current_token.mask & MASK_NGA or extra == "ng":
+            if self.current_token.mask & MASK_NGA:
                 nga.append(Word(self.current_token, TOKEN_NGA))
                 self.eat(TOKEN_NGA)
             else:
                 nga.append(Word(Token(["NG_PREFIX"], extra), "NG_PREFIX"))
-            if TOKEN_ADJ in self.current_token.types:
+            if self.current_token.mask & MASK_ADJ:
                 current = self.current_token
-                extra = stemmer.stem_word(current.value, as_object=True).prefix
+                extra = self.stem(current).prefix
                 adjectives.append(Word(current, TOKEN_ADJ))
                 self.eat(TOKEN_ADJ)
+            else:
+                # nothing left to link; an "ng" prefix must not loop forever
+                extra = None
         return Adjective(adjectives, nga)
 
-    def parse(self, text: str):
+    def parse(self, text: str, check: bool = True):
         """
         sentence_part : sentence
                       | sentence (CONJ|COMMA) sentence_part
@@ -1320,12 +1562,159 @@ class Parser(object):
                     | VERB_SUFF_PAST
                     | VERB_SUFF_FUT
         adjective : ADJ (NGA ADJ)* (CLIT_NG|NGA)?
+
+        Agreement, tense, hour and date errors come from a Checker pass over
+        the finished tree; `check=False` skips it and leaves only the errors
+        the parser hit while matching.
         """
+        if self.pretokenize or self.backtrack:
+            return self.parse_tokens(TokenArray.from_text(text, self.lexer_class), check)
         self.errors = []
-        self.lexer = Lexer(text)
+        self.lexer = self.lexer_class(text)
+        self.tokens = self.token_list = None
+        self.subtrees = None
+        self.lookahead = []
         self.current_token = self.lexer.get_next_token()
-        node = self.sentence_part()
+        node = self.guarded_parse()
         # if self.current_token.type != TOKEN_EOF:
         #    self.error()
+        if check and node is not None:
+            self.errors.extend(self.check(node))
+
+        return self.errors, node
+
+    def parse_tokens(self, tokens: TokenArray, check: bool = True):
+        """Parse a sentence that was already lexed into a TokenArray."""
+        self.errors = []
+        self.lexer = None
+        self.tokens = tokens
+        self.token_list = tokens.tokens
+        self.subtrees = tokens.subtrees
+        self.pos = self.reach = 0
+        self.current_token = self.token_list[0]
+        node = self.guarded_parse()
+        if check and node is not None:
+            self.errors.extend(self.check(node))
+
+        return self.errors, node
+
+    def parse_editable(self, text: str, check: bool = True):
+        """Parse a sentence that is going to be edited through reparse.
+        Returns (errors, tree, tokens); keep `tokens` for the next edit."""
+        tokens = TokenArray.from_text(text, RegexLexer)
+        tokens.subtrees = {}
+        tokens.checked = set()
+        errors, node = self.parse_tokens(tokens, check)
+        return errors, node, tokens
+
+    def reparse(self, tokens: TokenArray, offset: int, deleted: int, inserted: str, check: bool = True):
+        """Apply an edit (`deleted` characters at `offset` replaced by
+        `inserted`) to a sentence from parse_editable and parse it again.
+
+        Only the tokens around the edit are relexed, and every sentence,
+        noun phrase and prepositional phrase whose tokens are untouched is
+        taken over from the previous tree instead of being parsed again.
+        The phrases enclosing the edit are still parsed again, and the
+        offsets of every token after it shifted, so an edit costs a fraction
+        of a full parse but still grows with the sentence. Use the same
+        parser configuration for every edit of a sentence.
+        `tokens` is updated in place; returns (errors, tree).
+        """
+        if tokens.subtrees is None:
+            tokens.subtrees = {}
+            tokens.checked = set()
+        tokens.edit(offset, deleted, inserted)
+        return self.parse_tokens(tokens, check)
+
+    def check(self, tree: AST):
+        """Agreement, tense, hour and date errors in a parsed tree."""
+        # imported here: the checker is built on the AST classes above
+        from .checker import Checker
+
+        return Checker().check(tree, self.tokens.checked if self.subtrees is not None else None)
+
+    def guarded_parse(self):
+        """Run the grammar from the current token within the step budget and
+        deadline. A sentence that runs out of either is reported as an error
+        with no tree instead of stalling the caller."""
+        self.steps = self.stall = self.mismatches = 0
+        self.failed = False
+        self.memo = {} if self.backtrack else None
+        self.in_chain = False
+        self.deadline = time.monotonic() + self.timeout if self.timeout is not None else None
+        try:
+            return self.sentence_part()
+        except (ParseAborted, RecursionError) as e:
+            self.failed = True
+            self.errors.append(Error("Parse aborted: " + str(e), "Sentence could not be parsed", None))
+            return None
+
+    def parse_safely(self, text: str, check: bool = True):
+        """Like parse, but a sentence that crashes the parser comes back as a
+        single error and no tree instead of raising."""
+        try:
+            return self.parse(text, check)
+        except Exception as e:
+            return [Error("Parser failure: " + repr(e), "Check the sentence", text)], None
+
+    def options(self):
+        """The constructor arguments of this parser, to build another one
+        configured the same way."""
+        return {
+            "lexer_class": self.lexer_class,
+            "pretokenize": self.pretokenize,
+            "max_steps": self.max_steps,
+            "timeout": self.timeout,
+            "max_stall": self.max_stall,
+            "backtrack": self.backtrack,
+        }
+
+    def parse_many(
+        self,
+        texts,
+        jobs: int = 1,
+        chunksize: int = 16,
+        ordered: bool = True,
+        lexicon: str | None = None,
+        check: bool = True,
+    ):
+        """Parse an iterable of sentences, yielding (errors, tree) for each.
 
-        return self.errors, node
\ No newline at end of file
+        With jobs > 1 the sentences are spread over a pool of worker
+        processes, each holding a parser of this class configured like this
+        one and, if given, the compiled `lexicon`. Results stream back as they are
+        ready; `ordered=False` yields them in completion order instead of
+        input order. Serially, `lexicon` is used for these sentences only.
+        """
+        if jobs <= 1:
+            if lexicon is None:
+                for text in texts:
+                    yield self.parse_safely(text, check)
+                return
+            # the lexicon serves these sentences only: the process gets its
+            # own back when the results run out or are dropped
+            previous = swap_lexicon(Lexicon(lexicon))
+            try:
+                for text in texts:
+                    yield self.parse_safely(text, check)
+            finally:
+                swap_lexicon(previous).close()
+            return
+        with multiprocessing.Pool(jobs, initializer=init_worker, initargs=(type(self), self.options(), lexicon)) as pool:
+            results = pool.imap if ordered else pool.imap_unordered
+            yield from results(functools.partial(parse_in_worker, check=check), texts, chunksize)
+
+
+# parser owned by a parse_many worker process, built once per process
+WORKER_PARSER: Parser | None = None
+
+
+def init_worker(parser_class: type[Parser], options: dict, lexicon: str | None):
+    global WORKER_PARSER
+    if lexicon is not None:
+        use_lexicon(lexicon)
+    WORKER_PARSER = parser_class(**options)
+
+
+def parse_in_worker(text: str, check: bool = True):
+    return WORKER_PARSER.parse_safely(text, check)
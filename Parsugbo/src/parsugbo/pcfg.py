@@ -0,0 +1,173 @@
+import argparse
+import re
+from .cky import UNKNOWN, Tree
+from .cnf import compile_rules, save_grammar
+
+###############################################################################
+#                                                                             #
+#  TREEBANK                                                                   #
+#                                                                             #
+###############################################################################
+#
+# Bracketed trees as in Dataset/01_testdata.txt and Evaluation/golden.txt:
+#
+#   (S (VP (V Naglakaw)) (NP (Det ang) (N bata)) (PP (P sa) (N dalan)))
+#
+# A bracket holding only words is a leaf, and its words may be several, as
+# in (N si Juan). Anything outside the brackets, such as the section lines
+# of 01_testdata.txt, is skipped.
+
+TOKEN_PATTERN = re.compile(r"\(|\)|[^\s()]+")
+
+
+def read_trees(text: str):
+    """The trees of a bracketed text, in order, as parsugbo.cky Trees."""
+    trees = []
+    # [label, children] of each open bracket
+    stack = []
+    for token in TOKEN_PATTERN.findall(text):
+        if token == "(":
+            stack.append([None, []])
+        elif token == ")":
+            if not stack:
+                continue
+            label, children = stack.pop()
+            if label is None:
+                continue
+            if all(type(child) == str for child in children):
+                tree = Tree(label, [" ".join(children)]) if children else None
+            else:
+                # a word next to brackets is a leaf of its own, under the
+                # label of the bracket it is in
+                tree = Tree(label, [Tree(label, [child]) if type(child) == str else child for child in children])
+            if tree is None:
+                continue
+            if stack:
+                stack[-1][1].append(tree)
+            else:
+                trees.append(tree)
+        elif stack:
+            if stack[-1][0] is None:
+                stack[-1][0] = token
+            else:
+                stack[-1][1].append(token)
+    return trees
+
+
+def read_treebank(path: str):
+    with open(path, encoding="utf-8") as f:
+        return read_trees(f.read())
+
+
+def words(tree: Tree):
+    """The words of `tree`, in order."""
+    if type(tree.children[0]) == str:
+        return tree.children[0].split()
+    return [word for child in tree.children for word in words(child)]
+
+
+def labelled_spans(tree: Tree):
+    """(label, start, end) of every bracket of `tree`, over its words, as
+    Evaluation/evaluation.ipynb scores them."""
+    spans = set()
+    # (tree, start) still to visit
+    stack = [(tree, 0)]
+    while stack:
+        node, start = stack.pop()
+        if type(node.children[0]) == str:
+            spans.add((node.label, start, start + len(node.children[0].split())))
+            continue
+        end = start
+        for child in node.children:
+            stack.append((child, end))
+            end += len(words(child))
+        spans.add((node.label, start, end))
+    return spans
+
+
+def bracket_scores(gold: list[Tree], test: list[Tree | None]):
+    """Precision, recall and F1 of the labelled spans of `test` against
+    `gold`, summed over the sentences; None in `test` is a sentence
+    without a parse."""
+    correct = found = expected = 0
+    for gold_tree, test_tree in zip(gold, test):
+        gold_spans = labelled_spans(gold_tree)
+        test_spans = labelled_spans(test_tree) if test_tree is not None else set()
+        correct += len(gold_spans & test_spans)
+        found += len(test_spans)
+        expected += len(gold_spans)
+    precision = correct / found if found else 0.0
+    recall = correct / expected if expected else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return precision, recall, f1
+
+
+###############################################################################
+#                                                                             #
+#  TRAINER                                                                    #
+#                                                                             #
+###############################################################################
+
+
+def count_rules(trees: list[Tree], lower: bool = True):
+    """How often each rule is used in `trees`, as {lhs: {production:
+    count}}: a tuple of child labels, or the words of a leaf, lowercased
+    with `lower`."""
+    counts = {}
+    stack = list(trees)
+    while stack:
+        tree = stack.pop()
+        if type(tree.children[0]) == str:
+            production = tree.children[0].lower() if lower else tree.children[0]
+        else:
+            production = tuple(child.label for child in tree.children)
+            stack.extend(tree.children)
+        productions = counts.setdefault(tree.label, {})
+        productions[production] = productions.get(production, 0) + 1
+    return counts
+
+
+def train(trees: list[Tree], lower: bool = True, unknown: int = 1):
+    """A PCFG from `trees`: each rule's probability is its count over the
+    count of its left-hand side. The result is written like the notebook
+    grammars, with a dict of probabilities for each left-hand side, ready
+    for parsugbo.cky.CKYParser.
+
+    Words seen at most `unknown` times in all of `trees` stand for the
+    words the treebank doesn't have: each label they are seen under also
+    gets the terminal UNKNOWN, counted once more for each of them, which
+    CKYParser reads any other word as. 0 leaves UNKNOWN out."""
+    counts = count_rules(trees, lower)
+    seen = {}
+    for productions in counts.values():
+        for production, count in productions.items():
+            if type(production) == str:
+                seen[production] = seen.get(production, 0) + count
+    rules = {}
+    for lhs, productions in counts.items():
+        rare = sum(
+            count for production, count in productions.items() if type(production) == str and seen[production] <= unknown
+        )
+        total = sum(productions.values()) + rare
+        rules[lhs] = {production: count / total for production, count in productions.items()}
+        if rare:
+            rules[lhs][UNKNOWN] = rules[lhs].get(UNKNOWN, 0) + rare / total
+    return rules
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train a PCFG on bracketed treebanks and compile it for CKY")
+    parser.add_argument("treebanks", nargs="+", help="files of bracketed trees")
+    parser.add_argument("--output", "-o", required=True, help="compiled grammar to write")
+    parser.add_argument("--start", default="S", help="start symbol")
+    parser.add_argument("--keep-case", action="store_true", help="don't lowercase the words")
+    parser.add_argument("--unknown", type=int, default=1, help="words seen at most this often train the unknown word")
+    args = parser.parse_args()
+    trees = []
+    for path in args.treebanks:
+        trees.extend(read_treebank(path))
+    rules = train(trees, lower=not args.keep_case, unknown=args.unknown)
+    grammar = compile_rules(rules, args.start)
+    save_grammar(grammar, args.output)
+    print("Wrote {} rules over {} symbols from {} trees to {}".format(
+        sum(len(productions) for productions in rules.values()), len(rules), len(trees), args.output))
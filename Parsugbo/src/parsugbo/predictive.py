@@ -0,0 +1,579 @@
+import time
+from .grammar import Grammar, Rule, Terminal
+from .lexer import Token
+from .parser import *
+
+###############################################################################
+#                                                                             #
+#  PREDICTIVE PARSER                                                          #
+#                                                                             #
+###############################################################################
+
+# The grammar of Parser.parse, left-factored so every choice is made on the
+# current token. The @sets are the first-token masks the hand-written rules
+# test; the order of the alternatives is the order of their if-chains.
+GRAMMAR = """
+%set VERB_OBJECT = DET PRON_POS PRON_POS_NG PRON_POS_PLURAL_NG PRON_PER DET_PLURAL PRON_POS_PLURAL PRON_PER_PLURAL PRON_DEM IKA NUM NOUN MONTH "ka"
+%set PREDICATE_NOUN = DET PRON_DEM PRON_POS PRON_POS_NG PRON_POS_PLURAL_NG PRON_PER DET_PLURAL PRON_POS_PLURAL PRON_PER_PLURAL IKA NUM ADJ KA NOUN MONTH
+%set PREDICATE_DESCRIPTIVE = PLACE ADJ ADV ADV_SPE
+%set DESCRIPTIVE_ADVERB = PLACE ADV ADV_SPE
+%set PLACE_TIME = TIME NIAGING SUNOD KARONG
+%set ADVERB_TIME = TIME NIAGING SUNOD KARONG HOUR
+%set NOUN_EXTRAS = KA NUM ADJ
+%set NOUN_SINGULAR = DET PRON_POS PRON_PER NOUN PRON_POS_NG
+%set NOUN_PLURAL = DET_PLURAL PRON_POS_PLURAL PRON_POS_PLURAL_NG PRON_PER_PLURAL MGA
+%set POSSESS_PREP = DET PRON_DEM PRON_POS PRON_POS_NG PRON_POS_PLURAL_NG PRON_PER DET_PLURAL PRON_POS_PLURAL PRON_PER_PLURAL IKA NUM ADJ KA NOUN MONTH PREP
+%set NUMBER = NUM "ka"
+
+sentence_part : sentence sentence_part_tail                     {sentence_part}
+sentence_part_tail : CONJ sentence_part                         {conj}
+                   | COMMA sentence_part                        {conj}
+                   |                                            {none}
+sentence : pred_phrase noun_phrase_part                         {sentence}
+pred_phrase : verb_phrase adverb                                {pred_phrase_verb}
+            | predicate adverb verb_phrase_opt adverb           {pred_phrase}
+verb_phrase_opt : verb_phrase                                   {first}
+                |                                               {none}
+verb_phrase : verb_complex verb_object                          {verb_phrase}
+verb_object : @VERB_OBJECT noun_phrase_part                     {first}
+            | prep_phrase                                       {first}
+            |                                                   {none}
+verb_complex : VERB clit_y_opt                                  {verb_complex}
+clit_y_opt : CLIT_Y                                             {first}
+           |                                                    {none}
+predicate : @PREDICATE_NOUN noun_phrase_part                    {predicate}
+          | @PREDICATE_DESCRIPTIVE descriptive                  {predicate}
+          | prep_phrase                                         {predicate}
+          | INT                                                 {predicate_int}
+          |                                                     {predicate_empty}
+descriptive : ADJ                                               {descriptive_adj}
+            | @DESCRIPTIVE_ADVERB adverb                         {descriptive}
+adverb : PLACE place_time_opt                                   {adverb_place}
+       | ADV_SPE                                                {adverb_spe}
+       | @ADVERB_TIME time adv_spe_opt                          {adverb_time}
+       | ADV:alas time                                          {adverb_alas}
+       | ADV                                                    {adverb_adv}
+       |                                                        {none}
+place_time_opt : @PLACE_TIME time                               {first}
+               |                                                {none}
+adv_spe_opt : ADV_SPE                                           {first}
+            |                                                   {none}
+time : TIME                                                     {time}
+     | NIAGING adj_num TIME_NOUN                                {time_niaging}
+     | SUNOD NGA adj_num TIME_NOUN                              {time_sunod}
+     | KARONG TIME_NOUN_A                                       {time_karong}
+     | HOUR sa_opt TIME_OF_DAY                                  {time_hour}
+     |                                                          {none}
+sa_opt : PREP:sa                                                {first}
+       |                                                        {none}
+prep_phrase : PREP prep_phrase_rest                             {prep_phrase}
+prep_phrase_rest : prep_opt noun_phrase_part adv_spe_opt prep_phrase_opt  {group}
+prep_opt : PREP                                                 {first}
+         |                                                      {none}
+prep_phrase_opt : prep_phrase                                   {first}
+                |                                               {none}
+date : MONTH NUM comma_year_opt                                 {date}
+comma_year_opt : COMMA NUM                                      {group}
+               |                                                {none}
+noun_phrase_part : noun_phrase noun_phrase_tail                 {noun_phrase_part}
+noun_phrase_tail : COMMA noun_phrase_part                       {comma}
+                 | CONJ noun_phrase                             {conj}
+                 |                                              {none}
+noun_phrase : IKA NUM ika_rest                                  {noun_phrase_ika}
+            | date                                              {first}
+            | noun_phrase_ang nga_clause_opt prep_phrase_opt    {noun_phrase}
+            | @NOUN_EXTRAS noun_phrase_extras                   {first}
+            | @NOUN_SINGULAR noun_phrase_singular nga_clause_opt prep_phrase_opt  {noun_phrase}
+            | @NOUN_PLURAL noun_phrase_plural nga_clause_opt prep_phrase_opt      {noun_phrase}
+            | dem_pron nga_clause_opt prep_phrase_opt           {noun_phrase}
+            |                                                   {none}
+ika_rest : NGA ika_extras_opt                                   {ordinal_rest}
+         | sa_opt MONTH comma_year_opt                          {date_spanish_rest}
+ika_extras_opt : @NOUN_EXTRAS noun_phrase_extras                {first}
+               |                                                {none}
+nga_clause_opt : NGA sentence                                   {nga_clause}
+               |                                                {none}
+noun_phrase_extras : adj_num noun                               {noun_phrase_extras}
+noun : noun_plural                                              {first}
+     | noun_singular                                            {first}
+noun_phrase_singular : PRON_PER clit_y_opt                      {np_personal_singular}
+                     | PRON_POS_NG noun                         {np_possessive_singular}
+                     | det_opt adj_ord_opt adj_num noun_singular  {np_singular}
+det_opt : DET                                                   {first}
+        |                                                       {none}
+adj_ord_opt : adj_ord                                           {first}
+            |                                                   {none}
+noun_phrase_plural : PRON_PER_PLURAL clit_y_opt                 {np_personal_plural}
+                   | PRON_POS_PLURAL_NG noun                    {np_possessive_plural}
+                   | DET_PLURAL adj_ord_opt adj_num noun_body   {np_det_plural}
+                   | adj_ord_opt adj_num noun_plural            {np_plural}
+noun_phrase_ang : DET:ang pos_ng_opt adj_ord_opt number_opt noun  {np_ang}
+pos_ng_opt : PRON_POS_NG                                        {first}
+           | PRON_POS_PLURAL_NG                                 {first}
+           |                                                    {none}
+number_opt : @NUMBER adj_num                                    {first}
+           |                                                    {none}
+dem_pron : PRON_DEM dem_pron_rest                               {dem_pron}
+dem_pron_rest : CLIT_NG adj_ord_opt adj_num noun                {group}
+              |                                                 {none}
+noun_singular : noun_body                                       {noun_singular}
+noun_plural : MGA noun_body                                     {noun_plural}
+noun_body : adjective_opt nouns possess                         {group}
+adjective_opt : adjective                                       {first}
+              |                                                 {none}
+nouns : NOUN nouns                                              {nouns}
+      |                                                         {empty}
+possess : PRON_POS_N                                            {possess_singular}
+        | PRON_POS_PLURAL_N                                     {possess_plural}
+        | POS_LINK:sa possess_sa                                {possess_sa}
+        | POS_LINK compound_nouns                               {possess_general}
+        |                                                       {none}
+possess_sa : @POSSESS_PREP prep_phrase_rest                     {first}
+           | compound_nouns                                     {first}
+compound_nouns : noun compound_nouns_tail                       {compound_nouns}
+compound_nouns_tail : COMMA compound_nouns                      {comma}
+                    | "ug" noun                                 {conj}
+                    |                                           {none}
+adj_ord : IKA NUM NGA                                           {adj_ord}
+adj_num : NUM ka_opt                                            {adj_num}
+        | "ka" NUM AN ug_num_opt KA                             {adj_num_ka}
+        |                                                       {none}
+ka_opt : PRON_PER                                               {first}
+       |                                                        {none}
+ug_num_opt : CONJ:ug NUM                                        {group}
+           |                                                    {none}
+adjective : ADJ adjective_links                                 {adjective}
+adjective_links : NGA adjective_opt_single adjective_links      {adjective_links}
+                |                                               {empty}
+adjective_opt_single : ADJ                                      {first}
+                     |                                          {none}
+"""
+
+
+def dash():
+    return Word(Token([TOKEN_DASH], "-"), TOKEN_DASH)
+
+
+def word(token, kind):
+    return Word(token, kind) if token is not None else None
+
+
+# Actions build the value of an alternative from the values of its symbols:
+# the matched token for a terminal, the action result for a rule.
+
+
+def action_first(parser, c):
+    return c[0]
+
+
+def action_none(parser, c):
+    return None
+
+
+def action_empty(parser, c):
+    return []
+
+
+def action_group(parser, c):
+    return c
+
+
+def action_conj(parser, c):
+    return [Word(c[0], TOKEN_CONJ), c[1]]
+
+
+def action_comma(parser, c):
+    return [Word(c[0], TOKEN_COMMA), c[1]]
+
+
+def action_sentence_part(parser, c):
+    if c[1] is None:
+        return SentencePart(c[0])
+    return SentencePart(c[0], c[1][0], c[1][1])
+
+
+def action_sentence(parser, c):
+    return Sentence(c[0], c[1])
+
+
+def action_pred_phrase_verb(parser, c):
+    return PredPhrase(c[0], c[1])
+
+
+def action_pred_phrase(parser, c):
+    predicate, mid_adv, verb_phrase, end_adv = c
+    return PredPhrase(verb_phrase, end_adv, predicate, mid_adv)
+
+
+def action_verb_phrase(parser, c):
+    return VerbPhrase(c[0], c[1])
+
+
+def action_verb_complex(parser, c):
+    return parser.complex_verb(c[0], c[1])
+
+
+def action_predicate(parser, c):
+    return Predicate(c[0])
+
+
+def action_predicate_int(parser, c):
+    return Predicate(Word(c[0], TOKEN_INT))
+
+
+def action_predicate_empty(parser, c):
+    return Predicate(None)
+
+
+def action_descriptive_adj(parser, c):
+    return Descriptive(Word(c[0], TOKEN_ADJ))
+
+
+def action_descriptive(parser, c):
+    return Descriptive(c[0])
+
+
+def action_adverb_place(parser, c):
+    return Adverb(Word(c[0], TOKEN_PLACE), c[1])
+
+
+def action_adverb_spe(parser, c):
+    return Adverb(Word(c[0], TOKEN_ADV_SPE))
+
+
+def action_adverb_time(parser, c):
+    return Adverb(c[0], word(c[1], TOKEN_ADV_SPE))
+
+
+def action_adverb_alas(parser, c):
+    return Adverb(Word(c[0], TOKEN_ADV), c[1])
+
+
+def action_adverb_adv(parser, c):
+    return Adverb(Word(c[0], TOKEN_ADV))
+
+
+def action_time(parser, c):
+    return Time(Word(c[0], TOKEN_TIME))
+
+
+def action_time_niaging(parser, c):
+    return Time(Word(c[0], TOKEN_NIAGING), c[1], Word(c[2], TOKEN_TIME_NOUN))
+
+
+def action_time_sunod(parser, c):
+    return Time([Word(c[0], TOKEN_SUNOD), Word(c[1], TOKEN_NGA)], c[2], Word(c[3], TOKEN_TIME_NOUN))
+
+
+def action_time_karong(parser, c):
+    return Time(Word(c[0], TOKEN_KARONG), day=Word(c[1], TOKEN_TIME_NOUN_A))
+
+
+def action_time_hour(parser, c):
+    hour, sa, day = c
+    if sa is None:
+        parser.errors.append(
+            Error("Preposition is not sa", "Preposition should be sa", day.value, ["sa"])
+        )
+    return Time([Word(hour, TOKEN_HOUR), word(sa, TOKEN_PREP)], day=Word(day, TOKEN_TIME_OF_DAY))
+
+
+def prep_phrase(prep, rest):
+    second, noun_phrase, adv, extra = rest
+    return PrepPhrase(
+        Word(prep, TOKEN_PREP),
+        Word(second, TOKEN_PREP),
+        noun_phrase,
+        word(adv, TOKEN_ADV_SPE),
+        extra,
+    )
+
+
+def action_prep_phrase(parser, c):
+    return prep_phrase(c[0], c[1])
+
+
+def action_date(parser, c):
+    month, day, rest = c
+    if rest is None:
+        return Date("English", Word(month, TOKEN_MONTH), Word(day, TOKEN_DAY))
+    com, year = rest
+    return Date(
+        "English",
+        Word(month, TOKEN_MONTH),
+        Word(day, TOKEN_DAY),
+        Word(com, TOKEN_COMMA),
+        Word(year, TOKEN_YEAR),
+    )
+
+
+def action_noun_phrase_part(parser, c):
+    if c[1] is None:
+        return NounPhrasePart(c[0])
+    return NounPhrasePart(c[0], c[1][0], c[1][1])
+
+
+def action_ordinal_rest(parser, c):
+    return ("ordinal", c[0], c[1])
+
+
+def action_date_spanish_rest(parser, c):
+    return ("date", c[0], c[1], c[2])
+
+
+def action_noun_phrase_ika(parser, c):
+    ika, number, rest = c
+    if rest[0] == "ordinal":
+        _, nga, extras = rest
+        if extras is not None:
+            extras.ordinal = AdjOrd(Word(ika, TOKEN_IKA), dash(), Word(number, TOKEN_NUM), Word(nga, TOKEN_NGA))
+        return extras
+    _, sa, month, year = rest
+    # "ika-" without its dash; a new token, since reserved tokens are shared
+    ex = [Word(Token(ika.types, ika.value[:-1], ika.mask), TOKEN_IKA), dash()]
+    if sa is None:
+        parser.errors.append(Error("Misuse of preposition", "Use preposition sa", month.value))
+    if year is None:
+        return Date(
+            "Spanish",
+            Word(month, TOKEN_MONTH),
+            Word(number, TOKEN_DAY),
+            extra=ex,
+            sa=Word(sa, TOKEN_PREP),
+        )
+    com, year = year
+    return Date(
+        "Spanish",
+        Word(month, TOKEN_MONTH),
+        Word(number, TOKEN_DAY),
+        Word(com, TOKEN_COMMA),
+        Word(year, TOKEN_YEAR),
+        ex,
+        Word(sa, TOKEN_PREP),
+    )
+
+
+def action_noun_phrase(parser, c):
+    noun, clause, prep = c
+    if clause is None:
+        return NounPhrase(noun, prep)
+    return NounPhrase(noun, prep, clause[0], clause[1])
+
+
+def action_nga_clause(parser, c):
+    return [Word(c[0], TOKEN_NGA), c[1]]
+
+
+def action_noun_phrase_extras(parser, c):
+    return NounPhraseSingularPlural(c[1].type, c[1], None, None, c[0])
+
+
+def action_np_personal_singular(parser, c):
+    return NounPhraseSingularPlural("Singular", Word(c[0], TOKEN_PRON_PER), extra=word(c[1], TOKEN_CLIT_Y))
+
+
+def action_np_possessive_singular(parser, c):
+    return NounPhraseSingularPlural("Singular", c[1], Word(c[0], TOKEN_PRON_POS_NG))
+
+
+def action_np_singular(parser, c):
+    det, ordinal, number, noun = c
+    return NounPhraseSingularPlural("Singular", noun, Word(det, TOKEN_DET), ordinal, number)
+
+
+def action_np_personal_plural(parser, c):
+    return NounPhraseSingularPlural(
+        "Plural", Word(c[0], TOKEN_PRON_PER_PLURAL), extra=word(c[1], TOKEN_CLIT_Y)
+    )
+
+
+def action_np_possessive_plural(parser, c):
+    return NounPhraseSingularPlural("Plural", c[1], Word(c[0], TOKEN_PRON_POS_PLURAL_NG))
+
+
+def action_np_det_plural(parser, c):
+    det, ordinal, number, (adj, nouns, poss) = c
+    noun = Noun("Plural", adj, nouns, poss, Word(None, TOKEN_MGA))
+    return NounPhraseSingularPlural("Plural", noun, Word(det, TOKEN_DET_PLURAL), ordinal, number)
+
+
+def action_np_plural(parser, c):
+    ordinal, number, noun = c
+    return NounPhraseSingularPlural("Plural", noun, Word(None, TOKEN_DET_PLURAL), ordinal, number)
+
+
+def action_np_ang(parser, c):
+    ang, poss, ordinal, number, noun = c
+    pos_type = TOKEN_PRON_POS_PLURAL_NG if noun.type == "Plural" else TOKEN_PRON_POS_NG
+    return NounPhraseSingularPlural(
+        noun.type, noun, Word(ang, TOKEN_DET), ordinal, number, pos=Word(poss, pos_type)
+    )
+
+
+def action_dem_pron(parser, c):
+    dem, rest = c
+    if rest is None:
+        return DemPronoun("", Word(dem, TOKEN_PRON_DEM))
+    clit, ordinal, number, noun = rest
+    return DemPronoun(
+        noun.type, Word(dem, TOKEN_PRON_DEM), Word(clit, TOKEN_CLIT_NG), ordinal, number, noun
+    )
+
+
+def action_noun_singular(parser, c):
+    adj, nouns, poss = c[0]
+    return Noun("Singular", adj, nouns, poss)
+
+
+def action_noun_plural(parser, c):
+    adj, nouns, poss = c[1]
+    return Noun("Plural", adj, nouns, poss, Word(c[0], TOKEN_MGA))
+
+
+def action_nouns(parser, c):
+    c[1].insert(0, Word(c[0], TOKEN_NOUN))
+    return c[1]
+
+
+def action_possess_singular(parser, c):
+    return Possess("Singular", Word(c[0], TOKEN_PRON_POS_N))
+
+
+def action_possess_plural(parser, c):
+    return Possess("Plural", Word(c[0], TOKEN_PRON_POS_PLURAL_N))
+
+
+def action_possess_sa(parser, c):
+    link, rest = c
+    if type(rest) is CompoundNoun:
+        return Possess("General", Word(link, TOKEN_POS_LINK), rest)
+    return prep_phrase(link, rest)
+
+
+def action_possess_general(parser, c):
+    link, nouns = c
+    if link.value == "ni" and nouns.noun_phrase.type == "Plural":
+        parser.errors.append(Error("Misappropriate use of possessive linker", "Should use sa", link.value))
+    return Possess("General", Word(link, TOKEN_POS_LINK), nouns)
+
+
+def action_compound_nouns(parser, c):
+    if c[1] is None:
+        return CompoundNoun("", c[0])
+    return CompoundNoun("", c[0], c[1][1], c[1][0])
+
+
+def action_adj_ord(parser, c):
+    return AdjOrd(Word(c[0], TOKEN_IKA), dash(), Word(c[1], TOKEN_NUM), Word(c[2], TOKEN_NGA))
+
+
+def action_adj_num(parser, c):
+    if c[1] is None:
+        return Word(c[0], TOKEN_NUM)
+    return AdjNum(Word(c[0], TOKEN_NUM), Word(c[1], TOKEN_KA))
+
+
+def action_adj_num_ka(parser, c):
+    ka, number, an, rest, last = c
+    give = [Word(ka, TOKEN_KA), Word(number, TOKEN_NUM), Word(an, TOKEN_AN)]
+    conj = None
+    if rest is not None:
+        conj = rest[0]
+        give.append(Word(rest[1], TOKEN_NUM))
+    return AdjNum(give, Word(last, TOKEN_KA), Word(conj, TOKEN_CONJ))
+
+
+def action_adjective(parser, c):
+    adjectives = [Word(c[0], TOKEN_ADJ)]
+    nga = []
+    last = c[0]
+    for link, adj in c[1]:
+        nga.append(Word(link, TOKEN_NGA))
+        last = adj
+        if adj is not None:
+            adjectives.append(Word(adj, TOKEN_ADJ))
+    # an adjective carrying the "ng" linker as a prefix links on its own
+    if last is not None:
+        prefix = parser.stem(last).prefix
+        if prefix == "ng":
+            nga.append(Word(Token(["NG_PREFIX"], prefix), "NG_PREFIX"))
+    return Adjective(adjectives, nga)
+
+
+def action_adjective_links(parser, c):
+    c[2].insert(0, (c[0], c[1]))
+    return c[2]
+
+
+GRAMMAR_TABLES = Grammar(GRAMMAR)
+GRAMMAR_TABLES.bind({name[len("action_") :]: value for name, value in globals().items() if name.startswith("action_")})
+
+
+class PredictiveParser(Parser):
+    """Parser driven by GRAMMAR_TABLES instead of the rule methods.
+
+    The rules are expanded on an explicit stack, one table lookup per
+    choice, and the actions build the same AST classes as Parser. The
+    lexer, token arrays, budgets, checks and parse_many behave as in
+    Parser; backtracking and reparse are not implemented on the tables and
+    raise ValueError.
+    """
+
+    grammar = GRAMMAR_TABLES
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.backtrack:
+            raise ValueError("PredictiveParser does not backtrack")
+
+    def parse_editable(self, text: str, check: bool = True):
+        raise ValueError("PredictiveParser does not reparse")
+
+    def reparse(self, tokens, offset: int, deleted: int, inserted: str, check: bool = True):
+        raise ValueError("PredictiveParser does not reparse")
+
+    def sentence_part(self):
+        return self.expand(self.grammar.start)
+
+    def match(self, terminal: Terminal):
+        self.steps += 1
+        if self.max_steps is not None and self.steps > self.max_steps:
+            raise ParseAborted("step budget of {} exceeded".format(self.max_steps))
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise ParseAborted("deadline of {}s exceeded".format(self.timeout))
+        token = self.current_token
+        if terminal.matches(token):
+            self.stall = 0
+            self.next_token()
+        else:
+            self.errors.append(
+                Error("Wrong syntax: " + ", ".join(token.types), terminal.kind or terminal.name, token.value)
+            )
+            self.mismatches += 1
+            self.stall += 1
+            if self.stall >= self.max_stall:
+                self.synchronize()
+        # like Parser.eat, a failed match leaves the token in the tree
+        return token
+
+    def expand(self, rule: Rule):
+        """Parse `rule` from the current token and return its value."""
+        select = self.grammar.select
+        stack = [rule]
+        values = []
+        while stack:
+            item = stack.pop()
+            if type(item) is Rule:
+                alt = select(item, self.current_token)
+                stack.append(alt)
+                stack.extend(alt.stack)
+            elif type(item) is Terminal:
+                values.append(self.match(item))
+            else:
+                if item.size:
+                    children = values[-item.size :]
+                    del values[-item.size :]
+                else:
+                    children = []
+                values.append(item.action(self, children))
+        return values[0]
@@ -65,4 +65,34 @@ TOKEN_INT = "INT" #
 TOKEN_HOUR = "HOUR" #
 TOKEN_ANG = "ANG"
 TOKEN_EOF = "EOF"
-TOKEN_PLACE = "PLACE" #
\ No newline at end of file
+TOKEN_PLACE = "PLACE" #
+
+# Bitmask registry
+#
+# Every TOKEN_* name above gets one bit in TokenType. Token.mask carries the
+# union of a token's type bits so the parser tests membership with a single
+# AND against the MASK_* constants (plain ints, generated below) instead of
+# scanning the token's list of type names.
+from enum import IntFlag
+
+TOKEN_TYPES = [value for name, value in list(globals().items()) if name.startswith("TOKEN_")]
+TokenType = IntFlag("TokenType", [(kind, 1 << bit) for bit, kind in enumerate(TOKEN_TYPES)])
+TYPE_BITS = {kind: int(TokenType[kind]) for kind in TOKEN_TYPES}
+for _kind in TOKEN_TYPES:
+    globals()["MASK_" + _kind] = TYPE_BITS[_kind]
+del _kind
+
+
+def type_bit(kind: str) -> int:
+    # names outside tokens.py (dictionary tags, NG_PREFIX, ...) get a bit on first sight
+    bit = TYPE_BITS.get(kind)
+    if bit is None:
+        bit = TYPE_BITS[kind] = 1 << len(TYPE_BITS)
+    return bit
+
+
+def type_mask(types) -> int:
+    mask = 0
+    for kind in types:
+        mask |= type_bit(kind)
+    return mask
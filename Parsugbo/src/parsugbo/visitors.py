@@ -1,4 +1,5 @@
-from typing import Callable
+import io
+from typing import Callable, TextIO
 from .parser import AST, SentencePart, NounPhrasePart, Sentence, PredPhrase, Predicate, Descriptive, Adverb, Time, NounPhrase, VerbPhrase, PrepPhrase, Adjective, AdjOrd, Date, AdjNum, Noun, Possess, CompoundNoun, NounPhraseSingularPlural, DemPronoun, VerbComplex, Word
 ###############################################################################
 #                                                                             #
@@ -7,108 +8,318 @@ from .parser import AST, SentencePart, NounPhrasePart, Sentence, PredPhrase, Pre
 ###############################################################################
 
 class Node(object):
+    __slots__ = ("value", "children")
+
     def __init__(self, value: str, children: list[AST]=[]):
         self.value = value
         self.children = children
 
     def __str__(self, level=0):
-        ret = "    " * level + ("|-->" if level > 0 else "") + repr(self.value) + "\n"
-        for child in self.children:
-            if type(child) == list:
-                for v in child:
-                    ret += v.__str__(level + 1)
-            else:
-                ret += child.__str__(level + 1)
-        return ret
+        out = io.StringIO()
+        self.write(out, level)
+        return out.getvalue()
+
+    def write(self, out: TextIO, level=0):
+        """Write the tree to `out` a line at a time, as str() renders it.
+        Walks with a stack, so neither the depth of the tree nor the size
+        of its rendering is held anywhere."""
+        # prefix of each level, grown as deeper levels turn up
+        prefixes = ["    " * level + ("|-->" if level > 0 else "")]
+        stack = [(self, 0)]
+        while stack:
+            node, depth = stack.pop()
+            out.write(prefixes[depth] + repr(node.value) + "\n")
+            if not node.children:
+                continue
+            depth += 1
+            if depth == len(prefixes):
+                prefixes.append("    " * (level + depth) + "|-->")
+            for child in reversed(node.children):
+                if type(child) == list:
+                    stack.extend((v, depth) for v in reversed(child))
+                else:
+                    stack.append((child, depth))
 
     def __repr__(self):
         return "<tree node representation>"
 
+
+def compact_node(value: str, children: list = []):
+    """Node without the None children a compact SemanticAnalyzer puts where
+    'Empty' would go."""
+    kept = []
+    for child in children:
+        if type(child) == list:
+            child = [v for v in child if v is not None]
+            if child:
+                kept.append(child)
+        elif child is not None:
+            kept.append(child)
+    return Node(value, kept)
+
 class NodeVisitor(object):
+    # node class -> visit function, one table per visitor class, filled in
+    # the first time each node class turns up
+    dispatch: dict[type, Callable] = {}
+    # set by visitors that give None for a missing child, which then skip
+    # it without dispatching to visit_NoneType
+    skip_none = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.dispatch = {}
+
     def visit(self, node: AST):
-        method_name = "visit_" + type(node).__name__
-        visitor: Callable[[AST], Node] = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
+        # most fields of a tree are empty; skip the table for them
+        if node is None:
+            return None if self.skip_none else self.visit_NoneType(node)
+        visitor = self.dispatch.get(type(node))
+        if visitor is None:
+            visitor = self.dispatch[type(node)] = self.visit_method(type(node))
+        return visitor(self, node)
+
+    @classmethod
+    def visit_method(cls, kind: type) -> Callable:
+        return getattr(cls, "visit_" + kind.__name__, cls.generic_visit)
+
+    def visit_NoneType(self, node):
+        return self.generic_visit(node)
 
     def generic_visit(self, node: AST):
         raise Exception("No visit_{} method".format(type(node).__name__))
 
+# no result yet, told apart from a visitor's None
+MISSING = object()
+
+class MultiVisitor(NodeVisitor):
+    """Runs several visitors over a tree in one walk and returns the list
+    of their results for the root.
+
+    The walk is the first visitor's own. Each node it visits is then handed
+    to the other visitors' visit_* method for the node's class, and what
+    they visit from there is taken from what they already produced, so they
+    don't walk the tree again. Their generic_visit, which a visitor uses to
+    get down to the nodes it handles, is not run, and gives None: the walk
+    brings them those nodes anyway. Nodes the first visitor doesn't visit
+    itself (such as the links of chains it follows in a loop) go to the
+    others the usual way when they ask for them.
+
+    The others see each node after its children. Visitors that build their
+    result from their children's, like SemanticAnalyzer, give the same
+    result as when run alone but pay for their own work in full; what the
+    walk saves is the descent of visitors that handle only a few kinds of
+    node, such as statistics. The visitors are kept, so a MultiVisitor can
+    be reused for every tree of a corpus.
+    """
+
+    def __init__(self, *visitors: NodeVisitor):
+        self.visitors = visitors
+        # per other visitor, its result for each node of the current tree
+        self.memos = [{} for _ in visitors[1:]]
+        # dispatch table of the first visitor for the walk: its own visit
+        # functions, followed by the others' where they handle the class
+        first = type(visitors[0])
+        self.dispatch_first = {}
+        for kind in ast_classes():
+            handlers = []
+            for other, memo in zip(visitors[1:], self.memos):
+                method = type(other).visit_method(kind)
+                if method is not type(other).generic_visit:
+                    handlers.append((other, method, memo))
+            method = first.visit_method(kind)
+            self.dispatch_first[kind] = followed(method, handlers) if handlers else method
+
+    def visit(self, node: AST):
+        first, others = self.visitors[0], self.visitors[1:]
+        # both shadow the class attributes on the instances for the walk,
+        # so the visitors' visit_* methods need no changes
+        first.dispatch = self.dispatch_first
+        for other, memo in zip(others, self.memos):
+            other.visit = taken(other, memo)
+        try:
+            results = [first.visit(node)]
+            for other in others:
+                results.append(other.visit(node))
+        finally:
+            del first.dispatch
+            for other, memo in zip(others, self.memos):
+                del other.visit
+                memo.clear()
+        return results
+
+
+def ast_classes():
+    found, stack = [], [AST]
+    while stack:
+        kind = stack.pop()
+        found.append(kind)
+        stack.extend(kind.__subclasses__())
+    return found
+
+
+def followed(method: Callable, handlers: list) -> Callable:
+    """`method`, then the (visitor, method, memo) handlers on the same node."""
+    def visit(self, node):
+        result = method(self, node)
+        for other, handler, memo in handlers:
+            memo[id(node)] = handler(other, node)
+        return result
+    return visit
+
+
+def taken(visitor: NodeVisitor, memo: dict) -> Callable:
+    """`visit` for the other visitors of a MultiVisitor walk."""
+    cls = type(visitor)
+
+    def visit(node):
+        if node is None:
+            return None if visitor.skip_none else visitor.visit_NoneType(node)
+        result = memo.get(id(node), MISSING)
+        if result is MISSING:
+            # not on the walk, or not handled
+            method = cls.visit_method(type(node))
+            if method is cls.generic_visit:
+                return None
+            result = memo[id(node)] = method(visitor, node)
+        return result
+    return visit
+
 class SemanticAnalyzer(NodeVisitor):
+    def __init__(self, compact: bool = False):
+        # compact trees leave out the 'Empty' placeholders of missing parts
+        self.compact = compact
+        self.skip_none = compact
+        self.node = compact_node if compact else Node
+        # results of the prepositional phrases visit_PrepPhrase visits ahead
+        # of the phrase they are nested in, by id
+        self.ahead = {}
+        # prepositional phrases being visited, one inside the other
+        self.depth = 0
+
+    # coordinated chains are walked along their right spine in a loop, in
+    # the same order the recursive visits would take, so long enumerations
+    # don't hit the recursion limit
+
     def visit_SentencePart(self, node: SentencePart):
+        spine = []
+        while node.conj is not None and type(node.right) is SentencePart:
+            spine.append((self.visit(node.left), self.visit(node.conj)))
+            node = node.right
         sentence = self.visit(node.left)
         if node.conj is not None:
             conj = self.visit(node.conj)
             sentence_part = self.visit(node.right)
-            return Node("Sentence Part", [sentence, conj, sentence_part])
+            result = self.node("Sentence Part", [sentence, conj, sentence_part])
         else:
-            return Node("Sentence Part", [sentence])
+            result = self.node("Sentence Part", [sentence])
+        for sentence, conj in reversed(spine):
+            result = self.node("Sentence Part", [sentence, conj, result])
+        return result
 
     def visit_NounPhrasePart(self, node: NounPhrasePart):
+        spine = []
+        while node.conj is not None and type(node.right) is NounPhrasePart:
+            spine.append((self.visit(node.left), self.visit(node.conj)))
+            node = node.right
         noun = self.visit(node.left)
         if node.conj is not None:
             conj = self.visit(node.conj)
             noun_part = self.visit(node.right)
-            return Node("Noun Phrase Part", [noun, conj, noun_part])
+            result = self.node("Noun Phrase Part", [noun, conj, noun_part])
         else:
-            return Node("Noun Phrase Part", [noun])
+            result = self.node("Noun Phrase Part", [noun])
+        for noun, conj in reversed(spine):
+            result = self.node("Noun Phrase Part", [noun, conj, result])
+        return result
 
     def visit_Sentence(self, node: Sentence):
         predph = self.visit(node.pred_phrase)
         nounph = self.visit(node.noun_phrase)
-        return Node("Sentence", [predph, nounph])
+        return self.node("Sentence", [predph, nounph])
 
     def visit_PredPhrase(self, node: PredPhrase):
         pred = self.visit(node.pred)
         verb_ph = self.visit(node.verb_phr)
         endadv = self.visit(node.adv)
         midadv = self.visit(node.mid_adv)
-        return Node("Predicate Phrase", [pred, midadv, verb_ph, endadv])
+        return self.node("Predicate Phrase", [pred, midadv, verb_ph, endadv])
 
     def visit_Predicate(self, node: Predicate):
-        return Node("Predicate", [self.visit(node.content)])
+        return self.node("Predicate", [self.visit(node.content)])
 
     def visit_Descriptive(self, node: Descriptive):
-        return Node("Descriptive", [self.visit(node.content)])
+        return self.node("Descriptive", [self.visit(node.content)])
 
     def visit_Adverb(self, node: Adverb):
         if self is not None:
             element = self.visit(node.content)
             add = self.visit(node.addition)
-            return Node("Adverb", [element, add])
+            return self.node("Adverb", [element, add])
         else:
-            return Node("Adverb", ["empty"])
+            return self.node("Adverb", ["empty"])
 
     def visit_Time(self, node: Time):
         num = self.visit(node.number)
         day = self.visit(node.day)
         if type(node.noun) == list:
-            return Node("Time", [[self.visit(v) for v in node.noun], num, day])
+            return self.node("Time", [[self.visit(v) for v in node.noun], num, day])
         else:
-            return Node("Time", [self.visit(node.noun), num, day])
+            return self.node("Time", [self.visit(node.noun), num, day])
 
     def visit_NounPhrase(self, node: NounPhrase):
         noun = self.visit(node.complex_noun)
-        prep = self.visit(node.prep_phrase)
+        prep = self.nested(node.prep_phrase)
         nga = self.visit(node.nga)
         clause = self.visit(node.clause)
-        return Node("Noun Phrase", [noun, prep, nga, clause])
+        return self.node("Noun Phrase", [noun, prep, nga, clause])
 
     def visit_VerbPhrase(self, node: VerbPhrase):
         verb = self.visit(node.complex_verb)
         opt = self.visit(node.opt)
-        return Node("Verb Phrase", [verb, opt])
+        return self.node("Verb Phrase", [verb, opt])
 
     def visit_PrepPhrase(self, node: PrepPhrase):
-        prep = self.visit(node.prep)
-        second = self.visit(node.second_prep)
-        noun = self.visit(node.noun_phrase)
-        adv = self.visit(node.adv)
-        extra = self.visit(node.extra)
-        return Node("Prepositional Phrase", [prep, second, noun, adv, extra])
+        # a run of phrases also nests each next phrase in the noun phrase of
+        # the one before ("kang bata kang bata ..."). Every so many levels
+        # down a run, the phrases nested further are visited first, from the
+        # deepest up, so the visit of each stops at the result of the next
+        # instead of going down the rest of the run
+        self.depth += 1
+        nested = None
+        try:
+            if self.depth % AHEAD_DEPTH == 0:
+                nested = nested_phrases(node, self.ahead)
+                for phrase in reversed(nested):
+                    self.ahead[id(phrase)] = self.visit(phrase)
+            spine = []
+            while type(node) is PrepPhrase:
+                prep = self.visit(node.prep)
+                second = self.visit(node.second_prep)
+                noun = self.visit(node.noun_phrase)
+                adv = self.visit(node.adv)
+                spine.append((prep, second, noun, adv))
+                node = node.extra
+            result = self.visit(node)
+            for prep, second, noun, adv in reversed(spine):
+                result = self.node("Prepositional Phrase", [prep, second, noun, adv, result])
+            return result
+        finally:
+            self.depth -= 1
+            if nested:
+                for phrase in nested:
+                    self.ahead.pop(id(phrase), None)
+
+    def nested(self, node: AST):
+        # a phrase visited ahead by visit_PrepPhrase, or any other child
+        if self.ahead:
+            result = self.ahead.pop(id(node), MISSING)
+            if result is not MISSING:
+                return result
+        return self.visit(node)
 
     def visit_Adjective(self, node: Adjective):
         ng = self.visit(node.clit_ng)
-        return Node(
+        return self.node(
             "Adjective",
             [
                 [self.visit(adj) for adj in node.adjectives],
@@ -122,7 +333,7 @@ class SemanticAnalyzer(NodeVisitor):
         dash = self.visit(node.dash)
         num = self.visit(node.number)
         nga = self.visit(node.nga)
-        return Node("Ordinal Adjective", [mark, dash, num, nga])
+        return self.node("Ordinal Adjective", [mark, dash, num, nga])
 
     def visit_Date(self, node: Date):
         month = self.visit(node.month)
@@ -132,42 +343,52 @@ class SemanticAnalyzer(NodeVisitor):
         if node.type == "Spanish":
             sa = self.visit(node.sa)
             if type(node.extra) == list:
-                return Node(
+                return self.node(
                     node.type + " Date",
                     [[self.visit(v) for v in node.extra], day, sa, month, com, year],
                 )
             else:
-                return Node(
+                return self.node(
                     node.type + " Date",
                     [self.visit(node.extra), day, sa, month, com, year],
                 )
         elif node.type == "English":
-            return Node(node.type + " Date", [month, day, com, year])
+            return self.node(node.type + " Date", [month, day, com, year])
 
     def visit_AdjNum(self, node: AdjNum):
-        num = self.visit(node.number)
+        if type(node.number) == list:
+            num = [self.visit(v) for v in node.number]
+        else:
+            num = self.visit(node.number)
         ka = self.visit(node.ka)
         conj = self.visit(node.conj)
-        return Node("Numerical Adjective", [num, conj, ka])
+        return self.node("Numerical Adjective", [num, conj, ka])
 
     def visit_Noun(self, node: Noun):
         adj = self.visit(node.adjective)
         mga = self.visit(node.mga)
-        poss = self.visit(node.possess)
-        return Node(
+        poss = self.nested(node.possess)
+        return self.node(
             node.type + " Noun", [mga, adj, [self.visit(n) for n in node.nouns], poss]
         )
 
     def visit_Possess(self, node: Possess):
         noun = self.visit(node.noun)
         link = self.visit(node.link)
-        return Node(node.type + " Possessive Phrase", [link, noun])
+        return self.node(node.type + " Possessive Phrase", [link, noun])
 
     def visit_CompoundNoun(self, node: CompoundNoun):
-        other = self.visit(node.other_phrase)
-        noun = self.visit(node.noun_phrase)
-        extra = self.visit(node.extra)
-        return Node(node.type + "Compound Noun", [noun, extra, other])
+        # the rest of the chain is visited before this item's noun
+        spine = []
+        while type(node) is CompoundNoun:
+            spine.append(node)
+            node = node.other_phrase
+        other = self.visit(node)
+        for node in reversed(spine):
+            noun = self.visit(node.noun_phrase)
+            extra = self.visit(node.extra)
+            other = self.node(node.type + "Compound Noun", [noun, extra, other])
+        return other
 
     def visit_NounPhraseSingularPlural(self, node: NounPhraseSingularPlural):
         noun = self.visit(node.noun_sp)
@@ -177,7 +398,7 @@ class SemanticAnalyzer(NodeVisitor):
         num = self.visit(node.number)
         mga = self.visit(node.mga)
         pos = self.visit(node.pos)
-        return Node(
+        return self.node(
             node.type + " Noun Phrase", [begin, pos, ordinal, num, mga, noun, extra]
         )
 
@@ -187,23 +408,61 @@ class SemanticAnalyzer(NodeVisitor):
         ordinal = self.visit(node.ordinal)
         num = self.visit(node.number)
         mga = self.visit(node.mga)
-        return Node(node.type + " Demonstrative Phrase", [dem, clit, ordinal, num, mga])
+        return self.node(node.type + " Demonstrative Phrase", [dem, clit, ordinal, num, mga])
 
     def visit_VerbComplex(self, node: VerbComplex):
         prefix = self.visit(node.prefix)
         root = self.visit(node.root)
         suffix = self.visit(node.suffix)
         extra = self.visit(node.extra)
-        return Node("Complex Verb", [prefix, root, suffix, extra])
+        return self.node("Complex Verb", [prefix, root, suffix, extra])
 
     def visit_Word(self, node: Word):
         if node.content is None:
-            return Node("Empty")
+            return None if self.compact else Node("Empty")
         else:
             if type(node.content) == str:
-                return Node(node.type + "->" + node.content)
+                return self.node(node.type + "->" + node.content)
             else:
-                return Node(node.type + "->" + str(node.content.value))
+                return self.node(node.type + "->" + str(node.content.value))
 
     def visit_NoneType(self, node):
-        return Node("Empty")
\ No newline at end of file
+        return None if self.compact else Node("Empty")
+
+
+# how many nested prepositional phrases a visit goes down before it visits
+# the rest of the run ahead
+AHEAD_DEPTH = 32
+
+# the fields through which a prepositional phrase reaches the phrases nested
+# in it, down to the next phrase of a run (NounPhrase.prep_phrase or
+# Noun.possess)
+NESTING = {
+    PrepPhrase: ("noun_phrase", "extra"),
+    NounPhrasePart: ("left", "right"),
+    NounPhrase: ("complex_noun", "prep_phrase"),
+    NounPhraseSingularPlural: ("noun_sp",),
+    DemPronoun: ("mga",),
+    Noun: ("possess",),
+    Possess: ("noun",),
+    CompoundNoun: ("noun_phrase", "other_phrase"),
+}
+
+
+def nested_phrases(node: PrepPhrase, ahead: dict) -> list:
+    """The prepositional phrases nested in `node`'s noun phrases, outermost
+    first, short of those already in `ahead`. The phrases of `extra`
+    chains are left to the phrase they follow."""
+    found, stack = [], [node]
+    while stack:
+        node = stack.pop()
+        for field in reversed(NESTING.get(type(node), ())):
+            child = getattr(node, field)
+            if type(child) is PrepPhrase:
+                if id(child) in ahead:
+                    continue
+                if field != "extra":
+                    found.append(child)
+            if child is not None:
+                stack.append(child)
+    return found
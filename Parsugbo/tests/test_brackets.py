@@ -0,0 +1,73 @@
+import glob
+import os
+import re
+
+from parsugbo.brackets import CODES, GOLDEN_LABELS, BracketWriter
+from parsugbo.lexer import Token
+from parsugbo.parser import *
+
+ROOT = os.path.join(os.path.dirname(__file__), "..", "..")
+
+GOLDEN_SET = {"S", "NP", "VP", "PP", "AdvP", "N", "V", "Det", "P", "Adj", "Adv", "C", "Neg", "CP"}
+
+
+def word(text, kind):
+    return Word(Token([kind], text), kind)
+
+
+def noun_phrase(*words, **kwargs):
+    return NounPhrasePart(NounPhrase(NounPhraseSingularPlural("Singular", Noun("Singular", None, list(words), None), **kwargs), None))
+
+
+def verb(prefix, root):
+    return VerbComplex(Word(prefix, "PAST_PREFIX"), word(root, TOKEN_VERB), Word(None, None))
+
+
+def sentence(verb, *rest):
+    return SentencePart(Sentence(PredPhrase(VerbPhrase(verb, None), None), *rest))
+
+
+def test_codes():
+    tree = sentence(verb("nag", "kaon"), noun_phrase(word("bata", TOKEN_NOUN), begin=word("ang", TOKEN_DET)))
+    assert BracketWriter().dumps(tree) == "(S (VP (VBD nagkaon)) (NP (DET ang) (NN bata)))"
+
+
+def test_golden_labels_merge_runs():
+    tree = sentence(
+        verb("nag", "puyo"),
+        noun_phrase(word("usa", TOKEN_NUM), word("ka", TOKEN_KA), word("balay", TOKEN_NOUN)),
+    )
+    assert BracketWriter(GOLDEN_LABELS, merge=True).dumps(tree) == "(S (VP (V nagpuyo)) (NP (Det usa ka) (N balay)))"
+
+
+def test_golden_labels_drop_punctuation():
+    date = Date("English", word("Enero", TOKEN_MONTH), word("5", TOKEN_DAY), word(",", TOKEN_COMMA), word("2000", TOKEN_YEAR))
+    tree = sentence(verb("na", "tawo"), NounPhrasePart(NounPhrase(date, None)))
+    assert BracketWriter(GOLDEN_LABELS, merge=True).dumps(tree) == "(S (VP (V natawo)) (NP (N Enero 5 2000)))"
+    assert BracketWriter(CODES).dumps(tree) == "(S (VP (VBD natawo)) (NP (NNP Enero) (CD 5) (, ,) (CD 2000)))"
+
+
+def test_empty_tree():
+    assert BracketWriter().dumps(None) == "(S)"
+
+
+def test_golden_labels_over_the_corpus():
+    paths = glob.glob(os.path.join(ROOT, "Dataset", "*.txt")) + glob.glob(os.path.join(ROOT, "Evaluation", "*.txt"))
+    writer = BracketWriter(GOLDEN_LABELS, merge=True)
+    parsed = 0
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                text = line.strip()
+                # treebanks hold bracketed trees, not sentences
+                if not text or text.startswith("("):
+                    continue
+                try:
+                    errors, tree = Parser().parse(text, check=False)
+                except Exception:
+                    # sentences the parser crashes on are not the writer's
+                    continue
+                labels = set(re.findall(r"\((\S+)", writer.dumps(tree)))
+                assert labels <= GOLDEN_SET, text
+                parsed += 1
+    assert parsed > 0
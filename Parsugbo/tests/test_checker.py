@@ -0,0 +1,56 @@
+from parsugbo.checker import Checker
+from parsugbo.lexer import Token
+from parsugbo.parser import *
+
+
+def word(text, kind):
+    return Word(Token([kind], text), kind)
+
+
+def subject(kind, **kwargs):
+    return NounPhrasePart(NounPhrase(NounPhraseSingularPlural(kind, Noun(kind, None, [word("bata", TOKEN_NOUN)], None)), None), **kwargs)
+
+
+def sentence(prefix, opt=None, noun_phrase=None, adv=None):
+    verb = VerbComplex(Word(prefix, "PAST_PREFIX"), word("kaon", TOKEN_VERB), Word(None, "SUFFIX"))
+    return SentencePart(Sentence(PredPhrase(VerbPhrase(verb, opt), adv), noun_phrase))
+
+
+def errors(tree):
+    return [(e.error, e.correct, e.wrong_value, e.right_value) for e in Checker().check(tree)]
+
+
+def test_prepositional_object_parses_and_checks():
+    for text in ("nagkaon kang bata", "nagkaon kang bata kang bata"):
+        found, tree = Parser().parse(text)
+        assert tree is not None and found == []
+        assert [result[0] for result in Parser().parse_many([text])] == [[]]
+
+
+def test_agreement_with_a_prepositional_object():
+    pp = PrepPhrase(word("kang", TOKEN_PREP), Word(None, TOKEN_PREP), subject("Singular"))
+    # the subject is the sentence's own noun phrase
+    assert errors(sentence("nag", pp, subject("Plural"))) == [
+        ("Using a singular prefix for a plural noun", "Use a plural prefix", "nag-", ["nang-", "mang-"])
+    ]
+    assert errors(sentence("nag", pp, subject("Singular"))) == []
+    assert errors(sentence("nang", pp)) == []
+
+
+def test_agreement_skips_phrases_without_number():
+    date = Date("English", word("enero", TOKEN_MONTH), Word(Token([TOKEN_NUM], 5), TOKEN_DAY))
+    assert errors(sentence("nang", NounPhrasePart(date))) == []
+    # a noun phrase the parser left bare, without its NounPhrase wrapper
+    bare = NounPhraseSingularPlural("Singular", Noun("Singular", None, [word("bata", TOKEN_NOUN)], None))
+    assert [e[0] for e in errors(sentence("nang", NounPhrasePart(bare)))] == ["Using a plural prefix for a singular noun"]
+    conj = subject("Singular", conj=word("ug", TOKEN_CONJ), right=subject("Singular"))
+    assert [e[0] for e in errors(sentence("nag", conj))] == ["Using a singular prefix for a plural noun"]
+
+
+def test_tense_of_a_time_word_without_one():
+    # "kanunay" says nothing about the tense, so nothing is checked
+    checker = Checker()
+    checker.tenses_condition("kanunay", Word("nag", "PAST_PREFIX"), Word(None, "SUFFIX"), "kaon")
+    assert checker.errors == []
+    checker.tenses_condition("ugma", Word("nag", "PAST_PREFIX"), Word(None, "SUFFIX"), "kaon")
+    assert [e.correct for e in checker.errors] == ["FUTURE_PREFIX"]
@@ -0,0 +1,141 @@
+import itertools
+import math
+import random
+
+import pytest
+
+from parsugbo.cky import CKYParser
+
+GRAMMAR = {
+    "S": {("VP", "NP")},
+    "VP": {("Verb", "NP")},
+    "NP": {("Det", "Noun")},
+    "Det": {"ang"},
+    "Noun": {"bata", "iro"},
+    "Verb": {"nakakita"},
+}
+
+# every binary bracketing of the words: X -> X X | "a"
+AMBIGUOUS = {"X": {("X", "X"), "a"}}
+
+def naive_cells(grammar, words):
+    """Labels of every span, by the textbook CKY over sets of names."""
+    n = len(words)
+    cells = {}
+    for i, word in enumerate(words):
+        cells[i, i + 1] = {a for a, productions in grammar.items() if word in productions}
+    for length in range(2, n + 1):
+        for start in range(n - length + 1):
+            end = start + length
+            cells[start, end] = {
+                a
+                for a, productions in grammar.items()
+                for production in productions
+                if type(production) == tuple
+                for mid in range(start + 1, end)
+                if production[0] in cells[start, mid] and production[1] in cells[mid, end]
+            }
+    return cells
+
+
+def test_chart_labels():
+    chart = CKYParser(GRAMMAR).parse("nakakita ang bata ang iro")
+    assert chart.accepted
+    assert chart.labels(1, 3) == {"NP"}
+    assert chart.labels(0, 3) == {"VP"}
+    assert chart.labels(0, 2) == set()
+
+
+def test_recognize():
+    parser = CKYParser(GRAMMAR)
+    assert parser.recognize("nakakita ang bata ang iro")
+    assert parser.recognize(["nakakita", "ang", "iro", "ang", "bata"])
+    assert not parser.recognize("ang bata nakakita ang iro")
+    assert not parser.recognize("nakakita ang bata ang")
+    assert not parser.recognize("")
+
+
+def test_chart_matches_naive_cky():
+    rng = random.Random(3)
+    names = ["S", "A", "B", "C"]
+    for _ in range(50):
+        grammar = {name: set() for name in names}
+        for a, b, c in itertools.product(names, repeat=3):
+            if rng.random() < 0.15:
+                grammar[a].add((b, c))
+        for a in names:
+            grammar[a] |= {word for word in "xyz" if rng.random() < 0.3}
+        parser = CKYParser(grammar)
+        for _ in range(5):
+            words = [rng.choice("xyz") for _ in range(rng.randrange(1, 7))]
+            chart = parser.parse(words, forest=False)
+            for (start, end), labels in naive_cells(grammar, words).items():
+                assert chart.labels(start, end) == labels
+
+
+def catalan(n):
+    return math.comb(2 * n, n) // (n + 1)
+
+
+def test_forest_counts_every_bracketing():
+    parser = CKYParser(AMBIGUOUS, start="X")
+    for n in range(2, 12):
+        chart = parser.parse(["a"] * n)
+        assert chart.count() == catalan(n - 1)
+        assert chart.ambiguity(1, n) == {"X": catalan(n - 2)}
+    # far more parses than could ever be unpacked
+    assert parser.parse(["a"] * 60).count() == catalan(59)
+
+
+def test_trees_are_distinct_and_counted():
+    chart = CKYParser(AMBIGUOUS, start="X").parse("a a a a a")
+    trees = [str(tree) for tree in chart.trees()]
+    assert len(trees) == len(set(trees)) == chart.count() == 14
+    assert chart.tree() is not None and str(chart.tree()) == trees[0]
+    assert all(tree.count("a") == 5 for tree in trees)
+
+
+def test_tree_of_a_span():
+    chart = CKYParser(GRAMMAR).parse("nakakita ang bata ang iro")
+    assert str(chart.tree()) == "(S (VP (Verb nakakita) (NP (Det ang) (Noun bata))) (NP (Det ang) (Noun iro)))"
+    assert [str(tree) for tree in chart.trees("NP", 3, 5)] == ["(NP (Det ang) (Noun iro))"]
+    assert chart.count("NP", 0, 2) == 0
+    assert chart.tree("NP", 0, 2) is None
+
+
+def test_no_forest():
+    chart = CKYParser(AMBIGUOUS, start="X").parse("a a a", forest=False)
+    assert chart.accepted
+    with pytest.raises(ValueError):
+        chart.count()
+
+
+def test_every_unary_chain_is_a_parse():
+    two_ways = {"S": {("A",), ("B",)}, "A": {("X",)}, "B": {("X",)}, "X": {"w"}}
+    chart = CKYParser(two_ways).parse("w")
+    assert chart.count() == 2
+    assert sorted(str(tree) for tree in chart.trees()) == ["(S (A (X w)))", "(S (B (X w)))"]
+
+    short_and_long = {"S": {("A",), ("X",)}, "A": {("X",)}, "X": {"w"}}
+    chart = CKYParser(short_and_long).parse("w")
+    assert chart.count() == 2
+    assert sorted(str(tree) for tree in chart.trees()) == ["(S (A (X w)))", "(S (X w))"]
+
+
+def test_unary_cycles_are_cut():
+    # A -> B -> A -> ... would give endless trees; a chain passes each
+    # symbol once
+    cycle = {"S": {("A",)}, "A": {("B",), ("X",)}, "B": {("A",), ("X",)}, "X": {"w"}}
+    chart = CKYParser(cycle).parse("w")
+    assert chart.count() == 2
+    assert [str(tree) for tree in chart.trees()] == ["(S (A (X w)))", "(S (A (B (X w))))"]
+    assert [str(tree) for tree in chart.trees("B", 0, 1)] == ["(B (X w))", "(B (A (X w)))"]
+
+
+def test_viterbi_takes_the_best_chain():
+    rules = {"S": {("A",): 0.5, ("X",): 0.5}, "A": {("X",): 0.5, "v": 0.5}, "X": {"w": 1.0}}
+    parser = CKYParser(rules)
+    chart = parser.viterbi("w")
+    assert str(chart.tree()) == "(S (X w))"
+    assert chart.score() == pytest.approx(math.log(0.5))
+    assert parser.parse("w").count() == 2
@@ -0,0 +1,110 @@
+import math
+import os
+
+import pytest
+
+from parsugbo.cky import CKYParser, Grammar
+from parsugbo.cnf import cached_grammar, compile_rules, load_grammar, save_grammar, source_hash
+
+NOTEBOOK = {
+    "S": {("VP",)},
+    "VP": {("Verb", "NP"), ("Verb", "PP"), ("Verb",)},
+    "NP": {("Det", "Noun"), ("Det", "Adj", "Noun"), ("Pronoun",)},
+    "PP": {("Preposition", "NP")},
+    "Det": {"ang", "usa ka"},
+    "Noun": {"kuting", "iro", "tao", "teleskopyo"},
+    "Pronoun": {"ako", "ikaw", "siya"},
+    "Verb": {"nag kaon", "nag tan-aw", "nag"},
+    "Adj": {"maayong", "gamay"},
+    "Preposition": {"sa", "uban sa"},
+}
+
+PCFG = {
+    "S": {("NP", "VP"): 0.75, ("VP",): 0.25},
+    "VP": {("V", "NP", "NP"): 0.5, ("V",): 0.5},
+    "NP": {("N",): 0.6, "usa ka bata": 0.4},
+    "N": {"iro": 1.0},
+    "V": {"nakakita": 1.0},
+}
+
+
+def same(a, b):
+    return (a.symbols, a.start, a.hidden, a.binary, a.unary, a.terminals) == (
+        b.symbols, b.start, b.hidden, b.binary, b.unary, b.terminals)
+
+
+def test_binarized_and_multiword_rules():
+    chart = CKYParser(NOTEBOOK).parse("nag kaon usa ka gamay kuting")
+    assert chart.accepted
+    assert str(chart.tree()) == "(S (VP (Verb nag kaon) (NP (Det usa ka) (Adj gamay) (Noun kuting))))"
+    # the intermediate symbol of the ternary rule is left out of the labels
+    assert chart.labels(3, 6) == set()
+
+
+def test_unary_chain_rebuilt_in_trees():
+    chart = CKYParser(NOTEBOOK).parse("nag")
+    assert [str(tree) for tree in chart.trees()] == ["(S (VP (Verb nag)))"]
+
+
+def test_save_and_load(tmp_path):
+    for rules in (NOTEBOOK, PCFG):
+        compiled = compile_rules(rules)
+        path = str(tmp_path / "grammar.cnf")
+        save_grammar(compiled, path)
+        assert same(load_grammar(path), compiled)
+
+
+def test_loaded_grammar_parses_the_same(tmp_path):
+    rules = {"S": {("A",), ("B",), ("X",)}, "A": {("X",)}, "B": {("A",), ("X",)}, "X": {"w"}}
+    path = str(tmp_path / "grammar.cnf")
+    save_grammar(compile_rules(rules), path)
+    compiled, loaded = CKYParser(rules).parse("w"), CKYParser(Grammar(load_grammar(path))).parse("w")
+    assert compiled.count() == loaded.count() == 4
+    assert [str(tree) for tree in compiled.trees()] == [str(tree) for tree in loaded.trees()]
+
+
+def test_cache(tmp_path):
+    directory = str(tmp_path)
+    compiled = cached_grammar(PCFG, "S", directory)
+    path = os.path.join(directory, source_hash(PCFG) + ".cnf")
+    assert os.path.exists(path)
+    assert same(cached_grammar(PCFG, "S", directory), compiled)
+    # a damaged file is compiled again
+    with open(path, "r+b") as f:
+        f.truncate(40)
+    assert same(cached_grammar(PCFG, "S", directory), compiled)
+    assert same(load_grammar(path), compiled)
+
+
+def test_source_hash():
+    assert source_hash(NOTEBOOK) == source_hash(dict(reversed(list(NOTEBOOK.items()))))
+    assert source_hash(NOTEBOOK) != source_hash(NOTEBOOK, "VP")
+    assert source_hash(PCFG) != source_hash({**PCFG, "N": {"iro": 0.5}})
+
+
+def test_not_a_grammar(tmp_path):
+    path = tmp_path / "grammar.cnf"
+    path.write_bytes(b"nothing")
+    with pytest.raises(ValueError):
+        load_grammar(str(path))
+
+
+def test_rule_probabilities():
+    compiled = compile_rules(PCFG)
+    symbols = compiled.symbols
+    # the probability of a ternary rule stays on its first piece
+    scores = {(symbols[a], symbols[b], symbols[c]): logp for a, b, c, logp in compiled.binary}
+    assert scores["VP", "V", "VP|NP.NP"] == pytest.approx(math.log(0.5))
+    assert scores["VP|NP.NP", "NP", "NP"] == 0.0
+    # S -> VP -> V, a chain through VP, scores both rules
+    unary = {(symbols[a], symbols[b]): (chain, logp) for a, b, chain, logp in compiled.unary}
+    assert unary["S", "V"] == ((symbols.index("VP"),), pytest.approx(math.log(0.25 * 0.5)))
+
+
+def test_bad_rules():
+    with pytest.raises(ValueError):
+        compile_rules({"S": {"": 1.0}})
+    with pytest.raises(ValueError):
+        compile_rules({"S": {(): 1.0}})
+    with pytest.raises(ValueError):
+        compile_rules({"S": {"w": 0.0}})
@@ -0,0 +1,29 @@
+import glob
+import os
+
+from parsugbo.lexer import FileLexer
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+CORPORA = sorted(glob.glob(os.path.join(ROOT, "Dataset", "*.txt")) + glob.glob(os.path.join(ROOT, "Evaluation", "*.txt")))
+
+
+def test_file_lexer_skips_bad_lines(tmp_path):
+    path = tmp_path / "corpus.txt"
+    path.write_bytes("nagkaon ang bata\n(S (VP (V Natulog)))\n\nnatulog ang iring\n".encode())
+    lexer = FileLexer(str(path))
+    arrays = list(lexer)
+    lexer.close()
+    assert [array.sentence for array in arrays] == [0, 3]
+    assert [number for number, message in lexer.errors] == [1]
+
+
+def test_file_lexer_reads_every_corpus():
+    assert CORPORA
+    for path in CORPORA:
+        lexer = FileLexer(path)
+        numbers = [array.sentence for array in lexer]
+        lexer.close()
+        with open(path, "rb") as f:
+            lines = [number for number, line in enumerate(f) if line.strip()]
+        # each non-blank line is lexed or reported, never both
+        assert sorted(numbers + [number for number, message in lexer.errors]) == lines, path
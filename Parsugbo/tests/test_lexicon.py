@@ -0,0 +1,71 @@
+import pytest
+
+from parsugbo.lexicon import HEADER, Lexicon, compile_lexicon
+
+
+class Stem(object):
+    def __init__(self, root, prefix=None, suffix=None):
+        self.root = root
+        self.prefix = prefix
+        self.suffix = suffix
+
+
+ANALYSES = {
+    "nagkaon": (("VERB",), Stem("kaon", "nag", None)),
+    "kaonon": (("VERB", "NOUN"), Stem("kaon", None, "on")),
+    "bata": (("NOUN",), Stem("bata")),
+    "niño": (("NOUN",), Stem("niño")),
+    "bútang": (("NOUN", "VERB"), Stem("bútang", None, None)),
+    "wala": ((), Stem(None)),
+}
+
+
+def analyze(word):
+    # the literal and reserved words go in too
+    return ANALYSES.get(word, (("LITERAL",), Stem(word)))
+
+
+@pytest.fixture
+def lexicon(tmp_path):
+    path = str(tmp_path / "words.lex")
+    count = compile_lexicon(ANALYSES, path, analyze)
+    lexicon = Lexicon(path)
+    assert len(lexicon) == count >= len(ANALYSES)
+    yield lexicon
+    lexicon.close()
+
+
+def test_round_trip(lexicon):
+    for word, (types, stem) in ANALYSES.items():
+        entry = lexicon.lookup(word)
+        assert word in lexicon
+        assert (entry.types, entry.root, entry.prefix, entry.suffix) == (types, stem.root, stem.prefix, stem.suffix)
+
+
+def test_missing_words(lexicon):
+    # before, between and after the stored keys, and a prefix of one
+    for word in ("a", "bat", "batak", "zzz", "ñ", ""):
+        assert lexicon.lookup(word) is None
+        assert word not in lexicon
+
+
+def test_non_ascii_keys(lexicon):
+    assert lexicon.lookup("niño").root == "niño"
+    assert lexicon.lookup("bútang").types == ("NOUN", "VERB")
+    # the same letters without the accents are other words
+    assert lexicon.lookup("nino") is None
+    assert lexicon.lookup("butang") is None
+
+
+def test_none_stem_parts(lexicon):
+    entry = lexicon.lookup("wala")
+    assert (entry.types, entry.root, entry.prefix, entry.suffix) == ((), None, None, None)
+    entry = lexicon.lookup("bata")
+    assert (entry.prefix, entry.suffix) == (None, None)
+
+
+def test_bad_magic_is_rejected(tmp_path):
+    path = tmp_path / "words.lex"
+    path.write_bytes(b"NOTALEX\x00" + bytes(HEADER.size))
+    with pytest.raises(ValueError, match="Not a compiled lexicon"):
+        Lexicon(str(path))
@@ -0,0 +1,77 @@
+import pytest
+
+from parsugbo import lexer as lexer_module
+from parsugbo import parser as parser_module
+from parsugbo.lexer import RegexLexer, TokenArray
+from parsugbo.lexicon import compile_lexicon
+from parsugbo.parser import Parser, init_worker
+from parsugbo.visitors import SemanticAnalyzer
+
+
+def test_options_rebuild_the_same_parser():
+    parser = Parser(pretokenize=True, max_steps=123, timeout=2.5, max_stall=3, backtrack=True)
+    copy = Parser(**parser.options())
+    assert copy.options() == parser.options()
+
+
+def test_worker_parser_keeps_the_limits():
+    # what a parse_many pool worker builds from its initializer arguments
+    parser = Parser(max_steps=10, timeout=1.0, max_stall=2)
+    init_worker(Parser, parser.options(), None)
+    worker = parser_module.WORKER_PARSER
+    assert (worker.max_steps, worker.timeout, worker.max_stall) == (10, 1.0, 2)
+
+
+def test_parse_many_jobs_enforce_the_step_budget():
+    texts = ["nagkaon ang bata"] * 4
+    serial = list(Parser(max_steps=1).parse_many(texts))
+    pooled = list(Parser(max_steps=1).parse_many(texts, jobs=2, chunksize=1))
+    assert [tree for errors, tree in pooled] == [tree for errors, tree in serial] == [None] * 4
+    assert all(any("Parse aborted" in error.error for error in errors) for errors, tree in pooled)
+
+
+def test_serial_parse_many_gives_the_lexicon_back(tmp_path):
+    path = str(tmp_path / "words.lex")
+    compile_lexicon(["bata", "balay"], path)
+    previous = lexer_module.LEXICON
+    texts = ["nagkaon ang bata", "nagkaon sa balay"]
+    for errors, tree in Parser().parse_many(texts, lexicon=path):
+        assert lexer_module.LEXICON.path == path
+    assert lexer_module.LEXICON is previous
+    # dropped before the end
+    results = Parser().parse_many(texts, lexicon=path)
+    next(results)
+    results.close()
+    assert lexer_module.LEXICON is previous
+
+def render(result):
+    errors, tree = result
+    errors = [(e.error, e.correct, e.wrong_value, e.right_value) for e in errors]
+    return errors, str(SemanticAnalyzer().visit(tree)) if tree is not None else None
+
+
+@pytest.mark.parametrize("check", [True, False])
+def test_reparse_matches_a_full_parse(check):
+    text = "nagkaon ang bata sa balay, ang iro"
+    parser = Parser()
+    _, _, tokens = parser.parse_editable(text, check)
+    edits = [
+        (12, 0, "gamay nga "),
+        (len("nagkaon ang gamay nga bata"), 0, "ng"),
+        (0, 7, "nagdula"),
+        (12, 10, ""),
+        # "nagdula ang batang, ang iro": a singular prefix for two nouns
+        (len("nagdula ang batang"), len(" sa balay"), ""),
+        # "nagdula ika-5 ang ...": syntax errors
+        (8, 0, "ika-5 "),
+        (5, 0, " "),
+    ]
+    found = set()
+    for offset, deleted, inserted in edits:
+        text = text[:offset] + inserted + text[offset + deleted :]
+        incremental = render(parser.reparse(tokens, offset, deleted, inserted, check))
+        assert tokens.text == text
+        assert incremental == render(Parser().parse_tokens(TokenArray.from_text(text, RegexLexer), check))
+        found.update(error for error, _, _, _ in incremental[0])
+    assert "Wrong syntax: NOUN" in found
+    assert ("Using a singular prefix for a plural noun" in found) == check
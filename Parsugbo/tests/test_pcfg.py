@@ -0,0 +1,145 @@
+import math
+import os
+
+import pytest
+
+from parsugbo.cky import UNKNOWN, CKYParser
+from parsugbo.pcfg import bracket_scores, count_rules, labelled_spans, read_treebank, read_trees, train, words
+
+ROOT = os.path.join(os.path.dirname(__file__), "..", "..")
+TESTDATA = os.path.join(ROOT, "Dataset", "01_testdata.txt")
+GOLDEN = os.path.join(ROOT, "Evaluation", "golden.txt")
+
+TREEBANK = """
+Section one
+(S (VP (V Naglakaw)) (NP (Det ang) (N bata)) (PP (P sa) (N dalan)))
+(S (VP (V Nagdula)) (NP (Det ang) (N iro)))
+(S (VP (V Nagdula)) (NP (N si Juan)))
+"""
+
+
+def log_probability(tree, rules):
+    """Log-probability of `tree` under `rules`, words read as UNKNOWN where
+    the rules don't have them."""
+    if type(tree.children[0]) == str:
+        productions = rules[tree.label]
+        word = tree.children[0]
+        return math.log(productions[word] if word in productions else productions[UNKNOWN])
+    production = tuple(child.label for child in tree.children)
+    return math.log(rules[tree.label][production]) + sum(log_probability(child, rules) for child in tree.children)
+
+
+def test_read_trees():
+    trees = read_trees(TREEBANK)
+    assert len(trees) == 3
+    assert str(trees[2]) == "(S (VP (V Nagdula)) (NP (N si Juan)))"
+    assert words(trees[0]) == ["Naglakaw", "ang", "bata", "sa", "dalan"]
+    # a word next to brackets is a leaf under the bracket's label
+    assert str(read_trees("(S (NP (N bata)) wala)")[0]) == "(S (NP (N bata)) (S wala))"
+
+
+def test_bracket_scores():
+    gold = read_trees(TREEBANK)
+    assert labelled_spans(gold[1]) == {("S", 0, 3), ("VP", 0, 1), ("V", 0, 1), ("NP", 1, 3), ("Det", 1, 2), ("N", 2, 3)}
+    assert bracket_scores(gold, gold) == (1.0, 1.0, 1.0)
+    precision, recall, f1 = bracket_scores(gold, [gold[0], None, None])
+    assert precision == 1.0 and recall == pytest.approx(9 / 20)
+
+
+def test_probabilities_sum_to_one():
+    for unknown in (0, 1, 2):
+        for productions in train(read_trees(TREEBANK), unknown=unknown).values():
+            assert sum(productions.values()) == pytest.approx(1.0)
+
+
+def test_unknown_word_from_singletons():
+    trees = read_trees(TREEBANK)
+    rules = train(trees)
+    # bata, dalan, iro and si juan are each seen once, all under N
+    assert rules["N"][UNKNOWN] == pytest.approx(4 / 8)
+    assert rules["N"]["bata"] == pytest.approx(1 / 8)
+    # nagdula is seen twice
+    assert rules["V"] == pytest.approx({"naglakaw": 1 / 4, "nagdula": 2 / 4, UNKNOWN: 1 / 4})
+    assert UNKNOWN not in rules["Det"]
+    assert all(UNKNOWN not in productions for productions in train(trees, unknown=0).values())
+    assert count_rules(trees)["N"]["si juan"] == 1
+
+
+def test_unknown_words_parse():
+    rules = train(read_trees(TREEBANK))
+    parser = CKYParser(rules)
+    chart = parser.viterbi("nagdula ang kuting")
+    assert str(chart.tree()) == "(S (VP (V nagdula)) (NP (Det ang) (N kuting)))"
+    assert chart.score() == pytest.approx(log_probability(chart.tree(), rules))
+    assert parser.parse("nagdula ang kuting").count() >= 1
+    # without the unknown word the sentence is out of reach
+    assert not CKYParser(train(read_trees(TREEBANK), unknown=0)).parse("nagdula ang kuting").accepted
+    # a known word keeps to its own terminals
+    assert parser.parse("nagdula ang ang").count() == 0
+
+
+def test_held_out_golden_sentences_parse():
+    base, gold = read_treebank(TESTDATA), read_treebank(GOLDEN)
+    best = []
+    for i, tree in enumerate(gold):
+        parser = CKYParser(train(base + gold[:i] + gold[i + 1 :]))
+        chart = parser.viterbi(" ".join(words(tree)).lower())
+        best.append(chart.tree())
+        if chart.tree() is not None:
+            assert chart.score() <= 0.0
+    assert sum(tree is not None for tree in best) >= len(gold) - 2
+    assert bracket_scores(gold, best)[2] > 0.3
+
+
+@pytest.fixture(scope="module")
+def golden():
+    """Rules trained on both treebanks, their parser and the golden
+    sentences."""
+    gold = read_treebank(GOLDEN)
+    rules = train(read_treebank(TESTDATA) + gold)
+    return rules, CKYParser(rules), [" ".join(words(tree)).lower() for tree in gold]
+
+
+def test_pruning_that_drops_nothing_changes_nothing(golden):
+    rules, parser, sentences = golden
+    for sentence in sentences:
+        full = parser.viterbi(sentence)
+        assert full.stats.pruned == 0 and full.stats.pruned_rate == 0.0
+        n = len(sentence.split())
+        for options in ({"beam": len(parser.grammar.symbols)}, {"threshold": -1e9}, {"max_span": n}):
+            chart = parser.viterbi(sentence, **options)
+            assert chart.stats.pruned == 0
+            assert chart.stats.kept == full.stats.kept
+            assert str(chart.tree()) == str(full.tree())
+            assert chart.score() == full.score()
+
+
+def test_pruned_trees_are_scored_as_they_are(golden):
+    rules, parser, sentences = golden
+    for sentence in sentences:
+        best = parser.viterbi(sentence).score()
+        for options in ({"beam": 16}, {"threshold": -5}, {"max_span": 3}, {"beam": 24, "threshold": -6, "max_span": 5}):
+            chart = parser.viterbi(sentence, **options)
+            assert 0.0 <= chart.stats.pruned_rate <= 1.0
+            assert chart.stats.pruned == chart.stats.span + chart.stats.threshold + chart.stats.beam
+            if chart.tree() is None:
+                continue
+            # a pruned chart can only lose the best tree, never score a
+            # tree better than it is
+            assert words(chart.tree()) == sentence.split()
+            assert chart.score() == pytest.approx(log_probability(chart.tree(), rules))
+            assert chart.score() <= best + 1e-9
+
+
+def test_pruning_keeps_to_its_limits(golden):
+    rules, parser, sentences = golden
+    top = parser.grammar.names(parser.grammar.top)
+    for sentence in sentences:
+        tree = parser.viterbi(sentence, max_span=2).tree()
+        if tree is not None:
+            # only the start symbol spans more than two words
+            assert all(label in top for label, start, end in labelled_spans(tree) if end - start > 2)
+        # a smaller beam keeps fewer entries
+        kept = [parser.viterbi(sentence, beam=beam).stats.kept for beam in (2, 4, 8, 16)]
+        assert kept == sorted(kept)
+        assert parser.viterbi(sentence, threshold=-4).stats.kept <= parser.viterbi(sentence, threshold=-8).stats.kept
@@ -0,0 +1,60 @@
+import pytest
+
+from parsugbo.parser import Parser
+from parsugbo.predictive import PredictiveParser
+from parsugbo.visitors import SemanticAnalyzer
+
+
+def test_same_tree_as_parser():
+    text = "nagkaon ang bata sa balay"
+    errors, tree = PredictiveParser().parse(text, check=False)
+    expected_errors, expected = Parser().parse(text, check=False)
+    assert str(SemanticAnalyzer().visit(tree)) == str(SemanticAnalyzer().visit(expected))
+    assert len(errors) == len(expected_errors)
+
+
+# sentences with a thousand items of each chain kind
+CHAINS = [
+    "nagkaon " + ", ".join(["ang bata"] * 1000),
+    "nagkaon ang balay ni " + ", ".join(["bata"] * 1000),
+    "nagkaon " + " ".join(["kang bata"] * 1000),
+    "nagkaon ang bata " + " ".join(["sa balay"] * 1000),
+]
+
+
+def walk(node):
+    """The values of a visitor tree in order, with their depth."""
+    found, stack = [], [(node, 0)]
+    while stack:
+        node, depth = stack.pop()
+        found.append((depth, node.value))
+        for child in reversed(node.children):
+            for v in reversed(child) if type(child) == list else [child]:
+                stack.append((v, depth + 1))
+    return found
+
+
+@pytest.mark.parametrize("text", CHAINS)
+def test_long_chains_parse_and_visit(text):
+    results = []
+    for parser_class in (Parser, PredictiveParser):
+        errors, tree = parser_class(max_steps=None).parse(text)
+        assert tree is not None
+        errors = [(e.error, e.correct, e.wrong_value, e.right_value) for e in errors]
+        results.append((errors, walk(SemanticAnalyzer().visit(tree))))
+    assert results[0] == results[1]
+    assert not any("Parse aborted" in error for error, _, _, _ in results[0][0])
+
+
+def test_backtrack_is_refused():
+    with pytest.raises(ValueError, match="does not backtrack"):
+        PredictiveParser(backtrack=True)
+
+
+def test_reparse_is_refused():
+    parser = PredictiveParser()
+    with pytest.raises(ValueError, match="does not reparse"):
+        parser.parse_editable("nagkaon ang bata")
+    _, _, tokens = Parser().parse_editable("nagkaon ang bata")
+    with pytest.raises(ValueError, match="does not reparse"):
+        parser.reparse(tokens, 12, 0, "gamay nga ")
@@ -0,0 +1,100 @@
+import os
+from collections import Counter
+
+from parsugbo.parser import AST, NounPhraseSingularPlural, Parser, PrepPhrase, Word
+from parsugbo.pcfg import read_treebank, words
+from parsugbo.visitors import MultiVisitor, NodeVisitor, SemanticAnalyzer
+
+ROOT = os.path.join(os.path.dirname(__file__), "..", "..")
+RAW_DATASET = os.path.join(ROOT, "Dataset", "04_rawdataset.txt")
+
+TEXTS = ["ang bata naligo sa sapa", "nagkaon ang gamay nga bata sa balay, ang iro"]
+
+
+def parse(text):
+    errors, tree = Parser().parse(text, check=False)
+    return tree
+
+
+def test_compact_leaves_out_the_empty_lines():
+    for text in TEXTS:
+        tree = parse(text)
+        full = str(SemanticAnalyzer().visit(tree)).splitlines()
+        compact = str(SemanticAnalyzer(compact=True).visit(tree)).splitlines()
+        assert compact == [line for line in full if not line.endswith("'Empty'")]
+
+
+def test_compact_skips_missing_children():
+    class Counting(SemanticAnalyzer):
+        def visit_NoneType(self, node):
+            self.missing += 1
+            return super().visit_NoneType(node)
+
+    for compact in (False, True):
+        analyzer = Counting(compact)
+        analyzer.missing = 0
+        MultiVisitor(SemanticAnalyzer(), analyzer).visit(parse(TEXTS[0]))
+        analyzer.visit(parse(TEXTS[0]))
+        assert (analyzer.missing == 0) == compact
+
+
+class Statistics(NodeVisitor):
+    """Counts over the nodes it handles; generic_visit takes it down to
+    them when it walks alone."""
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def visit_NoneType(self, node):
+        return None
+
+    def generic_visit(self, node: AST):
+        for name in node.__slots__:
+            child = getattr(node, name)
+            for v in child if type(child) == list else [child]:
+                if isinstance(v, AST):
+                    self.visit(v)
+
+
+class WordTypes(Statistics):
+    def visit_Word(self, node: Word):
+        if node.content is not None:
+            self.counts[node.type] += 1
+
+
+class NounPhrases(Statistics):
+    # goes on below the phrases it counts, to the nested ones
+    def visit_NounPhraseSingularPlural(self, node: NounPhraseSingularPlural):
+        self.counts[node.type] += 1
+        self.generic_visit(node)
+
+    def visit_PrepPhrase(self, node: PrepPhrase):
+        self.counts["PrepPhrase"] += 1
+        self.generic_visit(node)
+
+    def visit_Word(self, node: Word):
+        pass
+
+
+def test_multi_visitor_matches_separate_walks():
+    trees = [parse(" ".join(words(tree)).lower()) for tree in read_treebank(RAW_DATASET)]
+    # and runs deep enough for SemanticAnalyzer to visit ahead, short enough
+    # for the statistics to walk alone
+    trees += [parse("nagkaon " + " ".join(["kang bata"] * 40)), parse("nagkaon ang bata " + " ".join(["sa balay"] * 40))]
+    trees = [tree for tree in trees if tree is not None]
+    assert len(trees) > 100
+
+    alone = [SemanticAnalyzer(), SemanticAnalyzer(compact=True), WordTypes(), NounPhrases()]
+    expected = []
+    for tree in trees:
+        expected.append([str(visitor.visit(tree)) for visitor in alone[:2]])
+    for visitor in alone[2:]:
+        for tree in trees:
+            visitor.visit(tree)
+
+    together = [SemanticAnalyzer(), SemanticAnalyzer(compact=True), WordTypes(), NounPhrases()]
+    walk = MultiVisitor(*together)
+    for tree, results in zip(trees, expected):
+        assert [str(result) for result in walk.visit(tree)[:2]] == results
+    for visitor, other in zip(together[2:], alone[2:]):
+        assert visitor.counts == other.counts and visitor.counts